@@ -1,6 +1,7 @@
+import numpy as np
 import sys
 sys.path.append('../')
-from utils import get_center_of_bbox, get_bbox_width
+from utils import get_center_of_bbox, get_bbox_width, TrackTable
 
 class BallAquisitionDetector():
     def __init__(self):
@@ -69,4 +70,118 @@ class BallAquisitionDetector():
                     if team_id is not None:
                         ball_acquisition['team'] = team_id
                         ball_acquisition['team_ball_control'] = team_id
-        return ball_acquisition
\ No newline at end of file
+        return ball_acquisition
+
+    def detect_possession(self, player_bboxes, ball_bboxes, min_frames=1):
+        """
+        Detect the ball owner of every frame at once from dense box arrays.
+        
+        The owner is the player whose box center is closest to the ball
+        center, by Manhattan distance, if closer than `minimum_distance`;
+        ties go to the lowest track column. With `min_frames` above one, a
+        change of owner (including losing the ball) only counts once it lasts
+        that many consecutive frames; shorter runs keep the previous owner.
+        
+        Args:
+            player_bboxes (numpy.ndarray): Player boxes of shape (frames, tracks, 4),
+                NaN for absent tracks.
+            ball_bboxes (numpy.ndarray): Ball boxes of shape (frames, 4), NaN
+                for frames without a ball.
+            min_frames (int): Minimum consecutive frames for a change of owner.
+        
+        Returns:
+            numpy.ndarray: Track column of the owner for each frame, -1 for none.
+        """
+        player_bboxes = np.asarray(player_bboxes, dtype=np.float64)
+        ball_bboxes = np.asarray(ball_bboxes, dtype=np.float64)
+        frame_count = len(ball_bboxes)
+        if player_bboxes.shape[1] == 0 or frame_count == 0:
+            return np.full(frame_count, -1, dtype=np.int64)
+        
+        # Integer centers, as get_center_of_bbox computes them
+        player_centers = np.trunc((player_bboxes[..., :2] + player_bboxes[..., 2:]) / 2)
+        ball_centers = np.trunc((ball_bboxes[:, :2] + ball_bboxes[:, 2:]) / 2)
+        
+        distances = np.abs(player_centers - ball_centers[:, None, :]).sum(axis=2)
+        distances[np.isnan(distances)] = np.inf
+        
+        closest_players = distances.argmin(axis=1)
+        closest_distances = distances[np.arange(frame_count), closest_players]
+        possession = np.where(closest_distances < self.minimum_distance, closest_players, -1)
+        
+        if min_frames > 1:
+            possession = self.apply_possession_hysteresis(possession, min_frames)
+        return possession
+
+    def apply_possession_hysteresis(self, possession, min_frames):
+        """
+        Replace runs of the same owner shorter than `min_frames` with the
+        owner of the last long enough run.
+        
+        Args:
+            possession (numpy.ndarray): Owner of each frame, -1 for none.
+            min_frames (int): Minimum run length to keep.
+        
+        Returns:
+            numpy.ndarray: Smoothed owner of each frame, -1 for none.
+        """
+        run_starts = np.flatnonzero(np.diff(possession, prepend=possession[0] - 1))
+        run_lengths = np.diff(np.append(run_starts, len(possession)))
+        run_owners = possession[run_starts]
+        
+        # Index of the last kept run at or before each run
+        kept_runs = np.where(run_lengths >= min_frames, np.arange(len(run_starts)), -1)
+        kept_runs = np.maximum.accumulate(kept_runs)
+        
+        smoothed_owners = np.where(kept_runs >= 0, run_owners[kept_runs], -1)
+        return np.repeat(smoothed_owners, run_lengths)
+
+    def detect_frames_vectorized(self, player_detections, ball_detections, assign_to_team=False,
+                                 team_assignments=[], min_frames=1):
+        """
+        Detect ball acquisition across multiple frames with detect_possession().
+        
+        Takes and returns the same per-frame dictionaries as detect_frames().
+        
+        Args:
+            player_detections (list or TrackTable): Player detections for each frame.
+            ball_detections (list or TrackTable): Ball detections for each frame.
+            assign_to_team (bool): Whether to assign ball possession to teams.
+            team_assignments (list): List of team assignments for each frame.
+            min_frames (int): Minimum consecutive frames for a change of owner.
+        
+        Returns:
+            list: List of ball acquisition data for each frame.
+        """
+        player_table = player_detections if isinstance(player_detections, TrackTable) else TrackTable.from_tracks(player_detections)
+        ball_table = ball_detections if isinstance(ball_detections, TrackTable) else TrackTable.from_tracks(ball_detections)
+        
+        player_ids, player_bboxes = player_table.to_dense()
+        ball_ids, ball_bboxes = ball_table.to_dense()
+        frame_count = player_table.frame_count
+        
+        ball_column = np.flatnonzero(ball_ids == 1)
+        if len(ball_column) == 0:
+            return [{} for _ in range(frame_count)]
+        ball_bboxes = ball_bboxes[:frame_count, ball_column[0]]
+        
+        possession = self.detect_possession(player_bboxes[:len(ball_bboxes)], ball_bboxes, min_frames)
+        
+        # Frames without a ball detection whose owner the hysteresis carried
+        # over report the last detected ball box, like detect_frame() reports
+        # a box for every owner
+        ball_frames = np.where(~np.isnan(ball_bboxes[:, 0]), np.arange(len(ball_bboxes)), -1)
+        last_ball_frames = np.maximum.accumulate(ball_frames) if len(ball_frames) > 0 else ball_frames
+        
+        ball_acquisition_frames = [{} for _ in range(frame_count)]
+        for frame_num in np.flatnonzero(possession >= 0).tolist():
+            player_id = player_ids[possession[frame_num]].item()
+            ball_acquisition = ball_acquisition_frames[frame_num]
+            ball_acquisition[player_id] = ball_bboxes[last_ball_frames[frame_num]].tolist()
+            
+            if assign_to_team:
+                team_id = team_assignments[frame_num].get(player_id, None)
+                if team_id is not None:
+                    ball_acquisition['team'] = team_id
+                    ball_acquisition['team_ball_control'] = team_id
+        return ball_acquisition_frames
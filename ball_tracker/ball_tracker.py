@@ -1,20 +1,40 @@
 from ultralytics import YOLO
 import supervision as sv
-import pickle
-import os
 import sys
+from collections import deque
 sys.path.append('../')
-from utils import get_center_of_bbox
+from utils import get_center_of_bbox, InferenceStats, read_stub, save_stub, interpolate_tracks
 
 class BallTracker:
-    def __init__(self, model_path):
+    def __init__(self, model_path, batch_size=1, roi_tracking=False, roi_size=320,
+                 max_roi_misses=5, min_roi_confidence=0.3, detection_stride=1):
         """
         Initialize the BallTracker with a YOLO model.
         
         Args:
             model_path (str): Path to the YOLO model file.
+            batch_size (int): Number of frames sent to the model per call.
+            roi_tracking (bool): Whether to search a small crop around the
+                predicted ball position instead of the whole frame.
+            roi_size (int): Side length in pixels of the square search crop.
+            max_roi_misses (int): Consecutive crop searches without a confident
+                detection before falling back to a full-frame search.
+            min_roi_confidence (float): Minimum confidence for a detection in
+                the crop to count as a hit.
+            detection_stride (int): Run the detector on every Nth frame and
+                interpolate the ball between detections.
         """
         self.model = YOLO(model_path)
+        self.model_path = model_path
+        self.batch_size = batch_size
+        self.detection_stride = detection_stride
+        self.inference_stats = InferenceStats()
+        
+        self.roi_tracking = roi_tracking
+        self.roi_size = roi_size
+        self.max_roi_misses = max_roi_misses
+        self.min_roi_confidence = min_roi_confidence
+        self.reset_roi_tracking()
 
     def interpolate_ball_positions(self, ball_positions):
         """
@@ -38,35 +58,114 @@ class BallTracker:
         
         return ball_positions
 
-    def detect_frames(self, frames, read_from_stub=False, stub_path=None):
+    def detect_frames(self, frames, read_from_stub=False, stub_path=None, cache=None):
         """
         Detect ball across multiple video frames.
         
+        Frames are sent to the model in batches of `batch_size`. In ROI
+        tracking mode each search depends on the previous detection, so frames
+        are processed one at a time instead.
+        
+        With a `detection_stride` of N, only every Nth frame is searched and the
+        ball is interpolated between detections, marked as InterpolatedBBox.
+        
         Args:
-            frames (list): List of video frames.
+            frames (iterable): Video frames, as a list or a VideoSource.
             read_from_stub (bool): Whether to read from cached results.
             stub_path (str): Path to cached detection results.
+            cache (StubCache, optional): Content-addressed cache of stage results.
+                Only used when `frames` is a VideoSource, whose file is hashed.
         
         Returns:
             list: List of ball detections for each frame.
         """
-        ball_detections = []
+        cache_key = None
+        if cache is not None and getattr(frames, 'video_path', None) is not None:
+            stage_params = {'imgsz': 640, 'detection_stride': self.detection_stride}
+            if self.roi_tracking:
+                stage_params.update(roi_size=self.roi_size, max_roi_misses=self.max_roi_misses,
+                                    min_roi_confidence=self.min_roi_confidence)
+            cache_key = cache.make_key('ball_tracks', video_path=frames.video_path,
+                                       model_path=self.model_path, **stage_params)
+            ball_detections = cache.get_tracks(cache_key)
+            if ball_detections is not None:
+                return ball_detections
         
-        if read_from_stub and stub_path is not None and os.path.exists(stub_path):
-            with open(stub_path, 'rb') as f:
-                ball_detections = pickle.load(f)
+        ball_detections = read_stub(read_from_stub, stub_path)
+        if ball_detections is not None:
             return ball_detections
 
-        for frame in frames:
-            player_dict = self.detect_frame(frame)
-            ball_detections.append(player_dict)
+        keyframe_detections = []
+        keyframe_indices = []
+        frame_count = 0
+        batch = []
+        self.reset_roi_tracking()
+        
+        for frame_num, frame in enumerate(frames):
+            frame_count += 1
+            if frame_num % self.detection_stride != 0:
+                continue
+            keyframe_indices.append(frame_num)
+            
+            if self.roi_tracking:
+                keyframe_detections.append(self.track_frame(frame, frame_num))
+                continue
+            
+            batch.append(frame.copy())
+            if len(batch) == self.batch_size:
+                keyframe_detections.extend(self.detect_batch(batch))
+                batch = []
         
-        if stub_path is not None:
-            with open(stub_path, 'wb') as f:
-                pickle.dump(ball_detections, f)
+        if batch:
+            keyframe_detections.extend(self.detect_batch(batch))
+        
+        ball_detections = interpolate_tracks(keyframe_detections, keyframe_indices, frame_count)
+        
+        save_stub(stub_path, ball_detections)
+        if cache_key is not None:
+            cache.put_tracks(cache_key, ball_detections)
                 
         return ball_detections
 
+    def detect_batch(self, batch):
+        """
+        Detect the ball in a batch of frames with a single model call.
+        
+        Args:
+            batch (list): Video frames.
+        
+        Returns:
+            list: Ball detections for each frame of the batch.
+        """
+        start_time = self.inference_stats.start()
+        results = self.model(batch, imgsz=640)
+        self.inference_stats.record(start_time, len(batch))
+        
+        return [self.process_result(result) for result in results]
+
+    def track_frame(self, frame, frame_num):
+        """
+        Detect the ball in the next frame of a stream.
+        
+        In ROI tracking mode the search uses the detections of the previous
+        frames; otherwise the whole frame is searched. The model call is
+        counted in `inference_stats`.
+        
+        Args:
+            frame (numpy.ndarray): Input video frame.
+            frame_num (int): Index of the frame in the video.
+        
+        Returns:
+            dict: Dictionary containing ball detection information.
+        """
+        if self.roi_tracking:
+            start_time = self.inference_stats.start()
+            ball_detection = self.detect_frame_roi(frame, frame_num)
+            self.inference_stats.record(start_time, 1)
+            return ball_detection
+        
+        return self.detect_batch([frame])[0]
+
     def detect_frame(self, frame):
         """
         Detect ball in a single frame.
@@ -78,13 +177,138 @@ class BallTracker:
             dict: Dictionary containing ball detection information.
         """
         results = self.model(frame, imgsz=640)
-        detections = sv.Detections.from_ultralytics(results[0])
+        return self.process_result(results[0])
+
+    def process_result(self, result):
+        """
+        Keep the most confident ball detection from the model output for one frame.
+        
+        Args:
+            result (ultralytics.engine.results.Results): Model output for a single frame.
+        
+        Returns:
+            dict: Dictionary containing ball detection information.
+        """
+        bbox, _ = self.get_best_detection(result)
         
         ball_dict = {}
-        if len(detections) > 0:
-            # Get the detection with highest confidence
-            best_detection_idx = detections.confidence.argmax()
-            bbox = detections.xyxy[best_detection_idx].tolist()
+        if bbox is not None:
             ball_dict[1] = bbox
             
-        return ball_dict
\ No newline at end of file
+        return ball_dict
+
+    def get_best_detection(self, result):
+        """
+        Get the detection with the highest confidence from the model output.
+        
+        Args:
+            result (ultralytics.engine.results.Results): Model output for a single frame.
+        
+        Returns:
+            tuple: Bounding box [x1, y1, x2, y2] and its confidence, or (None, 0)
+                if nothing was detected.
+        """
+        detections = sv.Detections.from_ultralytics(result)
+        if len(detections) == 0:
+            return None, 0
+        
+        best_detection_idx = detections.confidence.argmax()
+        bbox = detections.xyxy[best_detection_idx].tolist()
+        return bbox, float(detections.confidence[best_detection_idx])
+
+    def reset_roi_tracking(self):
+        """
+        Forget the ball history so the next ROI search starts with a full-frame search.
+        """
+        self.ball_history = deque(maxlen=2)
+        self.roi_misses = 0
+        self.roi_searches = 0
+        self.full_frame_searches = 0
+
+    def predict_ball_position(self, frame_num):
+        """
+        Predict the ball center from the last detections assuming constant velocity.
+        
+        Args:
+            frame_num (int): Frame to predict the position for.
+        
+        Returns:
+            tuple or None: Predicted center (x, y), or None without a recent detection.
+        """
+        if len(self.ball_history) == 0:
+            return None
+        
+        last_frame, (last_x, last_y) = self.ball_history[-1]
+        if len(self.ball_history) == 1:
+            return last_x, last_y
+        
+        prev_frame, (prev_x, prev_y) = self.ball_history[0]
+        frames_elapsed = last_frame - prev_frame
+        velocity_x = (last_x - prev_x) / frames_elapsed
+        velocity_y = (last_y - prev_y) / frames_elapsed
+        
+        frames_ahead = frame_num - last_frame
+        return last_x + velocity_x * frames_ahead, last_y + velocity_y * frames_ahead
+
+    def get_roi_window(self, frame, center):
+        """
+        Get a square search window around a point, shifted to stay inside the frame.
+        
+        Args:
+            frame (numpy.ndarray): Input video frame.
+            center (tuple): Center (x, y) of the window.
+        
+        Returns:
+            tuple: Window corners (x1, y1, x2, y2).
+        """
+        frame_height, frame_width = frame.shape[:2]
+        window_width = min(self.roi_size, frame_width)
+        window_height = min(self.roi_size, frame_height)
+        
+        x1 = int(center[0] - window_width / 2)
+        y1 = int(center[1] - window_height / 2)
+        x1 = max(0, min(x1, frame_width - window_width))
+        y1 = max(0, min(y1, frame_height - window_height))
+        
+        return x1, y1, x1 + window_width, y1 + window_height
+
+    def detect_frame_roi(self, frame, frame_num):
+        """
+        Detect the ball by searching a crop around its predicted position.
+        
+        A full-frame search is used when there is no recent detection or after
+        `max_roi_misses` crop searches in a row without a confident hit.
+        
+        Args:
+            frame (numpy.ndarray): Input video frame.
+            frame_num (int): Index of the frame in the video.
+        
+        Returns:
+            dict: Dictionary containing ball detection information.
+        """
+        predicted_position = self.predict_ball_position(frame_num)
+        
+        if predicted_position is None or self.roi_misses >= self.max_roi_misses:
+            self.full_frame_searches += 1
+            results = self.model(frame, imgsz=640)
+            bbox, _ = self.get_best_detection(results[0])
+            
+            if bbox is None:
+                self.ball_history.clear()
+                return {}
+        else:
+            self.roi_searches += 1
+            x1, y1, x2, y2 = self.get_roi_window(frame, predicted_position)
+            results = self.model(frame[y1:y2, x1:x2], imgsz=self.roi_size)
+            bbox, confidence = self.get_best_detection(results[0])
+            
+            if bbox is None or confidence < self.min_roi_confidence:
+                self.roi_misses += 1
+                return {}
+            
+            # Move the box from crop to frame coordinates
+            bbox = [bbox[0] + x1, bbox[1] + y1, bbox[2] + x1, bbox[3] + y1]
+        
+        self.roi_misses = 0
+        self.ball_history.append((frame_num, get_center_of_bbox(bbox)))
+        return {1: bbox}
\ No newline at end of file
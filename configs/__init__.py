@@ -1 +1 @@
-from .configs import STUBS_DEFAULT_PATH,PLAYER_DETECTOR_PATH,BALL_DETECTOR_PATH,COURT_KEYPOINT_DETECTOR_PATH,OUTPUT_VIDEO_PATH
\ No newline at end of file
+from .configs import STUBS_DEFAULT_PATH,PLAYER_DETECTOR_PATH,BALL_DETECTOR_PATH,COURT_KEYPOINT_DETECTOR_PATH,OUTPUT_VIDEO_PATH,PREFETCH_FRAMES,INFERENCE_BATCH_SIZE,STUB_CACHE_MAX_SIZE_MB,LIVE_LATENCY_BUDGET_MS,HOMOGRAPHY_REFINE_THRESHOLD,HOMOGRAPHY_SMOOTHING
\ No newline at end of file
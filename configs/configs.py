@@ -2,4 +2,10 @@ STUBS_DEFAULT_PATH = 'stubs'
 PLAYER_DETECTOR_PATH = 'models/player_detector.pt'
 BALL_DETECTOR_PATH = 'models/ball_detector_model.pt'
 COURT_KEYPOINT_DETECTOR_PATH = 'models/court_keypoint_detector.pt'
-OUTPUT_VIDEO_PATH = 'output_videos/output_video.avi'
\ No newline at end of file
+OUTPUT_VIDEO_PATH = 'output_videos/output_video.avi'
+PREFETCH_FRAMES = 8
+INFERENCE_BATCH_SIZE = 8
+STUB_CACHE_MAX_SIZE_MB = 4096
+LIVE_LATENCY_BUDGET_MS = 200
+HOMOGRAPHY_REFINE_THRESHOLD = 15.0
+HOMOGRAPHY_SMOOTHING = 0.6
\ No newline at end of file
@@ -0,0 +1,74 @@
+import cv2
+import numpy as np
+
+class CameraMotionDetector:
+    def __init__(self, motion_threshold=8.0, downscale_width=64, max_keyframe_interval=None):
+        """
+        Initialize the CameraMotionDetector.
+        
+        Camera motion is estimated cheaply by differencing small grayscale
+        thumbnails of the frames against the last keyframe. Comparing against
+        the keyframe rather than the previous frame keeps slow pans from
+        going unnoticed.
+        
+        Args:
+            motion_threshold (float): Mean absolute thumbnail difference (0-255)
+                above which the camera is considered to have moved.
+            downscale_width (int): Width of the thumbnails used for differencing.
+            max_keyframe_interval (int, optional): Force a keyframe after this
+                many frames even if the camera held still.
+        """
+        self.motion_threshold = motion_threshold
+        self.downscale_width = downscale_width
+        self.max_keyframe_interval = max_keyframe_interval
+        self.reset()
+    
+    def reset(self):
+        """
+        Forget the last keyframe so the next frame becomes a keyframe.
+        """
+        self.keyframe_thumbnail = None
+        self.frames_since_keyframe = 0
+    
+    def get_thumbnail(self, frame):
+        """
+        Downscale a frame to a small grayscale thumbnail.
+        
+        Args:
+            frame (numpy.ndarray): Input video frame.
+        
+        Returns:
+            numpy.ndarray: Grayscale thumbnail as int16 for differencing.
+        """
+        height, width = frame.shape[:2]
+        downscale_height = max(1, int(height * self.downscale_width / width))
+        thumbnail = cv2.resize(frame, (self.downscale_width, downscale_height), interpolation=cv2.INTER_AREA)
+        thumbnail = cv2.cvtColor(thumbnail, cv2.COLOR_BGR2GRAY)
+        return thumbnail.astype(np.int16)
+    
+    def is_keyframe(self, frame):
+        """
+        Decide whether a frame needs a fresh detection.
+        
+        Args:
+            frame (numpy.ndarray): Input video frame.
+        
+        Returns:
+            bool: True if the camera moved since the last keyframe.
+        """
+        thumbnail = self.get_thumbnail(frame)
+        
+        is_keyframe = self.keyframe_thumbnail is None
+        if not is_keyframe:
+            motion = np.abs(thumbnail - self.keyframe_thumbnail).mean()
+            is_keyframe = motion > self.motion_threshold
+        if not is_keyframe and self.max_keyframe_interval is not None:
+            is_keyframe = self.frames_since_keyframe >= self.max_keyframe_interval
+        
+        if is_keyframe:
+            self.keyframe_thumbnail = thumbnail
+            self.frames_since_keyframe = 0
+        else:
+            self.frames_since_keyframe += 1
+        
+        return is_keyframe
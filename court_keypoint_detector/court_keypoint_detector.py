@@ -1,19 +1,33 @@
 from ultralytics import YOLO
 import supervision as sv
-import pickle
-import os
 import sys
 sys.path.append('../')
+from utils import InferenceStats, read_stub, save_stub
+from .camera_motion_detector import CameraMotionDetector
 
 class CourtKeypointDetector:
-    def __init__(self, model_path):
+    def __init__(self, model_path, batch_size=1, motion_threshold=8.0, max_keyframe_interval=None):
         """
         Initialize the CourtKeypointDetector with a YOLO model.
         
         Args:
             model_path (str): Path to the YOLO model file.
+            batch_size (int): Number of keyframes sent to the model per call.
+            motion_threshold (float): Camera motion above which a frame becomes
+                a keyframe, see CameraMotionDetector.
+            max_keyframe_interval (int, optional): Force a keyframe after this
+                many frames without camera motion.
         """
         self.model = YOLO(model_path)
+        self.model_path = model_path
+        self.batch_size = batch_size
+        self.inference_stats = InferenceStats()
+        self.camera_motion_detector = CameraMotionDetector(
+            motion_threshold=motion_threshold,
+            max_keyframe_interval=max_keyframe_interval
+        )
+        self.keyframe_count = 0
+        self.last_keypoints = None
 
     def predict(self, frame, read_from_stub=False, stub_path=None):
         """
@@ -27,21 +41,126 @@ class CourtKeypointDetector:
         Returns:
             list: List of detected keypoint coordinates.
         """
-        if read_from_stub and stub_path is not None and os.path.exists(stub_path):
-            with open(stub_path, 'rb') as f:
-                keypoints = pickle.load(f)
+        keypoints = read_stub(read_from_stub, stub_path)
+        if keypoints is not None:
             return keypoints
 
         results = self.model(frame, imgsz=640)
+        keypoints = self.process_results(results)
         
+        save_stub(stub_path, keypoints)
+                
+        return keypoints
+
+    def predict_frames(self, frames, read_from_stub=False, stub_path=None, cache=None):
+        """
+        Build a per-frame court keypoint track.
+        
+        The model only runs on keyframes, i.e. frames where the camera moved
+        since the previous keyframe. While the camera holds still, frames
+        reuse the keypoints of the last keyframe. Keyframes are sent to the
+        model in batches of `batch_size`.
+        
+        Args:
+            frames (iterable): Video frames, as a list or a VideoSource.
+            read_from_stub (bool): Whether to read from cached results.
+            stub_path (str): Path to cached detection results.
+            cache (StubCache, optional): Content-addressed cache of stage results.
+                Only used when `frames` is a VideoSource, whose file is hashed.
+        
+        Returns:
+            list: Detected keypoint coordinates for each frame.
+        """
+        cache_key = None
+        if cache is not None and getattr(frames, 'video_path', None) is not None:
+            motion_detector = self.camera_motion_detector
+            cache_key = cache.make_key('court_keypoints', video_path=frames.video_path,
+                                       model_path=self.model_path, imgsz=640,
+                                       motion_threshold=motion_detector.motion_threshold,
+                                       downscale_width=motion_detector.downscale_width,
+                                       max_keyframe_interval=motion_detector.max_keyframe_interval)
+            court_keypoints = cache.get(cache_key)
+            if court_keypoints is not None:
+                return court_keypoints
+        
+        court_keypoints = read_stub(read_from_stub, stub_path)
+        if court_keypoints is not None:
+            return court_keypoints
+        
+        self.camera_motion_detector.reset()
+        keyframe_keypoints = []
+        frame_keyframes = []
+        batch = []
+        
+        for frame in frames:
+            if self.camera_motion_detector.is_keyframe(frame):
+                batch.append(frame.copy())
+                if len(batch) == self.batch_size:
+                    keyframe_keypoints.extend(self.predict_batch(batch))
+                    batch = []
+            
+            # Index of the keyframe this frame takes its keypoints from
+            frame_keyframes.append(len(keyframe_keypoints) + len(batch) - 1)
+        
+        if batch:
+            keyframe_keypoints.extend(self.predict_batch(batch))
+        
+        self.keyframe_count = len(keyframe_keypoints)
+        court_keypoints = [keyframe_keypoints[keyframe] for keyframe in frame_keyframes]
+        
+        save_stub(stub_path, court_keypoints)
+        if cache_key is not None:
+            cache.put(cache_key, court_keypoints)
+        
+        return court_keypoints
+
+    def track_frame(self, frame):
+        """
+        Get the court keypoints of the next frame of a stream.
+        
+        As in predict_frames(), the model only runs when the camera moved
+        since the last keyframe; other frames reuse its keypoints.
+        
+        Args:
+            frame (numpy.ndarray): Input video frame.
+        
+        Returns:
+            list: Detected keypoint coordinates for the frame.
+        """
+        if self.camera_motion_detector.is_keyframe(frame):
+            self.last_keypoints = self.predict_batch([frame])[0]
+            self.keyframe_count += 1
+        return self.last_keypoints
+
+    def predict_batch(self, batch):
+        """
+        Detect court keypoints in a batch of frames with a single model call.
+        
+        Args:
+            batch (list): Video frames.
+        
+        Returns:
+            list: Detected keypoint coordinates for each frame of the batch.
+        """
+        start_time = self.inference_stats.start()
+        results = self.model(batch, imgsz=640)
+        self.inference_stats.record(start_time, len(batch))
+        
+        return [self.process_results([result]) for result in results]
+
+    def process_results(self, results):
+        """
+        Extract the keypoint coordinates from the model output.
+        
+        Args:
+            results (list): Model results for a single frame.
+        
+        Returns:
+            list: List of detected keypoint coordinates.
+        """
         keypoints = []
         for result in results:
             if result.keypoints is not None:
                 keypoints = result.keypoints.xy.cpu().numpy()[0]
                 break
-        
-        if stub_path is not None:
-            with open(stub_path, 'wb') as f:
-                pickle.dump(keypoints, f)
-                
         return keypoints
\ No newline at end of file
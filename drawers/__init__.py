@@ -3,4 +3,6 @@ from .ball_aquisition_drawer import BallAquisitionDrawer
 from .pass_and_interceptions_drawer import PassInterceptionDrawer
 from .tactical_view_drawer import TacticalViewDrawer
 from .speed_and_distance_drawer import SpeedAndDistanceDrawer
-from .team_ball_control_drawer import TeamBallControlDrawer
\ No newline at end of file
+from .team_ball_control_drawer import TeamBallControlDrawer
+from .hud_compositor import HudCompositor
+from .parallel_renderer import ParallelRenderer, SharedArrays
\ No newline at end of file
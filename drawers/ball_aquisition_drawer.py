@@ -1,5 +1,5 @@
 import cv2
-from .utils import draw_triangle, get_center_of_bbox
+from .utils import MarkerSpriteAtlas, get_center_of_bbox
 
 class BallAquisitionDrawer:
     def __init__(self):
@@ -8,7 +8,7 @@ class BallAquisitionDrawer:
         
         This drawer visualizes ball possession and acquisition.
         """
-        pass
+        self.marker_atlas = MarkerSpriteAtlas()
     
     def draw_ball_acquisition(self, frame, ball_acquisition, player_detections, team_assignments):
         """
@@ -35,7 +35,7 @@ class BallAquisitionDrawer:
                 color = (0, 255, 0) if team_id == 1 else (0, 0, 255)
                 
                 # Draw triangle above player with ball
-                frame = draw_triangle(frame, player_bbox, color)
+                frame = self.marker_atlas.draw_triangle(frame, player_bbox, color)
                 
                 # Draw ball
                 if isinstance(ball_bbox, list) and len(ball_bbox) >= 4:
@@ -0,0 +1,132 @@
+import cv2
+import numpy as np
+
+class HudCompositor:
+    def __init__(self):
+        """
+        Initialize the HudCompositor.
+        
+        Each text panel is rendered once into a sprite with a mask of the
+        pixels it covers, and pasted into every frame with a single slice
+        assignment. A panel is only rendered again when its text or style
+        changes.
+        """
+        self.panels = {}
+        self.render_count = 0
+        self.blit_count = 0
+    
+    def render_panel(self, text, font_scale=0.7, thickness=2, text_color=(255, 255, 255),
+                     bg_color=(0, 0, 0), padding=5):
+        """
+        Render text with a background rectangle into a sprite, as
+        draw_text_with_background() draws it on a frame.
+        
+        Args:
+            text (str): Text to draw.
+            font_scale (float): Font scale factor.
+            thickness (int): Text thickness.
+            text_color (tuple): RGB color for the text.
+            bg_color (tuple): RGB color for the background.
+            padding (int): Padding around the text.
+        
+        Returns:
+            dict: Sprite image, boolean mask of the drawn pixels, offset (x, y)
+                of the sprite from the text position, the opaque background
+                box (x1, y1, x2, y2) and the (ys, xs) of drawn pixels outside it.
+        """
+        font = cv2.FONT_HERSHEY_SIMPLEX
+        (text_width, text_height), baseline = cv2.getTextSize(text, font, font_scale, thickness)
+        
+        # Extra margin in case strokes spill over the background rectangle
+        margin = thickness
+        origin_x = padding + margin
+        origin_y = text_height + padding + margin
+        sprite_width = text_width + 2 * (padding + margin) + 1
+        sprite_height = text_height + baseline + 2 * (padding + margin) + 1
+        
+        # The text is drawn once. Pixels it covers are found by comparing the
+        # sprite with its initial value, chosen so that the text color shows
+        # on it; the background box is part of the mask anyway
+        initial_value = 255 if max(text_color) == 0 else 0
+        sprite = np.full((sprite_height, sprite_width, 3), initial_value, dtype=np.uint8)
+        
+        box_x1, box_y1 = origin_x - padding, origin_y - text_height - padding
+        box_x2, box_y2 = origin_x + text_width + padding, origin_y + baseline + padding
+        cv2.rectangle(sprite, (box_x1, box_y1), (box_x2, box_y2), bg_color, cv2.FILLED)
+        cv2.putText(sprite, text, (origin_x, origin_y), font, font_scale, text_color, thickness)
+        
+        # Drawn pixels outside the filled rectangle, usually none. Only the
+        # margin strips around the rectangle are compared
+        strips = [(0, box_y1, 0, sprite_width), (box_y2 + 1, sprite_height, 0, sprite_width),
+                  (box_y1, box_y2 + 1, 0, box_x1), (box_y1, box_y2 + 1, box_x2 + 1, sprite_width)]
+        spill_ys, spill_xs = [np.empty(0, dtype=np.intp)], [np.empty(0, dtype=np.intp)]
+        for strip_y1, strip_y2, strip_x1, strip_x2 in strips:
+            strip = sprite[strip_y1:strip_y2, strip_x1:strip_x2]
+            if strip.size == 0 or cv2.norm(cv2.absdiff(strip, (initial_value,) * 4), cv2.NORM_INF) == 0:
+                continue
+            strip_ys, strip_xs = np.nonzero((strip != initial_value).any(axis=2))
+            spill_ys.append(strip_ys + strip_y1)
+            spill_xs.append(strip_xs + strip_x1)
+        spill_pixels = (np.concatenate(spill_ys), np.concatenate(spill_xs))
+        
+        mask = np.zeros((sprite_height, sprite_width), dtype=bool)
+        mask[box_y1:box_y2 + 1, box_x1:box_x2 + 1] = True
+        mask[spill_pixels] = True
+        
+        self.render_count += 1
+        return {
+            'sprite': sprite,
+            'mask': mask,
+            'offset': (-origin_x, -origin_y),
+            'opaque_box': (box_x1, box_y1, box_x2 + 1, box_y2 + 1),
+            'spill_pixels': spill_pixels
+        }
+    
+    def draw_panel(self, frame, name, text, position, **style):
+        """
+        Draw a named text panel on the frame, re-rendering it only if its text
+        or style changed since the last frame.
+        
+        Args:
+            frame (numpy.ndarray): Input video frame.
+            name (str): Name identifying the panel.
+            text (str): Text to draw.
+            position (tuple): Position (x, y) for the text.
+            **style: Style arguments of render_panel().
+        
+        Returns:
+            numpy.ndarray: Frame with the panel drawn.
+        """
+        panel_key = (text, tuple(sorted(style.items())))
+        panel = self.panels.get(name)
+        if panel is None or panel['key'] != panel_key:
+            panel = self.render_panel(text, **style)
+            panel['key'] = panel_key
+            self.panels[name] = panel
+        sprite = panel['sprite']
+        
+        x1 = position[0] + panel['offset'][0]
+        y1 = position[1] + panel['offset'][1]
+        x2 = x1 + sprite.shape[1]
+        y2 = y1 + sprite.shape[0]
+        self.blit_count += 1
+        
+        if x1 >= 0 and y1 >= 0 and x2 <= frame.shape[1] and y2 <= frame.shape[0]:
+            # Opaque background in one slice assignment, then any stroke pixels spilling out of it
+            box_x1, box_y1, box_x2, box_y2 = panel['opaque_box']
+            frame[y1+box_y1:y1+box_y2, x1+box_x1:x1+box_x2] = sprite[box_y1:box_y2, box_x1:box_x2]
+            spill_ys, spill_xs = panel['spill_pixels']
+            if len(spill_ys) > 0:
+                frame[y1 + spill_ys, x1 + spill_xs] = sprite[spill_ys, spill_xs]
+            return frame
+        
+        # Panel partly outside the frame: clip it and copy through the mask
+        frame_x1, frame_y1 = max(x1, 0), max(y1, 0)
+        frame_x2, frame_y2 = min(x2, frame.shape[1]), min(y2, frame.shape[0])
+        if frame_x1 >= frame_x2 or frame_y1 >= frame_y2:
+            return frame
+        
+        sprite_region = (slice(frame_y1 - y1, frame_y2 - y1), slice(frame_x1 - x1, frame_x2 - x1))
+        np.copyto(frame[frame_y1:frame_y2, frame_x1:frame_x2], sprite[sprite_region],
+                  where=panel['mask'][sprite_region][..., None])
+        return frame
@@ -0,0 +1,206 @@
+from concurrent.futures import ProcessPoolExecutor
+from collections import deque
+from multiprocessing import shared_memory
+import numpy as np
+
+# Per-worker state, set up once by init_render_worker
+worker_state = {}
+
+def init_render_worker(shared_memory_name, slot_shape, render_frame):
+    """
+    Attach a pool worker to the shared frame slots.
+    
+    Args:
+        shared_memory_name (str): Name of the shared memory block.
+        slot_shape (tuple): Shape (slots, height, width, 3) of the frame slots.
+        render_frame (callable): Function drawing on a frame, called as
+            render_frame(frame, frame_num).
+    """
+    frame_memory = shared_memory.SharedMemory(name=shared_memory_name)
+    worker_state['frame_memory'] = frame_memory
+    worker_state['frame_slots'] = np.ndarray(slot_shape, dtype=np.uint8, buffer=frame_memory.buf)
+    worker_state['render_frame'] = render_frame
+
+def render_slot_chunk(first_slot, first_frame_num, frame_count):
+    """
+    Render consecutive frames in place in their slots.
+    
+    Args:
+        first_slot (int): Slot of the first frame of the chunk.
+        first_frame_num (int): Index of the first frame in the video.
+        frame_count (int): Number of frames in the chunk.
+    """
+    frame_slots = worker_state['frame_slots']
+    render_frame = worker_state['render_frame']
+    
+    for offset in range(frame_count):
+        frame = frame_slots[first_slot + offset]
+        rendered_frame = render_frame(frame, first_frame_num + offset)
+        if rendered_frame is not frame:
+            frame[:] = rendered_frame
+
+class SharedArrays:
+    def __init__(self, arrays):
+        """
+        Copy named arrays into one shared memory block.
+        
+        Pickling a SharedArrays only carries the name of the block and the
+        layout of the arrays, so pool workers it is sent to attach to the
+        same memory instead of each receiving a copy of the data.
+        
+        Args:
+            arrays (dict): Arrays keyed by name.
+        """
+        self.layout = []
+        size = 0
+        for name, array in arrays.items():
+            array = np.asarray(array)
+            size = -(-size // 64) * 64
+            self.layout.append((name, size, array.shape, array.dtype))
+            size += array.nbytes
+        
+        self.shared_memory = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        self.owner = True
+        self.attach()
+        for name, array in arrays.items():
+            self.arrays[name][...] = array
+    
+    def attach(self):
+        """
+        Create the array views on the shared memory block.
+        """
+        self.arrays = {
+            name: np.ndarray(shape, dtype=dtype, buffer=self.shared_memory.buf, offset=offset)
+            for name, offset, shape, dtype in self.layout
+        }
+    
+    def __getstate__(self):
+        return {'name': self.shared_memory.name, 'layout': self.layout}
+    
+    def __setstate__(self, state):
+        self.shared_memory = shared_memory.SharedMemory(name=state['name'])
+        self.layout = state['layout']
+        self.owner = False
+        self.attach()
+    
+    def close(self):
+        """
+        Detach from the shared memory block, and release it in the process that created it.
+        """
+        self.arrays = {}
+        self.shared_memory.close()
+        if self.owner:
+            self.shared_memory.unlink()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+class ParallelRenderer:
+    def __init__(self, render_frame, n_workers, frame_shape, chunk_size=8):
+        """
+        Initialize a process pool that draws on video frames in parallel.
+        
+        The video is split into chunks of consecutive frames. Frames are
+        copied into slots of a shared memory block, drawn on in place by the
+        workers and handed back in frame order. `render_frame` must depend
+        only on the frame and its index, not on frames rendered before, since
+        each worker only sees its own chunks. It is passed to the workers once,
+        at start-up, together with the analysis results it holds: every
+        worker gets its own copy of them, except for arrays held in a
+        SharedArrays block, which the workers attach to.
+        
+        Args:
+            render_frame (callable): Picklable function drawing on a frame,
+                called as render_frame(frame, frame_num) and returning the frame.
+            n_workers (int): Number of worker processes.
+            frame_shape (tuple): Shape (height, width, 3) of the video frames.
+            chunk_size (int): Number of consecutive frames per task.
+        """
+        self.chunk_size = chunk_size
+        self.chunk_count = 2 * n_workers
+        slot_shape = (self.chunk_count * chunk_size,) + tuple(frame_shape)
+        
+        self.frame_memory = shared_memory.SharedMemory(create=True, size=int(np.prod(slot_shape)))
+        self.frame_slots = np.ndarray(slot_shape, dtype=np.uint8, buffer=self.frame_memory.buf)
+        
+        self.executor = ProcessPoolExecutor(
+            max_workers=n_workers,
+            initializer=init_render_worker,
+            initargs=(self.frame_memory.name, slot_shape, render_frame)
+        )
+    
+    def collect_chunk(self, chunk):
+        """
+        Wait for a chunk and copy its rendered frames out of their slots.
+        
+        Args:
+            chunk (tuple): First slot, frame count and future of the chunk.
+        
+        Returns:
+            list: Rendered frames of the chunk.
+        """
+        first_slot, frame_count, future = chunk
+        future.result()
+        return [self.frame_slots[first_slot + offset].copy() for offset in range(frame_count)]
+    
+    def render(self, frames):
+        """
+        Render a stream of frames.
+        
+        Args:
+            frames (iterable): Video frames, as a list or a VideoSource.
+        
+        Yields:
+            numpy.ndarray: Rendered frames, in the order of the input.
+        """
+        pending = deque()
+        free_chunks = deque(range(self.chunk_count))
+        
+        chunk_index = None
+        frame_count = 0
+        first_frame_num = 0
+        
+        for frame_num, frame in enumerate(frames):
+            if chunk_index is None:
+                if not free_chunks:
+                    done_chunk = pending.popleft()
+                    free_chunks.append(done_chunk[0] // self.chunk_size)
+                    yield from self.collect_chunk(done_chunk)
+                chunk_index = free_chunks.popleft()
+                first_frame_num = frame_num
+                frame_count = 0
+            
+            first_slot = chunk_index * self.chunk_size
+            self.frame_slots[first_slot + frame_count] = frame
+            frame_count += 1
+            
+            if frame_count == self.chunk_size:
+                future = self.executor.submit(render_slot_chunk, first_slot, first_frame_num, frame_count)
+                pending.append((first_slot, frame_count, future))
+                chunk_index = None
+        
+        if chunk_index is not None:
+            first_slot = chunk_index * self.chunk_size
+            future = self.executor.submit(render_slot_chunk, first_slot, first_frame_num, frame_count)
+            pending.append((first_slot, frame_count, future))
+        
+        while pending:
+            yield from self.collect_chunk(pending.popleft())
+    
+    def close(self):
+        """
+        Stop the workers and release the shared memory block.
+        """
+        self.executor.shutdown()
+        del self.frame_slots
+        self.frame_memory.close()
+        self.frame_memory.unlink()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
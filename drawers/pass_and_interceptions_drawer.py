@@ -1,5 +1,4 @@
-import cv2
-from .utils import draw_text_with_background
+from .hud_compositor import HudCompositor
 
 class PassInterceptionDrawer:
     def __init__(self):
@@ -10,6 +9,7 @@ class PassInterceptionDrawer:
         """
         self.pass_count = {1: 0, 2: 0}
         self.interception_count = {1: 0, 2: 0}
+        self.hud = HudCompositor()
     
     def update_pass_count(self, passes):
         """
@@ -47,12 +47,12 @@ class PassInterceptionDrawer:
         """
         # Draw team 1 stats
         team1_text = f"Team 1 - Passes: {self.pass_count[1]}, Interceptions: {self.interception_count[1]}"
-        frame = draw_text_with_background(frame, team1_text, (50, 50), 
-                                        text_color=(255, 255, 255), bg_color=(0, 128, 0))
+        frame = self.hud.draw_panel(frame, 'team1', team1_text, (50, 50),
+                                    text_color=(255, 255, 255), bg_color=(0, 128, 0))
         
         # Draw team 2 stats
         team2_text = f"Team 2 - Passes: {self.pass_count[2]}, Interceptions: {self.interception_count[2]}"
-        frame = draw_text_with_background(frame, team2_text, (50, 90), 
-                                        text_color=(255, 255, 255), bg_color=(0, 0, 128))
+        frame = self.hud.draw_panel(frame, 'team2', team2_text, (50, 90),
+                                    text_color=(255, 255, 255), bg_color=(0, 0, 128))
         
         return frame
\ No newline at end of file
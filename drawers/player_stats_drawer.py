@@ -1,5 +1,5 @@
 import cv2
-from .utils import draw_ellipse
+from .utils import MarkerSpriteAtlas
 
 class PlayerStatsDrawer:
     def __init__(self):
@@ -8,7 +8,7 @@ class PlayerStatsDrawer:
         
         This drawer visualizes player statistics including speed and distance.
         """
-        pass
+        self.marker_atlas = MarkerSpriteAtlas()
     
     def draw_player_stats(self, frame, player_detections, team_assignments):
         """
@@ -39,7 +39,7 @@ class PlayerStatsDrawer:
             color = (0, 255, 0) if team_id == 1 else (0, 0, 255)
             
             # Draw player ellipse
-            frame = draw_ellipse(frame, actual_bbox, color, track_id)
+            frame = self.marker_atlas.draw_ellipse(frame, actual_bbox, color, track_id)
             
             # Draw speed and distance info
             if speed > 0 or distance > 0:
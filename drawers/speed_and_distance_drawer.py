@@ -1,4 +1,3 @@
-import cv2
 from .utils import draw_text_with_background
 
 class SpeedAndDistanceDrawer:
@@ -6,7 +5,9 @@ class SpeedAndDistanceDrawer:
         """
         Initialize the SpeedAndDistanceDrawer.
         
-        This drawer visualizes speed and distance statistics for teams.
+        This drawer visualizes speed and distance statistics for teams. Its
+        panels change on nearly every frame, so they are drawn directly
+        instead of through a HudCompositor, which would re-render them anyway.
         """
         pass
     
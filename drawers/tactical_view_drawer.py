@@ -15,6 +15,10 @@ class TacticalViewDrawer:
         
         # Create a simple court background if image not available
         self.court_image = self.create_court_background()
+        
+        # Court background resized to the overlay size, rendered once per size
+        self.scaled_court_size = None
+        self.scaled_court_image = None
     
     def create_court_background(self, width=940, height=500):
         """
@@ -49,10 +53,31 @@ class TacticalViewDrawer:
         
         return court
     
+    def get_scaled_court_image(self, width, height):
+        """
+        Get the court background resized to the overlay size, resizing only
+        when the size changes.
+        
+        Args:
+            width (int): Overlay width in pixels.
+            height (int): Overlay height in pixels.
+        
+        Returns:
+            numpy.ndarray: Court background of the requested size.
+        """
+        if self.scaled_court_size != (width, height):
+            self.scaled_court_image = cv2.resize(self.court_image, (width, height), interpolation=cv2.INTER_AREA)
+            self.scaled_court_size = (width, height)
+        return self.scaled_court_image
+    
     def draw_tactical_view(self, frame, tactical_detections, team_assignments, ball_acquisition):
         """
         Draw the tactical view with player positions.
         
+        The court background is pre-scaled to the overlay size and copied into
+        the frame, and the player markers are drawn directly into that region,
+        with sizes scaled to match.
+        
         Args:
             frame (numpy.ndarray): Input video frame.
             tactical_detections (dict): Dictionary of tactical positions.
@@ -62,12 +87,26 @@ class TacticalViewDrawer:
         Returns:
             numpy.ndarray: Frame with tactical view overlay.
         """
-        # Create a copy of the court image
-        tactical_frame = self.court_image.copy()
+        # Size of the tactical view in the corner of the main frame
+        tactical_height = frame.shape[0] // 3
+        tactical_width = int(tactical_height * (self.court_image.shape[1] / self.court_image.shape[0]))
         
-        # Scale factor to convert from feet to pixels
-        scale_x = tactical_frame.shape[1] / self.court_width
-        scale_y = tactical_frame.shape[0] / self.court_height
+        # Overlay the pre-scaled court on the main frame
+        y_offset = frame.shape[0] - tactical_height - 20
+        x_offset = frame.shape[1] - tactical_width - 20
+        
+        tactical_frame = frame[y_offset:y_offset+tactical_height, x_offset:x_offset+tactical_width]
+        tactical_frame[:] = self.get_scaled_court_image(tactical_width, tactical_height)
+        
+        # Scale factor to convert from feet to overlay pixels
+        scale_x = tactical_width / self.court_width
+        scale_y = tactical_height / self.court_height
+        
+        # Marker sizes were designed for the full-size court image
+        marker_scale = tactical_height / self.court_image.shape[0]
+        player_radius = max(1, round(8 * marker_scale))
+        outline_radius = max(1, round(10 * marker_scale))
+        possession_radius = max(1, round(15 * marker_scale))
         
         # Draw players
         for player_id, position in tactical_detections.items():
@@ -77,35 +116,25 @@ class TacticalViewDrawer:
                 y = int(position[1] * scale_y)
                 
                 # Ensure coordinates are within bounds
-                x = max(0, min(x, tactical_frame.shape[1] - 1))
-                y = max(0, min(y, tactical_frame.shape[0] - 1))
+                x = max(0, min(x, tactical_width - 1))
+                y = max(0, min(y, tactical_height - 1))
                 
                 # Get team color
                 team_id = team_assignments.get(player_id, 1)
                 color = (0, 255, 0) if team_id == 1 else (0, 0, 255)
                 
                 # Draw player circle
-                cv2.circle(tactical_frame, (x, y), 8, color, -1)
-                cv2.circle(tactical_frame, (x, y), 10, (255, 255, 255), 2)
+                cv2.circle(tactical_frame, (x, y), player_radius, color, -1)
+                cv2.circle(tactical_frame, (x, y), outline_radius, (255, 255, 255), max(1, round(2 * marker_scale)))
                 
                 # Draw player ID
-                cv2.putText(tactical_frame, str(player_id), (x-5, y+5),
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.4, (255, 255, 255), 1)
+                cv2.putText(tactical_frame, str(player_id),
+                           (x - round(5 * marker_scale), y + round(5 * marker_scale)),
+                           cv2.FONT_HERSHEY_SIMPLEX, 0.4 * marker_scale, (255, 255, 255), 1)
                 
                 # Highlight ball possession
                 if player_id in ball_acquisition:
-                    cv2.circle(tactical_frame, (x, y), 15, (0, 255, 255), 3)
-        
-        # Resize tactical view to fit in corner of main frame
-        tactical_height = frame.shape[0] // 3
-        tactical_width = int(tactical_height * (tactical_frame.shape[1] / tactical_frame.shape[0]))
-        tactical_resized = cv2.resize(tactical_frame, (tactical_width, tactical_height))
-        
-        # Overlay on main frame
-        y_offset = frame.shape[0] - tactical_height - 20
-        x_offset = frame.shape[1] - tactical_width - 20
-        
-        frame[y_offset:y_offset+tactical_height, x_offset:x_offset+tactical_width] = tactical_resized
+                    cv2.circle(tactical_frame, (x, y), possession_radius, (0, 255, 255), max(1, round(3 * marker_scale)))
         
         # Draw border around tactical view
         cv2.rectangle(frame, (x_offset-2, y_offset-2), 
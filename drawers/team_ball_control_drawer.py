@@ -1,5 +1,4 @@
-import cv2
-from .utils import draw_text_with_background
+from .hud_compositor import HudCompositor
 
 class TeamBallControlDrawer:
     def __init__(self):
@@ -9,6 +8,7 @@ class TeamBallControlDrawer:
         This drawer visualizes team ball control statistics.
         """
         self.team_ball_control_frames = {1: 0, 2: 0}
+        self.hud = HudCompositor()
     
     def update_team_ball_control(self, ball_acquisition):
         """
@@ -52,12 +52,12 @@ class TeamBallControlDrawer:
         
         # Draw team 1 ball control
         team1_text = f"Team 1 Ball Control: {percentages[1]:.1f}%"
-        frame = draw_text_with_background(frame, team1_text, (50, 210), 
-                                        text_color=(255, 255, 255), bg_color=(0, 128, 0))
+        frame = self.hud.draw_panel(frame, 'team1', team1_text, (50, 210),
+                                    text_color=(255, 255, 255), bg_color=(0, 128, 0))
         
         # Draw team 2 ball control
         team2_text = f"Team 2 Ball Control: {percentages[2]:.1f}%"
-        frame = draw_text_with_background(frame, team2_text, (50, 250), 
-                                        text_color=(255, 255, 255), bg_color=(0, 0, 128))
+        frame = self.hud.draw_panel(frame, 'team2', team2_text, (50, 250),
+                                    text_color=(255, 255, 255), bg_color=(0, 0, 128))
         
         return frame
\ No newline at end of file
@@ -20,10 +20,28 @@ def draw_ellipse(frame, bbox, color, track_id=None):
     x_center, _ = get_center_of_bbox(bbox)
     width = get_bbox_width(bbox)
     
+    return draw_ellipse_marker(frame, (x_center, y2), (int(width), int(0.35 * width)), color, track_id)
+
+def draw_ellipse_marker(frame, center, axes, color, track_id=None):
+    """
+    Draw the ellipse marker and track ID box of draw_ellipse() at a given center.
+    
+    Args:
+        frame (numpy.ndarray): Input video frame.
+        center (tuple): Center (x, y) of the ellipse, at the feet of the player.
+        axes (tuple): Half axes (width, height) of the ellipse.
+        color (tuple): RGB color for the ellipse.
+        track_id (int, optional): Track ID to display.
+    
+    Returns:
+        numpy.ndarray: Frame with drawn ellipse.
+    """
+    x_center, y2 = center
+    
     cv2.ellipse(
         frame,
         center=(x_center, y2),
-        axes=(int(width), int(0.35 * width)),
+        axes=axes,
         angle=0.0,
         startAngle=-45,
         endAngle=235,
@@ -77,6 +95,22 @@ def draw_triangle(frame, bbox, color):
     y = int(bbox[1])
     x, _ = get_center_of_bbox(bbox)
     
+    return draw_triangle_marker(frame, (x, y), color)
+
+def draw_triangle_marker(frame, tip, color):
+    """
+    Draw the triangle marker of draw_triangle() with its tip at a given point.
+    
+    Args:
+        frame (numpy.ndarray): Input video frame.
+        tip (tuple): Position (x, y) of the bottom tip of the triangle.
+        color (tuple): RGB color for the triangle.
+    
+    Returns:
+        numpy.ndarray: Frame with drawn triangle.
+    """
+    x, y = tip
+    
     triangle_points = np.array([
         [x, y],
         [x - 10, y - 20],
@@ -87,6 +121,213 @@ def draw_triangle(frame, bbox, color):
     
     return frame
 
+def blit_sprite(frame, sprite, position):
+    """
+    Copy a sprite from MarkerSpriteAtlas into the frame, clipped to its borders.
+    
+    Args:
+        frame (numpy.ndarray): Input video frame.
+        sprite (dict): Sprite of MarkerSpriteAtlas.render_sprite().
+        position (tuple): Frame position (x, y) of the sprite's anchor.
+    
+    Returns:
+        numpy.ndarray: Frame with the sprite.
+    """
+    x, y = position
+    x1, y1, x2, y2 = sprite['bounds']
+    
+    if x + x1 >= 0 and y + y1 >= 0 and x + x2 <= frame.shape[1] and y + y2 <= frame.shape[0]:
+        # Opaque block in one slice assignment, the remaining pixels by index
+        if sprite['block'] is not None:
+            block_x, block_y = sprite['block_offset']
+            block_height, block_width = sprite['block'].shape[:2]
+            frame[y+block_y:y+block_y+block_height, x+block_x:x+block_x+block_width] = sprite['block']
+        pixel_ys, pixel_xs, pixel_colors = sprite['pixels']
+        frame[pixel_ys + y, pixel_xs + x] = pixel_colors
+    else:
+        pixel_ys, pixel_xs, pixel_colors = sprite['all_pixels']
+        pixel_ys = pixel_ys + y
+        pixel_xs = pixel_xs + x
+        inside = (pixel_ys >= 0) & (pixel_ys < frame.shape[0]) & (pixel_xs >= 0) & (pixel_xs < frame.shape[1])
+        frame[pixel_ys[inside], pixel_xs[inside]] = pixel_colors[inside]
+    
+    # Antialiased pixels, blended with the frame
+    blend_ys, blend_xs, blend_colors, blend_weights = sprite['blend_pixels']
+    if len(blend_ys) > 0:
+        blend_ys = blend_ys + y
+        blend_xs = blend_xs + x
+        inside = (blend_ys >= 0) & (blend_ys < frame.shape[0]) & (blend_xs >= 0) & (blend_xs < frame.shape[1])
+        background = frame[blend_ys[inside], blend_xs[inside]].astype(np.uint16)
+        frame[blend_ys[inside], blend_xs[inside]] = blend_colors[inside] + (background * blend_weights[inside] + 127) // 255
+    return frame
+
+class MarkerSpriteAtlas:
+    def __init__(self, width_bucket=4, max_sprites=4096):
+        """
+        Initialize a cache of pre-rendered player markers.
+        
+        The markers of draw_ellipse() and draw_triangle() are rendered once
+        per (color, track ID, bbox width bucket) into a sprite with a mask, and
+        drawing a player is then a copy of the sprite's pixels. Box widths are rounded to the
+        middle of their bucket; a bucket of 1 draws exactly like draw_ellipse(),
+        except for markers cut by the frame border, which OpenCV rasterizes
+        slightly differently when clipping.
+        
+        Args:
+            width_bucket (int): Width in pixels of the bbox width buckets.
+            max_sprites (int): Number of cached sprites after which the
+                cache is cleared.
+        """
+        self.width_bucket = width_bucket
+        self.max_sprites = max_sprites
+        self.sprites = {}
+        self.hits = 0
+        self.misses = 0
+    
+    def render_sprite(self, draw_marker, canvas_size, anchor, block=None):
+        """
+        Render a marker into a sprite of its drawn pixels.
+        
+        The marker is drawn on a black and on a white canvas; pixels that
+        match on both were drawn, whatever their color. Pixels that differ
+        but were touched are antialiased, and are blended with the frame
+        from both canvases: on a background b they become
+        black + (white - black) * b / 255.
+        
+        Args:
+            draw_marker (callable): Draws the marker on a canvas at the anchor.
+            canvas_size (tuple): Canvas size (width, height).
+            anchor (tuple): Anchor position (x, y) of the marker in the canvas.
+            block (tuple, optional): Canvas box (x1, y1, x2, y2) the marker fully
+                covers, copied as one block instead of pixel by pixel.
+        
+        Returns:
+            dict: Sprite for blit_sprite(), with pixel positions relative to the anchor.
+        """
+        width, height = canvas_size
+        anchor_x, anchor_y = anchor
+        black_canvas = draw_marker(np.zeros((height, width, 3), dtype=np.uint8), anchor)
+        white_canvas = draw_marker(np.full((height, width, 3), 255, dtype=np.uint8), anchor)
+        mask = (black_canvas == white_canvas).all(axis=2)
+        
+        blend_mask = ~mask & ~((black_canvas == 0) & (white_canvas == 255)).all(axis=2)
+        
+        pixel_ys, pixel_xs = np.nonzero(mask)
+        blend_ys, blend_xs = np.nonzero(blend_mask)
+        sprite = {
+            'bounds': (-anchor_x, -anchor_y, width - anchor_x, height - anchor_y),
+            'all_pixels': (pixel_ys - anchor_y, pixel_xs - anchor_x, black_canvas[pixel_ys, pixel_xs]),
+            'blend_pixels': (blend_ys - anchor_y, blend_xs - anchor_x, black_canvas[blend_ys, blend_xs],
+                             white_canvas[blend_ys, blend_xs] - black_canvas[blend_ys, blend_xs]),
+            'block': None
+        }
+        
+        if block is not None and mask[block[1]:block[3], block[0]:block[2]].all():
+            sprite['block'] = black_canvas[block[1]:block[3], block[0]:block[2]].copy()
+            sprite['block_offset'] = (block[0] - anchor_x, block[1] - anchor_y)
+            mask[block[1]:block[3], block[0]:block[2]] = False
+            pixel_ys, pixel_xs = np.nonzero(mask)
+        
+        sprite['pixels'] = (pixel_ys - anchor_y, pixel_xs - anchor_x, black_canvas[pixel_ys, pixel_xs])
+        return sprite
+    
+    def get_sprite(self, key, draw_marker, canvas_size, anchor, block=None):
+        """
+        Get a cached sprite, rendering it on a miss.
+        
+        Args:
+            key (tuple): Cache key of the sprite.
+            draw_marker (callable): Draws the marker on a canvas at the anchor.
+            canvas_size (tuple): Canvas size (width, height).
+            anchor (tuple): Anchor position (x, y) of the marker in the canvas.
+            block (tuple, optional): Fully covered canvas box, see render_sprite().
+        
+        Returns:
+            dict: Sprite for blit_sprite().
+        """
+        sprite = self.sprites.get(key)
+        if sprite is not None:
+            self.hits += 1
+            return sprite
+        
+        self.misses += 1
+        if len(self.sprites) >= self.max_sprites:
+            self.sprites.clear()
+        sprite = self.render_sprite(draw_marker, canvas_size, anchor, block)
+        self.sprites[key] = sprite
+        return sprite
+    
+    def draw_ellipse(self, frame, bbox, color, track_id=None):
+        """
+        Draw the marker of draw_ellipse() from the sprite cache.
+        
+        Args:
+            frame (numpy.ndarray): Input video frame.
+            bbox (list): Bounding box coordinates [x1, y1, x2, y2].
+            color (tuple): RGB color for the ellipse.
+            track_id (int, optional): Track ID to display.
+        
+        Returns:
+            numpy.ndarray: Frame with drawn ellipse.
+        """
+        y2 = int(bbox[3])
+        x_center, _ = get_center_of_bbox(bbox)
+        width = get_bbox_width(bbox)
+        if self.width_bucket > 1:
+            width = (int(width) // self.width_bucket) * self.width_bucket + self.width_bucket / 2
+        axes = (int(width), int(0.35 * width))
+        
+        # Room for the ellipse, the ID box below it and the line thickness
+        half_width = max(axes[0], 20) + 4
+        top = axes[1] + 4
+        bottom = max(axes[1], 25) + 4
+        
+        # Long IDs overflow the ID box; make room for the whole label, drawn
+        # as draw_ellipse_marker() draws it, 20 below the center
+        if track_id is not None:
+            (text_width, text_height), baseline = cv2.getTextSize(f"{track_id}", cv2.FONT_HERSHEY_SIMPLEX, 0.6, 2)
+            text_x1 = -8 if track_id <= 99 else -18
+            half_width = max(half_width, -text_x1 + 4, text_x1 + text_width + 4)
+            top = max(top, text_height - 20 + 4)
+            bottom = max(bottom, 20 + baseline + 4)
+        
+        # The filled track ID box, 41 x 21 pixels starting 20 left of and 5 below the center
+        id_box = None
+        if track_id is not None:
+            id_box = (half_width - 20, top + 5, half_width + 21, top + 26)
+        
+        sprite = self.get_sprite(
+            ('ellipse', tuple(color), track_id, axes),
+            lambda canvas, anchor: draw_ellipse_marker(canvas, anchor, axes, color, track_id),
+            (2 * half_width + 1, top + bottom + 1),
+            (half_width, top),
+            id_box
+        )
+        return blit_sprite(frame, sprite, (x_center, y2))
+    
+    def draw_triangle(self, frame, bbox, color):
+        """
+        Draw the marker of draw_triangle() from the sprite cache.
+        
+        Args:
+            frame (numpy.ndarray): Input video frame.
+            bbox (list): Bounding box coordinates [x1, y1, x2, y2].
+            color (tuple): RGB color for the triangle.
+        
+        Returns:
+            numpy.ndarray: Frame with drawn triangle.
+        """
+        y = int(bbox[1])
+        x, _ = get_center_of_bbox(bbox)
+        
+        sprite = self.get_sprite(
+            ('triangle', tuple(color)),
+            lambda canvas, anchor: draw_triangle_marker(canvas, anchor, color),
+            (27, 27),
+            (13, 23)
+        )
+        return blit_sprite(frame, sprite, (x, y))
+
 def get_center_of_bbox(bbox):
     """
     Calculate the center point of a bounding box.
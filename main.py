@@ -8,23 +8,25 @@ import sys
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 # Import all necessary modules
-from trackers import PlayerTracker, BallTracker
+from player_tracker import PlayerTracker
+from ball_tracker import BallTracker
 from team_assigner import TeamAssigner
 from court_keypoint_detector import CourtKeypointDetector
 from ball_aquisition import BallAquisitionDetector
 from pass_and_interception_detector import PassAndInterceptionDetector
 from speed_and_distance_calculator import SpeedAndDistanceCalculator
-from tactical_view_converter import TacticalViewConverter
-from utils import read_video, save_video
+from tactical_view_converter import TacticalViewConverter, HomographyTracker
+from utils import VideoSource, LiveVideoSource, VideoSink, StubCache, TrackTable
+from pipeline import PipelineRunner, PipelineStage, StreamAnalyzer, LiveRunner
 from drawers import (
-    PlayerTracksDrawer,
-    BallTracksDrawer,
-    CourtKeypointDrawer,
+    PlayerStatsDrawer,
+    BallAquisitionDrawer,
     TeamBallControlDrawer,
-    FrameNumberDrawer,
     PassInterceptionDrawer,
     TacticalViewDrawer,
-    SpeedAndDistanceDrawer
+    SpeedAndDistanceDrawer,
+    ParallelRenderer,
+    SharedArrays
 )
 
 # Import configuration
@@ -33,156 +35,646 @@ from configs import(
     PLAYER_DETECTOR_PATH,
     BALL_DETECTOR_PATH,
     COURT_KEYPOINT_DETECTOR_PATH,
-    OUTPUT_VIDEO_PATH
+    OUTPUT_VIDEO_PATH,
+    PREFETCH_FRAMES,
+    INFERENCE_BATCH_SIZE,
+    STUB_CACHE_MAX_SIZE_MB,
+    LIVE_LATENCY_BUDGET_MS,
+    HOMOGRAPHY_REFINE_THRESHOLD,
+    HOMOGRAPHY_SMOOTHING
 )
 
-def main():
-    parser = argparse.ArgumentParser(description='Basketball Video Analysis')
-    parser.add_argument('input_video', type=str, help='Path to input video file')
-    parser.add_argument('--output_video', type=str, default=OUTPUT_VIDEO_PATH,
-                        help='Path to output video file')
-    parser.add_argument('--stub_path', type=str, default=STUBS_DEFAULT_PATH,
-                        help='Path to stub directory')
+def get_cumulative_team_counts(frame_teams, frame_count):
+    """
+    Count the events of each team up to every frame.
     
-    args = parser.parse_args()
+    Args:
+        frame_teams (list): (frame index, team id) pair of each event.
+        frame_count (int): Number of frames.
     
-    # Read video
-    video_frames = read_video(args.input_video)
+    Returns:
+        numpy.ndarray: Counts of teams 1 and 2 up to and including each
+            frame, of shape (frames, 2).
+    """
+    counts = np.zeros((frame_count, 2), dtype=np.int64)
+    for frame_num, team in frame_teams:
+        if team in (1, 2) and frame_num < frame_count:
+            counts[frame_num, team - 1] += 1
+    return np.cumsum(counts, axis=0)
+
+class FrameDrawer:
+    def __init__(self, court_image_path):
+        """
+        Initialize the FrameDrawer with all drawers.
+        
+        Args:
+            court_image_path (str): Path to the court image of the tactical view.
+        """
+        self.player_stats_drawer = PlayerStatsDrawer()
+        self.ball_acquisition_drawer = BallAquisitionDrawer()
+        self.team_ball_control_drawer = TeamBallControlDrawer()
+        self.pass_interception_drawer = PassInterceptionDrawer()
+        self.speed_distance_drawer = SpeedAndDistanceDrawer()
+        self.tactical_view_drawer = TacticalViewDrawer(court_image_path)
     
-    # Initialize trackers and detectors
-    player_tracker = PlayerTracker(PLAYER_DETECTOR_PATH)
-    ball_tracker = BallTracker(BALL_DETECTOR_PATH)
+    def draw_frame(self, frame, frame_num, frame_data):
+        """
+        Draw the analysis results of one frame.
+        
+        The cumulative stats overlays are drawn from the running counts of
+        the frame data instead of the drawers' own counters, so frames can
+        be drawn in any order.
+        
+        Args:
+            frame (numpy.ndarray): Video frame, drawn on in place.
+            frame_num (int): Index of the frame in the video.
+            frame_data (dict): Analysis results of the frame, see
+                FrameRenderer.get_frame_data(). Missing results are None.
+        
+        Returns:
+            numpy.ndarray: Rendered frame.
+        """
+        player_detection = frame_data['player_detection'] or {}
+        team_assignment = frame_data['team_assignment']
+        ball_acquisition = frame_data['ball_acquisition'] or {}
+        speed_stats = frame_data['speed_stats'] or {}
+        
+        # Player boxes with their speed and distance, as PlayerStatsDrawer reads them
+        player_stats = {}
+        for player_id, bbox in player_detection.items():
+            if player_id in speed_stats:
+                player_stats[player_id] = {'x1': bbox[0], 'y1': bbox[1], 'x2': bbox[2], 'y2': bbox[3],
+                                           **speed_stats[player_id]}
+            else:
+                player_stats[player_id] = bbox
+        
+        # Draw players and the ball owner
+        frame = self.player_stats_drawer.draw_player_stats(frame, player_stats, team_assignment)
+        frame = self.ball_acquisition_drawer.draw_ball_acquisition(
+            frame,
+            ball_acquisition,
+            player_detection,
+            team_assignment
+        )
+        
+        # Draw team ball control
+        self.team_ball_control_drawer.team_ball_control_frames = dict(frame_data['team_ball_control_frames'])
+        frame = self.team_ball_control_drawer.draw_team_ball_control(frame)
+        
+        # Draw pass and interception stats
+        self.pass_interception_drawer.pass_count = dict(frame_data['pass_counts'])
+        self.pass_interception_drawer.interception_count = dict(frame_data['interception_counts'])
+        frame = self.pass_interception_drawer.draw_pass_and_interception_stats(frame)
+        
+        # Draw speed and distance
+        if frame_data['speed_stats'] is not None:
+            frame = self.speed_distance_drawer.draw_speed_and_distance_stats(frame, player_stats, team_assignment)
+        
+        # Draw tactical view
+        if frame_data['tactical_detections'] is not None:
+            frame = self.tactical_view_drawer.draw_tactical_view(
+                frame,
+                frame_data['tactical_detections'],
+                team_assignment,
+                ball_acquisition
+            )
+        
+        return frame
+
+class FrameRenderer:
+    # Arrays and track tables that share_arrays() moves into shared memory
+    array_names = ['speed_distance_track_ids', 'speed_distance_stats', 'team_ball_control_frames',
+                   'pass_counts', 'interception_counts']
+    track_table_names = ['player_tracks', 'ball_tracks', 'tactical_tracks']
     
-    # Initialize court keypoint detector
-    court_keypoint_detector = CourtKeypointDetector(COURT_KEYPOINT_DETECTOR_PATH)
+    def __init__(self, court_image_path, court_keypoints, player_tracks, ball_tracks, player_assignment,
+                 ball_acquisition, passes, interceptions, speed_distance_calculator, speed_distance_track_ids,
+                 speed_distance_stats, tactical_view_converter, tactical_tracks):
+        """
+        Initialize the FrameRenderer with the analysis results of the whole video.
+        
+        Rendering a frame only depends on the frame and its index, so frames
+        can be rendered in any order, e.g. by a ParallelRenderer.
+        """
+        self.court_keypoints = court_keypoints
+        self.player_tracks = player_tracks if isinstance(player_tracks, TrackTable) else TrackTable.from_tracks(player_tracks)
+        self.ball_tracks = ball_tracks if isinstance(ball_tracks, TrackTable) else TrackTable.from_tracks(ball_tracks)
+        self.player_assignment = player_assignment
+        self.ball_acquisition = ball_acquisition
+        self.speed_distance_calculator = speed_distance_calculator
+        self.speed_distance_track_ids = speed_distance_track_ids
+        self.speed_distance_stats = speed_distance_stats
+        self.tactical_view_converter = tactical_view_converter
+        self.tactical_tracks = tactical_tracks
+        self.shared_arrays = None
+        
+        # Running counts of the stats overlays at every frame
+        frame_count = len(ball_acquisition)
+        self.team_ball_control_frames = get_cumulative_team_counts(
+            [(frame_num, ball_acquisition_frame['team_ball_control'])
+             for frame_num, ball_acquisition_frame in enumerate(ball_acquisition)
+             if 'team_ball_control' in ball_acquisition_frame],
+            frame_count
+        )
+        self.pass_counts = get_cumulative_team_counts(
+            [(pass_info['frame'], pass_info.get('team', 1)) for pass_info in passes],
+            frame_count
+        )
+        self.interception_counts = get_cumulative_team_counts(
+            [(interception_info['frame'], interception_info.get('intercepting_team', 1))
+             for interception_info in interceptions],
+            frame_count
+        )
+        
+        self.frame_drawer = FrameDrawer(court_image_path)
+    
+    def get_arrays(self):
+        """
+        Get the dense analysis arrays keyed by name.
+        
+        Returns:
+            dict: The speed and distance arrays, the running counts and the
+                arrays of the track tables.
+        """
+        arrays = {name: getattr(self, name) for name in self.array_names}
+        for table_name in self.track_table_names:
+            for name, array in getattr(self, table_name).to_arrays().items():
+                arrays[f"{table_name}/{name}"] = array
+        return arrays
+    
+    def set_arrays(self, arrays):
+        """
+        Use the dense analysis arrays of get_arrays(), without copying them.
+        
+        Args:
+            arrays (dict): Arrays keyed by name, as returned by get_arrays().
+        """
+        for name in self.array_names:
+            setattr(self, name, arrays[name])
+        for table_name in self.track_table_names:
+            prefix = f"{table_name}/"
+            setattr(self, table_name, TrackTable.from_arrays({
+                name[len(prefix):]: array for name, array in arrays.items() if name.startswith(prefix)
+            }))
+    
+    def share_arrays(self):
+        """
+        Move the dense analysis arrays into shared memory.
+        
+        A ParallelRenderer pickles the renderer into every worker. Afterwards
+        the tracks, speed stats and running counts are no longer copied, the
+        workers attach to the shared block; the per-frame dictionaries (court
+        keypoints, team assignments, possession) are still copied. The block
+        must be closed once the workers have stopped.
+        
+        Returns:
+            SharedArrays: The shared memory block, usable as a context manager.
+        """
+        self.shared_arrays = SharedArrays(self.get_arrays())
+        self.set_arrays(self.shared_arrays.arrays)
+        return self.shared_arrays
+    
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        if self.shared_arrays is not None:
+            # Rebuilt from the shared block when unpickled
+            for name in self.array_names + self.track_table_names:
+                del state[name]
+        return state
+    
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if self.shared_arrays is not None:
+            self.set_arrays(self.shared_arrays.arrays)
+    
+    def get_frame_counts(self, counts, frame_num):
+        """
+        Look up the running counts of both teams at one frame.
+        
+        Args:
+            counts (numpy.ndarray): Cumulative counts of get_cumulative_team_counts().
+            frame_num (int): Index of the frame in the video; frames past the
+                analyzed ones get the final counts.
+        
+        Returns:
+            dict: {1: count, 2: count}.
+        """
+        if len(counts) == 0:
+            return {1: 0, 2: 0}
+        frame_counts = counts[min(frame_num, len(counts) - 1)]
+        return {1: int(frame_counts[0]), 2: int(frame_counts[1])}
+    
+    def get_frame_data(self, frame_num):
+        """
+        Look up the analysis results of one frame.
+        
+        Args:
+            frame_num (int): Index of the frame in the video.
+        
+        Returns:
+            dict: Analysis results of the frame, as drawn by FrameDrawer.draw_frame().
+        """
+        frame_data = {
+            'court_keypoints': self.court_keypoints[frame_num] if frame_num < len(self.court_keypoints) else None,
+            'player_detection': None,
+            'ball_detection': None,
+            'team_assignment': self.player_assignment[frame_num] if frame_num < len(self.player_assignment) else {},
+            'ball_acquisition': self.ball_acquisition[frame_num] if frame_num < len(self.ball_acquisition) else None,
+            'speed_stats': None,
+            'tactical_detections': None,
+            # Running counts up to this frame, for the cumulative stats overlays
+            'team_ball_control_frames': self.get_frame_counts(self.team_ball_control_frames, frame_num),
+            'pass_counts': self.get_frame_counts(self.pass_counts, frame_num),
+            'interception_counts': self.get_frame_counts(self.interception_counts, frame_num)
+        }
+        
+        if frame_num < len(self.player_tracks):
+            frame_data['player_detection'] = self.player_tracks.get_frame_range(frame_num, frame_num + 1).to_tracks()[0]
+        if frame_num < len(self.ball_tracks):
+            frame_data['ball_detection'] = self.ball_tracks.get_frame_range(frame_num, frame_num + 1).to_tracks()[0]
+        if frame_num < len(self.speed_distance_stats):
+            frame_data['speed_stats'] = self.speed_distance_calculator.get_frame_stats(
+                self.speed_distance_track_ids,
+                self.speed_distance_stats,
+                frame_num
+            )
+        if frame_num < self.tactical_tracks.frame_count:
+            frame_data['tactical_detections'] = self.tactical_view_converter.get_frame_tactical_detections(
+                self.tactical_tracks,
+                frame_num
+            )
+        return frame_data
+    
+    def __call__(self, frame, frame_num):
+        """
+        Draw the analysis results of one frame.
+        
+        Args:
+            frame (numpy.ndarray): Video frame, drawn on in place.
+            frame_num (int): Index of the frame in the video.
+        
+        Returns:
+            numpy.ndarray: Rendered frame.
+        """
+        return self.frame_drawer.draw_frame(frame, frame_num, self.get_frame_data(frame_num))
+
+def create_stream_analyzer(args, court_image_path, fps, player_tracker, ball_tracker, court_keypoint_detector):
+    """
+    Create the per-frame analyzer of the pipelined and live modes.
+    
+    Args:
+        args (argparse.Namespace): Command line arguments.
+        court_image_path (str): Path to the court image of the tactical view.
+        fps (float): Frame rate of the video.
+        player_tracker (PlayerTracker): Player detector and tracker.
+        ball_tracker (BallTracker): Ball detector.
+        court_keypoint_detector (CourtKeypointDetector): Court keypoint detector.
+    
+    Returns:
+        StreamAnalyzer: Analyzer with fresh team, possession and speed state.
+    """
+    homography_tracker = None
+    if args.homography_drift is not None:
+        homography_tracker = HomographyTracker(
+            drift_threshold=args.homography_drift,
+            refine_threshold=args.homography_refine,
+            smoothing=args.homography_smoothing
+        )
+    
+    return StreamAnalyzer(
+        player_tracker,
+        ball_tracker,
+        court_keypoint_detector,
+        TeamAssigner(),
+        TacticalViewConverter(court_image_path),
+        SpeedAndDistanceCalculator(frame_rate=fps),
+        court_speed=args.court_speed,
+        homography_tracker=homography_tracker
+    )
+
+def run_pipeline(args, video_source, player_tracker, ball_tracker, court_keypoint_detector):
+    """
+    Analyze and render the video in one pass with concurrent stages.
+    
+    Decoding, detection, analysis, drawing and encoding each run on their
+    own thread, connected by bounded queues, so the first frames are
+    written while later ones are still being decoded.
+    
+    Args:
+        args (argparse.Namespace): Command line arguments.
+        video_source (VideoSource): Input video.
+        player_tracker (PlayerTracker): Player detector and tracker.
+        ball_tracker (BallTracker): Ball detector.
+        court_keypoint_detector (CourtKeypointDetector): Court keypoint detector.
+    """
+    court_image_path = "./images/basketball_court.png"
+    stream_analyzer = create_stream_analyzer(args, court_image_path, video_source.fps, player_tracker,
+                                             ball_tracker, court_keypoint_detector)
+    frame_drawer = FrameDrawer(court_image_path)
+    
+    def draw(item):
+        item['frame'] = frame_drawer.draw_frame(item['frame'], item['frame_num'], item['frame_data'])
+        return item
     
+    pipeline_runner = PipelineRunner([
+        PipelineStage('detect', stream_analyzer.detect),
+        PipelineStage('analyze', stream_analyzer.analyze),
+        PipelineStage('draw', draw)
+    ], queue_size=args.pipeline_queue_size)
+    
+    # Decoded frames are copied, since prefetch buffers are reused once the next frame is read
+    items = ({'frame_num': frame_num, 'frame': frame.copy()} for frame_num, frame in enumerate(video_source))
+    
+    with VideoSink(args.output_video, fps=video_source.fps, frame_size=video_source.resolution) as video_sink:
+        for item in pipeline_runner.run(items):
+            video_sink.write(item['frame'])
+    
+    pipeline_runner.report()
+    player_tracker.inference_stats.report('Player detection')
+    ball_tracker.inference_stats.report('Ball detection')
+    court_keypoint_detector.inference_stats.report('Court keypoint detection')
+    print(f"Passes: {len(stream_analyzer.passes)}, interceptions: {len(stream_analyzer.interceptions)}")
+    print(f"Encoder backpressure stalls: {video_sink.backpressure_stalls}")
+    print(f"Analysis complete! Output saved to: {args.output_video}")
+
+def run_live(args, player_tracker, ball_tracker, court_keypoint_detector):
+    """
+    Analyze a live feed in real time within a per-frame latency budget.
+    
+    Passes, interceptions and possession changes are printed as soon as
+    their frame is analyzed, and rendered frames are written to the output
+    video. Frames that fall behind skip detection or are written without
+    the overlays, and the previous frame is written again in place of frames
+    dropped at capture, so the output plays back in sync with the feed.
+    
+    Args:
+        args (argparse.Namespace): Command line arguments.
+        player_tracker (PlayerTracker): Player detector and tracker.
+        ball_tracker (BallTracker): Ball detector.
+        court_keypoint_detector (CourtKeypointDetector): Court keypoint detector.
+    """
+    # A number selects a capture device; files are replayed at their native frame rate
+    source = int(args.input_video) if args.input_video.isdigit() else args.input_video
+    live_source = LiveVideoSource(source, pace=os.path.isfile(args.input_video))
+    
+    court_image_path = "./images/basketball_court.png"
+    stream_analyzer = create_stream_analyzer(args, court_image_path, live_source.fps, player_tracker,
+                                             ball_tracker, court_keypoint_detector)
+    
+    def print_event(event_type, event_info, latency):
+        print(f"[{latency * 1000:.0f} ms] {event_type}: {event_info}")
+    
+    live_runner = LiveRunner(
+        stream_analyzer,
+        FrameDrawer(court_image_path),
+        latency_budget=args.latency_budget_ms / 1000,
+        queue_size=args.pipeline_queue_size,
+        on_event=print_event
+    )
+    
+    with VideoSink(args.output_video, fps=live_source.fps, frame_size=live_source.resolution) as video_sink:
+        try:
+            for item in live_runner.run(live_source):
+                for _ in range(item['missing_frames']):
+                    video_sink.write(previous_frame)
+                video_sink.write(item['frame'])
+                previous_frame = item['frame']
+        except KeyboardInterrupt:
+            # Stopping a live feed is the normal way to end it
+            pass
+    
+    live_runner.report()
+    print(f"Passes: {len(stream_analyzer.passes)}, interceptions: {len(stream_analyzer.interceptions)}")
+    print(f"Analysis complete! Output saved to: {args.output_video}")
+
+def run_batch(args, video_source, stub_cache, player_tracker, ball_tracker, court_keypoint_detector):
+    """
+    Analyze the video stage by stage, then render it.
+    
+    Each stage makes its own pass over the video and caches its results,
+    so a rerun only recomputes the stages whose inputs changed.
+    
+    Args:
+        args (argparse.Namespace): Command line arguments.
+        video_source (VideoSource): Input video.
+        stub_cache (StubCache): Cache of stage results.
+        player_tracker (PlayerTracker): Player detector and tracker.
+        ball_tracker (BallTracker): Ball detector.
+        court_keypoint_detector (CourtKeypointDetector): Court keypoint detector.
+    """
     # Get player tracks
-    player_tracks = player_tracker.get_object_tracks(
-        video_frames,
-        read_from_stub=True,
-        stub_path=os.path.join(args.stub_path, 'player_track_stubs.pkl')
+    player_tracks = player_tracker.detect_frames(
+        video_source,
+        cache=stub_cache
     )
     
     # Get ball tracks
-    ball_tracks = ball_tracker.get_object_tracks(
-        video_frames,
-        read_from_stub=True,
-        stub_path=os.path.join(args.stub_path, 'ball_track_stubs.pkl')
+    ball_tracks = ball_tracker.detect_frames(
+        video_source,
+        cache=stub_cache
     )
     
-    # Get court keypoints
-    court_keypoints = court_keypoint_detector.get_court_keypoints(
-        video_frames,
-        read_from_stub=True,
-        stub_path=os.path.join(args.stub_path, 'court_key_points_stub.pkl')
+    # Get per-frame court keypoints, running the model only when the camera moves
+    court_keypoints = court_keypoint_detector.predict_frames(
+        video_source,
+        cache=stub_cache
     )
     
+    # Report detection latency and throughput (nothing is printed for cached stages)
+    player_tracker.inference_stats.report('Player detection')
+    ball_tracker.inference_stats.report('Ball detection')
+    if args.ball_roi:
+        print(f"Ball searches: {ball_tracker.roi_searches} crop, {ball_tracker.full_frame_searches} full frame")
+    court_keypoint_detector.inference_stats.report('Court keypoint detection')
+    if court_keypoint_detector.keyframe_count > 0:
+        print(f"Court keypoints: {court_keypoint_detector.keyframe_count} keyframes for {len(court_keypoints)} frames")
+    
     # Initialize team assigner
-    team_assigner = TeamAssigner()
-    team_assigner.choose_and_filter_players(court_keypoints, player_tracks)
+    if args.team_sample_frames is not None:
+        team_assigner = TeamAssigner(sampling=True, max_sample_frames=args.team_sample_frames,
+                                     n_workers=args.team_workers)
+    else:
+        team_assigner = TeamAssigner(n_workers=args.team_workers)
     
     # Get player team assignments
-    player_assignment = team_assigner.get_player_teams_across_frames(
-        video_frames,
+    player_assignment = team_assigner.assign_teams(
+        video_source,
         player_tracks,
-        read_from_stub=True,
-        stub_path=os.path.join(args.stub_path, 'player_assignment_stub.pkl')
+        cache=stub_cache
     )
+    if team_assigner.sampled_frame_count > 0:
+        print(f"Team assignment read {team_assigner.sampled_frame_count} sampled frames")
     
     # Initialize ball acquisition detector
     ball_acquisition_detector = BallAquisitionDetector()
-    ball_acquisition = ball_acquisition_detector.get_ball_acquisition_across_frames(
+    ball_acquisition = ball_acquisition_detector.detect_frames_vectorized(
         player_tracks,
-        ball_tracks
+        ball_tracks,
+        assign_to_team=True,
+        team_assignments=player_assignment
     )
     
     # Initialize pass and interception detector
     pass_interception_detector = PassAndInterceptionDetector()
-    passes = pass_interception_detector.detect_passes(ball_acquisition, player_assignment)
-    interceptions = pass_interception_detector.detect_interceptions(ball_acquisition, player_assignment)
+    passes, interceptions = pass_interception_detector.detect_passes_and_interceptions(
+        ball_acquisition,
+        player_assignment
+    )
     
     # Initialize tactical view converter
     court_image_path="./images/basketball_court.png"
     tactical_view_converter = TacticalViewConverter(court_image_path)
     
-    # Initialize speed and distance calculator
-    speed_distance_calculator = SpeedAndDistanceCalculator()
-    speed_distance_data = speed_distance_calculator.add_speed_and_distance_to_tracks(player_tracks)
-    
-    # Initialize all drawers
-    player_tracks_drawer = PlayerTracksDrawer()
-    ball_tracks_drawer = BallTracksDrawer()
-    court_keypoint_drawer = CourtKeypointDrawer()
-    team_ball_control_drawer = TeamBallControlDrawer()
-    frame_number_drawer = FrameNumberDrawer()
-    pass_interception_drawer = PassInterceptionDrawer()
-    tactical_view_drawer = TacticalViewDrawer(court_image_path)
-    speed_distance_drawer = SpeedAndDistanceDrawer()
-    
-    # Process each frame
-    output_video_frames = []
-    
-    for frame_num, frame in enumerate(video_frames):
-        frame = frame.copy()
-        
-        # Draw court keypoints
-        if frame_num in court_keypoints:
-            frame = court_keypoint_drawer.draw_keypoints(frame, court_keypoints[frame_num])
-        
-        # Draw player tracks
-        if frame_num in player_tracks:
-            frame = player_tracks_drawer.draw_tracks(
-                frame,
-                player_tracks[frame_num],
-                player_assignment[frame_num] if frame_num in player_assignment else {},
-                ball_acquisition[frame_num] if frame_num in ball_acquisition else None
-            )
-        
-        # Draw ball tracks
-        if frame_num in ball_tracks:
-            frame = ball_tracks_drawer.draw_tracks(frame, ball_tracks[frame_num])
-        
-        # Draw team ball control
-        frame = team_ball_control_drawer.draw_team_ball_control(
-            frame,
-            frame_num,
-            ball_acquisition
+    # Project every player's foot position with one homography per frame, cached with the tracks
+    homography_tracker = None
+    if args.homography_drift is not None:
+        homography_tracker = HomographyTracker(
+            drift_threshold=args.homography_drift,
+            refine_threshold=args.homography_refine,
+            smoothing=args.homography_smoothing
         )
-        
-        # Draw pass and interception stats
-        frame = pass_interception_drawer.draw_pass_interception_stats(
-            frame,
-            passes,
-            interceptions,
-            player_assignment
+    tactical_tracks = tactical_view_converter.add_tactical_positions(
+        player_tracks,
+        court_keypoints,
+        cache=stub_cache,
+        homography_tracker=homography_tracker
+    )
+    if homography_tracker is not None:
+        print(f"Homography tracking stats: {homography_tracker.get_stats()}")
+    
+    # Initialize speed and distance calculator
+    speed_distance_calculator = SpeedAndDistanceCalculator(frame_rate=video_source.fps)
+    if args.court_speed:
+        speed_distance_track_ids, speed_distance_stats = speed_distance_calculator.calculate_court_speed_and_distance(
+            tactical_tracks,
+            court_keypoints,
+            tactical_view_converter
         )
-        
-        # Draw speed and distance
-        if frame_num in speed_distance_data:
-            frame = speed_distance_drawer.draw_speed_and_distance(
-                frame,
-                speed_distance_data[frame_num]
-            )
-        
-        # Draw tactical view
-        if frame_num in court_keypoints and frame_num in player_tracks:
-            frame = tactical_view_drawer.draw_tactical_view(
-                frame,
-                tactical_view_converter.court_image_path,
-                court_keypoints[frame_num],
-                player_tracks[frame_num],
-                player_assignment[frame_num] if frame_num in player_assignment else {},
-                ball_acquisition[frame_num] if frame_num in ball_acquisition else None
-            )
-        
-        # Draw frame number
-        frame = frame_number_drawer.draw_frame_number(frame, frame_num)
-        
-        output_video_frames.append(frame)
+    else:
+        speed_distance_track_ids, speed_distance_stats = speed_distance_calculator.calculate_speed_and_distance(player_tracks)
     
-    # Save output video
-    save_video(output_video_frames, args.output_video)
+    # Draw the analysis on each frame, streaming rendered frames straight to the encoder
+    frame_renderer = FrameRenderer(
+        court_image_path,
+        court_keypoints,
+        player_tracks,
+        ball_tracks,
+        player_assignment,
+        ball_acquisition,
+        passes,
+        interceptions,
+        speed_distance_calculator,
+        speed_distance_track_ids,
+        speed_distance_stats,
+        tactical_view_converter,
+        tactical_tracks
+    )
+    
+    # Remaining frames are flushed and the output video finalized when the sink closes
+    with VideoSink(args.output_video, fps=video_source.fps, frame_size=video_source.resolution) as video_sink:
+        if args.render_workers > 1:
+            frame_shape = (video_source.height, video_source.width, 3)
+            # Workers attach to the tracks and speed stats instead of each getting a copy
+            with frame_renderer.share_arrays(), \
+                    ParallelRenderer(frame_renderer, args.render_workers, frame_shape) as parallel_renderer:
+                for frame in parallel_renderer.render(video_source):
+                    video_sink.write(frame)
+        else:
+            for frame_num, frame in enumerate(video_source):
+                video_sink.write(frame_renderer(frame.copy(), frame_num))
+    
+    if video_source.prefetcher is not None:
+        print(f"Decode prefetch stats: {video_source.prefetcher.get_stats()}")
+    print(f"Encoder backpressure stalls: {video_sink.backpressure_stalls}")
     print(f"Analysis complete! Output saved to: {args.output_video}")
 
+def main():
+    parser = argparse.ArgumentParser(description='Basketball Video Analysis')
+    parser.add_argument('input_video', type=str,
+                        help='Path to input video file (or capture device index / stream URL with --live)')
+    parser.add_argument('--output_video', type=str, default=OUTPUT_VIDEO_PATH,
+                        help='Path to output video file')
+    parser.add_argument('--stub_path', type=str, default=STUBS_DEFAULT_PATH,
+                        help='Path to stub directory')
+    parser.add_argument('--cache_size_mb', type=int, default=STUB_CACHE_MAX_SIZE_MB,
+                        help='Maximum size of the stub directory before least recently used results are evicted')
+    parser.add_argument('--prefetch', type=int, default=PREFETCH_FRAMES,
+                        help='Number of frames decoded ahead on a background thread (0 to disable)')
+    parser.add_argument('--frame_store', type=str, default=None,
+                        help='Path of an on-disk frame store so later passes reuse decoded frames')
+    parser.add_argument('--batch_size', type=int, default=INFERENCE_BATCH_SIZE,
+                        help='Number of frames sent to each detection model per call')
+    parser.add_argument('--detection_stride', type=int, default=1,
+                        help='Detect players and ball on every Nth frame and interpolate in between')
+    parser.add_argument('--team_sample_frames', type=int, default=None,
+                        help='Assign teams by per-track voting over at most this many sampled frames')
+    parser.add_argument('--team_workers', type=int, default=0,
+                        help='Number of worker processes extracting jersey colors for team assignment')
+    parser.add_argument('--ball_roi', action='store_true',
+                        help='Search for the ball in a crop around its predicted position')
+    parser.add_argument('--court_speed', action='store_true',
+                        help='Compute speed and distance from court coordinates instead of a fixed pixel scale')
+    parser.add_argument('--render_workers', type=int, default=0,
+                        help='Number of worker processes drawing on frames in parallel chunks')
+    parser.add_argument('--homography_drift', type=float, default=None,
+                        help='Reuse the previous court homography while keypoints drift less than this many pixels')
+    parser.add_argument('--homography_refine', type=float, default=HOMOGRAPHY_REFINE_THRESHOLD,
+                        help='Keypoint drift in pixels below which a tracked homography is refit and kept smoothed')
+    parser.add_argument('--homography_smoothing', type=float, default=HOMOGRAPHY_SMOOTHING,
+                        help='Weight of the previous tracked homography in the moving average (0 to disable)')
+    parser.add_argument('--pipeline', action='store_true',
+                        help='Run decode, detection, analysis, drawing and encoding concurrently in one pass')
+    parser.add_argument('--pipeline_queue_size', type=int, default=4,
+                        help='Maximum number of frames waiting between two pipeline stages')
+    parser.add_argument('--live', action='store_true',
+                        help='Analyze a capture device index, stream URL or file paced at its frame rate in real time')
+    parser.add_argument('--latency_budget_ms', type=float, default=LIVE_LATENCY_BUDGET_MS,
+                        help='Per-frame latency budget of live mode before detection or drawing is skipped')
+    
+    args = parser.parse_args()
+    
+    # Initialize trackers and detectors
+    player_tracker = PlayerTracker(
+        PLAYER_DETECTOR_PATH,
+        batch_size=args.batch_size,
+        detection_stride=args.detection_stride
+    )
+    ball_tracker = BallTracker(
+        BALL_DETECTOR_PATH,
+        batch_size=args.batch_size,
+        roi_tracking=args.ball_roi,
+        detection_stride=args.detection_stride
+    )
+    
+    # Initialize court keypoint detector
+    court_keypoint_detector = CourtKeypointDetector(COURT_KEYPOINT_DETECTOR_PATH, batch_size=args.batch_size)
+    
+    # Live mode reads its own source and analyzes frames as they are captured
+    if args.live:
+        run_live(args, player_tracker, ball_tracker, court_keypoint_detector)
+        return
+    
+    # Open video; frames are decoded lazily by each stage that iterates over it.
+    # The pipelined mode reads the video once, so it has no use for a frame store
+    video_source = VideoSource(
+        args.input_video,
+        prefetch=args.prefetch,
+        frame_store_path=None if args.pipeline else args.frame_store
+    )
+    
+    # Stage results are cached by video content, model weights and parameters
+    stub_cache = StubCache(args.stub_path, max_size_bytes=args.cache_size_mb * 1024 * 1024)
+    
+    try:
+        # Pipelined mode streams every frame through all stages in a single pass
+        if args.pipeline:
+            run_pipeline(args, video_source, player_tracker, ball_tracker, court_keypoint_detector)
+        else:
+            run_batch(args, video_source, stub_cache, player_tracker, ball_tracker, court_keypoint_detector)
+    finally:
+        # The frame store only lives for this run, even if it failed
+        if video_source.frame_store is not None:
+            video_source.frame_store.close(delete=True)
+
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -1 +1,2 @@
-from .pass_and_interception_detector import PassAndInterceptionDetector
\ No newline at end of file
+from .pass_and_interception_detector import PassAndInterceptionDetector
+from .pass_and_interception_engine import PassAndInterceptionEngine
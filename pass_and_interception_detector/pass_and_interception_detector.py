@@ -1,3 +1,5 @@
+from .pass_and_interception_engine import PassAndInterceptionEngine
+
 class PassAndInterceptionDetector:
     def __init__(self):
         """
@@ -8,52 +10,41 @@ class PassAndInterceptionDetector:
         """
         pass
     
-    def detect_passes(self, ball_acquisition_frames, team_assignments):
+    def detect_passes_and_interceptions(self, ball_acquisition_frames, team_assignments):
         """
-        Detect successful passes between teammates.
+        Detect passes and interceptions in a single pass over the frames.
         
         Args:
             ball_acquisition_frames (list): List of ball acquisition data for each frame.
             team_assignments (list): List of team assignments for each frame.
         
         Returns:
-            list: List of detected passes with frame numbers and player IDs.
+            tuple: Lists of detected passes and interceptions.
         """
         passes = []
-        previous_ball_owner = None
-        previous_team = None
+        interceptions = []
+        
+        engine = PassAndInterceptionEngine()
+        for event_type, event_info in engine.process_frames(ball_acquisition_frames, team_assignments):
+            if event_type == 'pass':
+                passes.append(event_info)
+            else:
+                interceptions.append(event_info)
         
-        for frame_num, ball_acquisition in enumerate(ball_acquisition_frames):
-            current_ball_owner = None
-            current_team = None
-            
-            # Find current ball owner
-            for player_id, _ in ball_acquisition.items():
-                if player_id != 'team' and player_id != 'team_ball_control':
-                    current_ball_owner = player_id
-                    if frame_num < len(team_assignments) and player_id in team_assignments[frame_num]:
-                        current_team = team_assignments[frame_num][player_id]
-                    break
-            
-            # Detect pass if ball ownership changed within the same team
-            if (previous_ball_owner is not None and 
-                current_ball_owner is not None and 
-                previous_ball_owner != current_ball_owner and
-                previous_team == current_team and
-                previous_team is not None):
-                
-                pass_info = {
-                    'frame': frame_num,
-                    'from_player': previous_ball_owner,
-                    'to_player': current_ball_owner,
-                    'team': current_team
-                }
-                passes.append(pass_info)
-            
-            if current_ball_owner is not None:
-                previous_ball_owner = current_ball_owner
-                previous_team = current_team
+        return passes, interceptions
+    
+    def detect_passes(self, ball_acquisition_frames, team_assignments):
+        """
+        Detect successful passes between teammates.
         
+        Args:
+            ball_acquisition_frames (list): List of ball acquisition data for each frame.
+            team_assignments (list): List of team assignments for each frame.
+        
+        Returns:
+            list: List of detected passes with frame numbers and player IDs.
+        """
+        passes, _ = self.detect_passes_and_interceptions(ball_acquisition_frames, team_assignments)
         return passes
     
     def detect_interceptions(self, ball_acquisition_frames, team_assignments):
@@ -67,35 +58,5 @@ class PassAndInterceptionDetector:
         Returns:
             list: List of detected interceptions with frame numbers and team changes.
         """
-        interceptions = []
-        previous_team = None
-        
-        for frame_num, ball_acquisition in enumerate(ball_acquisition_frames):
-            current_team = None
-            current_ball_owner = None
-            
-            # Find current ball owner and team
-            for player_id, _ in ball_acquisition.items():
-                if player_id != 'team' and player_id != 'team_ball_control':
-                    current_ball_owner = player_id
-                    if frame_num < len(team_assignments) and player_id in team_assignments[frame_num]:
-                        current_team = team_assignments[frame_num][player_id]
-                    break
-            
-            # Detect interception if team possession changed
-            if (previous_team is not None and 
-                current_team is not None and 
-                previous_team != current_team):
-                
-                interception_info = {
-                    'frame': frame_num,
-                    'intercepting_player': current_ball_owner,
-                    'intercepting_team': current_team,
-                    'previous_team': previous_team
-                }
-                interceptions.append(interception_info)
-            
-            if current_team is not None:
-                previous_team = current_team
-        
-        return interceptions
\ No newline at end of file
+        _, interceptions = self.detect_passes_and_interceptions(ball_acquisition_frames, team_assignments)
+        return interceptions
@@ -0,0 +1,114 @@
+class PassAndInterceptionEngine:
+    def __init__(self, on_pass=None, on_interception=None):
+        """
+        Initialize the PassAndInterceptionEngine.
+        
+        The engine detects passes and interceptions incrementally, one frame
+        of ball possession at a time, so events are available while the video
+        is still being processed. It only keeps the previous ball owner and
+        teams between frames.
+        
+        Args:
+            on_pass (callable, optional): Called with each pass dictionary.
+            on_interception (callable, optional): Called with each interception dictionary.
+        """
+        self.on_pass = on_pass
+        self.on_interception = on_interception
+        self.reset()
+    
+    def reset(self):
+        """
+        Forget the previous ball owner so the next frame starts a new sequence.
+        """
+        # Last frame with an owner, for passes
+        self.previous_ball_owner = None
+        self.previous_owner_team = None
+        # Last frame with an owner of known team, for interceptions
+        self.previous_team = None
+    
+    def get_ball_owner(self, ball_acquisition, team_assignment):
+        """
+        Find the player holding the ball in a frame and their team.
+        
+        Args:
+            ball_acquisition (dict): Ball acquisition data for the frame.
+            team_assignment (dict): Team assignments for the frame.
+        
+        Returns:
+            tuple: Owner player id and team id, each None if unknown.
+        """
+        for player_id in ball_acquisition:
+            if player_id != 'team' and player_id != 'team_ball_control':
+                return player_id, team_assignment.get(player_id, None)
+        return None, None
+    
+    def update(self, frame_num, ball_acquisition, team_assignment=None):
+        """
+        Process the ball possession of the next frame.
+        
+        Args:
+            frame_num (int): Index of the frame.
+            ball_acquisition (dict): Ball acquisition data for the frame.
+            team_assignment (dict, optional): Team assignments for the frame.
+        
+        Returns:
+            list: ('pass', pass_info) and ('interception', interception_info)
+                events detected in this frame.
+        """
+        current_ball_owner, current_team = self.get_ball_owner(ball_acquisition, team_assignment or {})
+        events = []
+        
+        # Pass if ball ownership changed within the same team
+        if (self.previous_ball_owner is not None and
+            current_ball_owner is not None and
+            self.previous_ball_owner != current_ball_owner and
+            self.previous_owner_team == current_team and
+            self.previous_owner_team is not None):
+            
+            pass_info = {
+                'frame': frame_num,
+                'from_player': self.previous_ball_owner,
+                'to_player': current_ball_owner,
+                'team': current_team
+            }
+            events.append(('pass', pass_info))
+            if self.on_pass is not None:
+                self.on_pass(pass_info)
+        
+        # Interception if team possession changed
+        if (self.previous_team is not None and
+            current_team is not None and
+            self.previous_team != current_team):
+            
+            interception_info = {
+                'frame': frame_num,
+                'intercepting_player': current_ball_owner,
+                'intercepting_team': current_team,
+                'previous_team': self.previous_team
+            }
+            events.append(('interception', interception_info))
+            if self.on_interception is not None:
+                self.on_interception(interception_info)
+        
+        if current_ball_owner is not None:
+            self.previous_ball_owner = current_ball_owner
+            self.previous_owner_team = current_team
+        if current_team is not None:
+            self.previous_team = current_team
+        
+        return events
+    
+    def process_frames(self, ball_acquisition_frames, team_assignments):
+        """
+        Detect events over a sequence of frames, lazily.
+        
+        Args:
+            ball_acquisition_frames (iterable): Ball acquisition data for each frame.
+            team_assignments (list): List of team assignments for each frame.
+        
+        Yields:
+            tuple: Event type ('pass' or 'interception') and event dictionary.
+        """
+        for frame_num, ball_acquisition in enumerate(ball_acquisition_frames):
+            team_assignment = team_assignments[frame_num] if frame_num < len(team_assignments) else {}
+            yield from self.update(frame_num, ball_acquisition, team_assignment)
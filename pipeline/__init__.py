@@ -0,0 +1,3 @@
+from .pipeline_runner import PipelineRunner, PipelineStage
+from .stream_analyzer import StreamAnalyzer
+from .live_runner import LiveRunner
\ No newline at end of file
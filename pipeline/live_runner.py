@@ -0,0 +1,258 @@
+import time
+from .pipeline_runner import PipelineRunner, PipelineStage
+
+class LiveRunner:
+    def __init__(self, stream_analyzer, frame_drawer, latency_budget=0.2, queue_size=2, on_event=None,
+                 max_skipped_detections=5, max_stale_time=0.5, max_undrawn_frames=5):
+        """
+        Initialize a real-time runner on top of a PipelineRunner.
+        
+        Frames go through the detect, analyze and draw stages like in the
+        pipelined mode, but each frame has a latency budget counted from its
+        capture. The time each stage takes is tracked with a moving average:
+        a frame that could not get through detection, analysis and drawing
+        within its budget any more skips the detectors and reuses the last
+        detections, and a frame that could not be drawn in time is passed on
+        as captured, without the overlays. Analysis runs on every frame and is cheap, so
+        possession and pass events are emitted within about one budget of
+        the capture.
+        
+        A stage time is only measured when the stage runs, so the estimate
+        of a skipped stage decays on every skipped frame, and the stage is
+        run anyway after too many frames in a row were skipped. This keeps a
+        single slow frame from starving detection or drawing for the rest of
+        the stream, at the cost of one late frame while the estimate is
+        measured again.
+        
+        Args:
+            stream_analyzer (StreamAnalyzer): Per-frame detection and analysis.
+            frame_drawer (FrameDrawer): Object whose draw_frame(frame, frame_num,
+                frame_data) draws the analysis results on a frame.
+            latency_budget (float): Latency budget per frame in seconds.
+            queue_size (int): Maximum number of frames waiting between two stages.
+            on_event (callable, optional): Called with (event_type, event_info,
+                latency) for each pass, interception and possession change,
+                as soon as the frame is analyzed. The latency is measured
+                from the capture of the frame, in seconds.
+            max_skipped_detections (int): Number of frames in a row that may
+                reuse the last detections before detection is forced.
+            max_stale_time (float): Maximum age in seconds of the reused
+                detections, counted from the capture of the last detected
+                frame, before detection is forced.
+            max_undrawn_frames (int): Number of frames in a row that may be
+                passed on undrawn before drawing is forced.
+        """
+        self.stream_analyzer = stream_analyzer
+        self.frame_drawer = frame_drawer
+        self.latency_budget = latency_budget
+        self.on_event = on_event
+        self.max_skipped_detections = max_skipped_detections
+        self.max_stale_time = max_stale_time
+        self.max_undrawn_frames = max_undrawn_frames
+        
+        self.pipeline_runner = PipelineRunner([
+            PipelineStage('detect', self.detect),
+            PipelineStage('analyze', self.analyze),
+            PipelineStage('draw', self.draw)
+        ], queue_size=queue_size)
+        
+        self.live_source = None
+        self.smoothing = 0.2
+        self.stage_times = {'detect': 0.0, 'analyze': 0.0, 'draw': 0.0}
+        self.consecutive_skipped_detections = 0
+        self.consecutive_undrawn_frames = 0
+        self.last_detection_capture_time = None
+        
+        # Counters exposed for monitoring
+        self.frames_processed = 0
+        self.frames_detected = 0
+        self.detections_skipped = 0
+        self.frames_undrawn = 0  # analyzed but passed on without the overlays
+        self.missing_frames = 0  # output slots of frames dropped at capture
+        self.frame_latencies = []
+        self.max_event_latency = 0.0
+        self.elapsed_time = 0.0
+    
+    def update_stage_time(self, stage_name, start_time):
+        """
+        Update the moving average of the time a stage takes per frame.
+        
+        Args:
+            stage_name (str): Name of the stage.
+            start_time (float): time.perf_counter() timestamp at which the stage started.
+        """
+        stage_time = time.perf_counter() - start_time
+        self.stage_times[stage_name] += self.smoothing * (stage_time - self.stage_times[stage_name])
+    
+    def decay_stage_time(self, stage_name):
+        """
+        Decay the moving average of a stage that was skipped for a frame.
+        
+        Args:
+            stage_name (str): Name of the stage.
+        """
+        self.stage_times[stage_name] *= 1 - self.smoothing
+    
+    def is_late(self, item, stage_names):
+        """
+        Check whether a frame would exceed its latency budget.
+        
+        Args:
+            item (dict): Pipeline item with 'capture_time'.
+            stage_names (list): Stages the frame still has to go through.
+        
+        Returns:
+            bool: True if the frame cannot make it through those stages in time.
+        """
+        remaining_time = sum(self.stage_times[stage_name] for stage_name in stage_names)
+        return time.perf_counter() - item['capture_time'] + remaining_time > self.latency_budget
+    
+    def detect(self, item):
+        """
+        Run the detectors, or reuse the last detections if the frame is late.
+        """
+        # The first frame is always detected, so there is something to reuse
+        if (self.frames_detected > 0
+                and self.consecutive_skipped_detections < self.max_skipped_detections
+                and item['capture_time'] - self.last_detection_capture_time < self.max_stale_time
+                and self.is_late(item, ['detect', 'analyze', 'draw'])):
+            self.detections_skipped += 1
+            self.consecutive_skipped_detections += 1
+            self.decay_stage_time('detect')
+            return self.stream_analyzer.skip_detection(item)
+        
+        start_time = time.perf_counter()
+        item = self.stream_analyzer.detect(item)
+        self.update_stage_time('detect', start_time)
+        self.frames_detected += 1
+        self.consecutive_skipped_detections = 0
+        self.last_detection_capture_time = item['capture_time']
+        return item
+    
+    def analyze(self, item):
+        """
+        Analyze the frame and emit its events.
+        """
+        start_time = time.perf_counter()
+        item = self.stream_analyzer.analyze(item)
+        self.update_stage_time('analyze', start_time)
+        if item['events']:
+            latency = time.perf_counter() - item['capture_time']
+            self.max_event_latency = max(self.max_event_latency, latency)
+            if self.on_event is not None:
+                for event_type, event_info in item['events']:
+                    self.on_event(event_type, event_info, latency)
+        return item
+    
+    def draw(self, item):
+        """
+        Draw the analysis results, or leave the frame undrawn if it is late.
+        
+        An undrawn frame still fills its slot of the output video.
+        """
+        if self.consecutive_undrawn_frames < self.max_undrawn_frames and self.is_late(item, ['draw']):
+            self.frames_undrawn += 1
+            self.consecutive_undrawn_frames += 1
+            self.decay_stage_time('draw')
+            item['frame_drawn'] = False
+            return item
+        
+        start_time = time.perf_counter()
+        item['frame'] = self.frame_drawer.draw_frame(item['frame'], item['frame_num'], item['frame_data'])
+        self.update_stage_time('draw', start_time)
+        self.consecutive_undrawn_frames = 0
+        item['frame_drawn'] = True
+        return item
+    
+    def run(self, live_source):
+        """
+        Process a live source and yield the rendered frames.
+        
+        Each item is given the slot it takes in an output video at the
+        source frame rate, from its capture time. 'missing_frames' counts the
+        slots left empty before it by frames dropped at capture; writing the
+        previous frame again for each of them keeps the output in sync with
+        the feed.
+        
+        Args:
+            live_source (LiveVideoSource): Source of (frame_num, frame, capture_time),
+                with an `fps` attribute.
+        
+        Yields:
+            dict: Pipeline items in order, with 'frame_drawn' False for frames
+                that were passed on without the overlays, and 'missing_frames'.
+        """
+        self.live_source = live_source
+        items = ({'frame_num': frame_num, 'frame': frame, 'capture_time': capture_time}
+                 for frame_num, frame, capture_time in live_source)
+        
+        start_time = time.perf_counter()
+        first_capture_time = None
+        output_slot = -1
+        try:
+            for item in self.pipeline_runner.run(items):
+                self.frames_processed += 1
+                self.frame_latencies.append(time.perf_counter() - item['capture_time'])
+                
+                if first_capture_time is None:
+                    first_capture_time = item['capture_time']
+                frame_slot = max(output_slot + 1,
+                                 round((item['capture_time'] - first_capture_time) * live_source.fps))
+                item['missing_frames'] = frame_slot - output_slot - 1
+                self.missing_frames += item['missing_frames']
+                output_slot = frame_slot
+                yield item
+        finally:
+            self.elapsed_time = time.perf_counter() - start_time
+    
+    def get_stats(self):
+        """
+        Get the real-time counters.
+        
+        The real-time factor is the duration of the processed frames divided
+        by the wall-clock time; below 1 the runner could not keep up with the
+        source and frames were dropped at capture.
+        
+        Returns:
+            dict: Frame counters, latency percentiles in milliseconds and the
+                real-time factor.
+        """
+        latencies = sorted(self.frame_latencies)
+        
+        def percentile(fraction):
+            if not latencies:
+                return 0.0
+            return latencies[min(len(latencies) - 1, int(fraction * len(latencies)))] * 1000
+        
+        capture_frames_dropped = 0
+        video_duration = 0.0
+        if self.live_source is not None:
+            capture_frames_dropped = self.live_source.frames_dropped
+            video_duration = self.frames_processed / self.live_source.fps
+        
+        return {
+            'frames_processed': self.frames_processed,
+            'detections_skipped': self.detections_skipped,
+            'frames_undrawn': self.frames_undrawn,
+            'capture_frames_dropped': capture_frames_dropped,
+            'missing_frames': self.missing_frames,
+            'median_latency_ms': percentile(0.5),
+            'p95_latency_ms': percentile(0.95),
+            'max_latency_ms': percentile(1.0),
+            'max_event_latency_ms': self.max_event_latency * 1000,
+            'real_time_factor': video_duration / self.elapsed_time if self.elapsed_time > 0 else 0.0
+        }
+    
+    def report(self):
+        """
+        Print the real-time counters.
+        """
+        stats = self.get_stats()
+        print(f"Live: {stats['frames_processed']} frames, {stats['detections_skipped']} detections skipped, "
+              f"{stats['frames_undrawn']} frames not drawn, "
+              f"{stats['capture_frames_dropped']} capture frames dropped "
+              f"({stats['missing_frames']} output frames repeated)")
+        print(f"Live latency: median {stats['median_latency_ms']:.1f} ms, p95 {stats['p95_latency_ms']:.1f} ms, "
+              f"max {stats['max_latency_ms']:.1f} ms, events within {stats['max_event_latency_ms']:.1f} ms")
+        print(f"Real-time factor: {stats['real_time_factor']:.2f}x")
+        self.pipeline_runner.report()
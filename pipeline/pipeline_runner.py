@@ -0,0 +1,230 @@
+import queue
+import threading
+import time
+
+class PipelineStage:
+    def __init__(self, name, process):
+        """
+        Initialize a pipeline stage.
+        
+        Args:
+            name (str): Name of the stage, used in the stats.
+            process (callable): Called with each item in order and returns the
+                item handed to the next stage. It runs on the stage's own
+                thread, so it may keep state between items.
+        """
+        self.name = name
+        self.process = process
+        
+        # Counters exposed for monitoring
+        self.items_processed = 0
+        self.busy_time = 0.0
+        self.input_stalls = 0  # waited for the previous stage
+        self.output_stalls = 0  # waited for the next stage to make room
+    
+    def get_stats(self):
+        """
+        Get the stage counters.
+        
+        Returns:
+            dict: Items processed, busy time, time per item and stall counters.
+        """
+        return {
+            'name': self.name,
+            'items_processed': self.items_processed,
+            'busy_time': self.busy_time,
+            'time_per_item': self.busy_time / self.items_processed if self.items_processed > 0 else 0.0,
+            'input_stalls': self.input_stalls,
+            'output_stalls': self.output_stalls
+        }
+
+class PipelineRunner:
+    def __init__(self, stages, queue_size=4):
+        """
+        Initialize a pipeline of concurrent stages.
+        
+        Every stage runs on its own thread and hands its results to the next
+        stage through a bounded queue, so stages work on different frames at
+        the same time and a fast stage blocks instead of buffering the whole
+        video ahead of a slow one. Throughput is then bounded by the slowest
+        stage rather than by the sum of all stages, as long as the stages
+        spend their time in code that releases the GIL (decoding, model
+        inference, OpenCV drawing, encoding).
+        
+        Items leave the pipeline in the order they entered it.
+        
+        Args:
+            stages (list): PipelineStage objects, in processing order.
+            queue_size (int): Maximum number of items waiting between two stages.
+        """
+        self.stages = stages
+        self.queue_size = queue_size
+        self.source_stage = PipelineStage('source', None)
+        self.stop_event = threading.Event()
+        self.error = None
+    
+    def put(self, item_queue, item, stage):
+        """
+        Hand an item to the next stage, waiting for room unless the pipeline stops.
+        
+        Args:
+            item_queue (queue.Queue): Queue to the next stage.
+            item: Item to hand over, None to end the stream.
+            stage (PipelineStage): Stage handing the item over.
+        
+        Returns:
+            bool: False if the pipeline stopped before the item was queued.
+        """
+        if item_queue.full():
+            stage.output_stalls += 1
+        while not self.stop_event.is_set():
+            try:
+                item_queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+    
+    def get(self, item_queue, stage):
+        """
+        Take the next item, waiting for it unless the pipeline stops.
+        
+        Args:
+            item_queue (queue.Queue): Queue from the previous stage.
+            stage (PipelineStage, optional): Stage taking the item, None for
+                the consumer of the last stage.
+        
+        Returns:
+            tuple: Whether an item was taken, and the item (None at the end of the stream).
+        """
+        if stage is not None and item_queue.empty():
+            stage.input_stalls += 1
+        while not self.stop_event.is_set():
+            try:
+                return True, item_queue.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        return False, None
+    
+    def fail(self, error):
+        """
+        Record the first error raised by a stage and stop the pipeline.
+        
+        Args:
+            error (Exception): Error raised by a stage.
+        """
+        if self.error is None:
+            self.error = error
+        self.stop_event.set()
+    
+    def _feed_loop(self, items, output_queue):
+        """
+        Pull items from the source into the first queue.
+        """
+        stage = self.source_stage
+        try:
+            item_iterator = iter(items)
+            while not self.stop_event.is_set():
+                start_time = time.perf_counter()
+                try:
+                    item = next(item_iterator)
+                except StopIteration:
+                    break
+                stage.busy_time += time.perf_counter() - start_time
+                stage.items_processed += 1
+                
+                if not self.put(output_queue, item, stage):
+                    return
+        except Exception as e:
+            self.fail(e)
+            return
+        self.put(output_queue, None, stage)
+    
+    def _stage_loop(self, stage, input_queue, output_queue):
+        """
+        Process items of a stage until the end of the stream.
+        """
+        try:
+            while True:
+                taken, item = self.get(input_queue, stage)
+                if not taken:
+                    return
+                if item is None:
+                    break
+                
+                start_time = time.perf_counter()
+                item = stage.process(item)
+                stage.busy_time += time.perf_counter() - start_time
+                stage.items_processed += 1
+                
+                if not self.put(output_queue, item, stage):
+                    return
+        except Exception as e:
+            self.fail(e)
+            return
+        self.put(output_queue, None, stage)
+    
+    def run(self, items):
+        """
+        Start the stage threads and yield the results of the last stage.
+        
+        Closing the generator early stops all stages. An error raised by any
+        stage is raised again here.
+        
+        Args:
+            items (iterable): Items fed to the first stage, e.g. (frame_num, frame) pairs.
+        
+        Yields:
+            The result of the last stage for each item, in order.
+        """
+        self.stop_event.clear()
+        self.error = None
+        
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in range(len(self.stages) + 1)]
+        workers = [threading.Thread(target=self._feed_loop, args=(items, queues[0]), daemon=True)]
+        for stage_index, stage in enumerate(self.stages):
+            workers.append(threading.Thread(
+                target=self._stage_loop,
+                args=(stage, queues[stage_index], queues[stage_index + 1]),
+                daemon=True
+            ))
+        for worker in workers:
+            worker.start()
+        
+        try:
+            while True:
+                taken, item = self.get(queues[-1], None)
+                if not taken or item is None:
+                    break
+                yield item
+        finally:
+            self.stop_event.set()
+            for worker in workers:
+                worker.join()
+        
+        if self.error is not None:
+            raise self.error
+    
+    def get_stats(self):
+        """
+        Get the counters of every stage, the source first.
+        
+        Returns:
+            list: Stats dictionaries of PipelineStage.get_stats().
+        """
+        return [stage.get_stats() for stage in [self.source_stage] + self.stages]
+    
+    def report(self):
+        """
+        Print the time per item of every stage and the slowest one.
+        """
+        stage_stats = self.get_stats()
+        for stats in stage_stats:
+            print(f"Pipeline stage {stats['name']}: {stats['items_processed']} items, "
+                  f"{stats['time_per_item'] * 1000:.1f} ms/item, "
+                  f"{stats['input_stalls']} input stalls, {stats['output_stalls']} output stalls")
+        
+        slowest = max(stage_stats, key=lambda stats: stats['time_per_item'])
+        if slowest['time_per_item'] > 0:
+            print(f"Pipeline bottleneck: {slowest['name']} "
+                  f"({1 / slowest['time_per_item']:.1f} items/s)")
@@ -0,0 +1,174 @@
+import sys
+sys.path.append('../')
+from utils import get_foot_position
+from ball_aquisition import BallAquisitionDetector
+from pass_and_interception_detector import PassAndInterceptionEngine
+
+class StreamAnalyzer:
+    def __init__(self, player_tracker, ball_tracker, court_keypoint_detector, team_assigner,
+                 tactical_view_converter, speed_distance_calculator, court_speed=False,
+                 homography_tracker=None, on_pass=None, on_interception=None):
+        """
+        Initialize the StreamAnalyzer.
+        
+        The analyzer runs the detection and analysis stages one frame at a
+        time, in frame order, so results are available while the video is
+        still being read. It only keeps the state the stages carry between
+        frames (tracker state, team colors, previous ball owner, ...), the
+        passes and interceptions so far, and the running possession, pass
+        and interception counts the stats overlays draw from.
+        
+        Args:
+            player_tracker (PlayerTracker): Player detector and tracker.
+            ball_tracker (BallTracker): Ball detector.
+            court_keypoint_detector (CourtKeypointDetector): Court keypoint detector.
+            team_assigner (TeamAssigner): Team assigner.
+            tactical_view_converter (TacticalViewConverter): Converter to court coordinates.
+            speed_distance_calculator (SpeedAndDistanceCalculator): Speed and distance calculator.
+            court_speed (bool): Whether to compute speed and distance in court
+                coordinates instead of pixels.
+            homography_tracker (HomographyTracker, optional): Tracker smoothing
+                the homographies of consecutive frames.
+            on_pass (callable, optional): Called with each pass dictionary.
+            on_interception (callable, optional): Called with each interception dictionary.
+        """
+        self.player_tracker = player_tracker
+        self.ball_tracker = ball_tracker
+        self.court_keypoint_detector = court_keypoint_detector
+        self.team_assigner = team_assigner
+        self.tactical_view_converter = tactical_view_converter
+        self.speed_distance_calculator = speed_distance_calculator
+        self.court_speed = court_speed
+        self.homography_tracker = homography_tracker
+        
+        self.ball_acquisition_detector = BallAquisitionDetector()
+        self.event_engine = PassAndInterceptionEngine(on_pass=on_pass, on_interception=on_interception)
+        
+        self.passes = []
+        self.interceptions = []
+        self.team_ball_control_frames = {1: 0, 2: 0}
+        self.pass_counts = {1: 0, 2: 0}
+        self.interception_counts = {1: 0, 2: 0}
+        self.last_player_detection = {}
+    
+    def detect(self, item):
+        """
+        Run the detectors on the next frame.
+        
+        Args:
+            item (dict): Pipeline item with 'frame_num' and 'frame'.
+        
+        Returns:
+            dict: The item with 'player_detection', 'ball_detection' and
+                'court_keypoints' added.
+        """
+        frame = item['frame']
+        item['player_detection'] = self.player_tracker.track_frame(frame)
+        item['ball_detection'] = self.ball_tracker.track_frame(frame, item['frame_num'])
+        item['court_keypoints'] = self.court_keypoint_detector.track_frame(frame)
+        item['detection_skipped'] = False
+        self.last_player_detection = item['player_detection']
+        return item
+    
+    def skip_detection(self, item):
+        """
+        Stand in for detect() on a frame that has to be skipped to catch up.
+        
+        The players and court keypoints of the last detected frame are reused
+        and no ball is reported, so the possession of the frame is unknown
+        and no event is raised from it.
+        
+        Args:
+            item (dict): Pipeline item with 'frame_num' and 'frame'.
+        
+        Returns:
+            dict: The item with the same keys as from detect() and
+                'detection_skipped' set.
+        """
+        item['player_detection'] = self.last_player_detection
+        item['ball_detection'] = {}
+        item['court_keypoints'] = self.court_keypoint_detector.last_keypoints
+        item['detection_skipped'] = True
+        return item
+    
+    def analyze(self, item):
+        """
+        Assign teams, possession, events, court positions and speeds of the next frame.
+        
+        Args:
+            item (dict): Pipeline item returned by detect().
+        
+        Returns:
+            dict: The item with 'frame_data' added, the per-frame analysis
+                results drawn by the frame drawer, and 'events', the pass,
+                interception and possession change events of this frame.
+        """
+        frame_num = item['frame_num']
+        player_detection = item['player_detection']
+        court_keypoints = item['court_keypoints']
+        
+        team_assignment = self.team_assigner.assign_frame(item['frame'], player_detection)
+        
+        ball_acquisition = self.ball_acquisition_detector.detect_frame(
+            player_detection,
+            item['ball_detection'],
+            assign_to_team=True,
+            team_assignment=team_assignment
+        )
+        if ball_acquisition.get('team_ball_control') in self.team_ball_control_frames:
+            self.team_ball_control_frames[ball_acquisition['team_ball_control']] += 1
+        
+        previous_ball_owner = self.event_engine.previous_ball_owner
+        events = self.event_engine.update(frame_num, ball_acquisition, team_assignment)
+        for event_type, event_info in events:
+            if event_type == 'pass':
+                self.passes.append(event_info)
+                team = event_info.get('team', 1)
+                if team in self.pass_counts:
+                    self.pass_counts[team] += 1
+            else:
+                self.interceptions.append(event_info)
+                team = event_info.get('intercepting_team', 1)
+                if team in self.interception_counts:
+                    self.interception_counts[team] += 1
+        
+        if self.event_engine.previous_ball_owner != previous_ball_owner:
+            events.append(('possession', {
+                'frame': frame_num,
+                'player': self.event_engine.previous_ball_owner,
+                'team': self.event_engine.previous_owner_team
+            }))
+        item['events'] = events
+        
+        homography_matrix = self.tactical_view_converter.get_frame_homography(court_keypoints, self.homography_tracker)
+        tactical_detections = self.tactical_view_converter.convert_detections_to_tactical_view(
+            player_detection,
+            court_keypoints,
+            homography_matrix
+        )
+        
+        if self.court_speed:
+            speed_stats = self.speed_distance_calculator.update_frame_stats(
+                tactical_detections,
+                self.speed_distance_calculator.meters_per_foot
+            )
+        else:
+            speed_stats = self.speed_distance_calculator.update_frame_stats(
+                {player_id: get_foot_position(bbox) for player_id, bbox in player_detection.items()},
+                self.speed_distance_calculator.meters_per_pixel
+            )
+        
+        item['frame_data'] = {
+            'court_keypoints': court_keypoints,
+            'player_detection': player_detection,
+            'ball_detection': item['ball_detection'],
+            'team_assignment': team_assignment,
+            'ball_acquisition': ball_acquisition,
+            'speed_stats': speed_stats,
+            'tactical_detections': tactical_detections,
+            # Running counts up to this frame, for the cumulative stats overlays
+            'team_ball_control_frames': dict(self.team_ball_control_frames),
+            'pass_counts': dict(self.pass_counts),
+            'interception_counts': dict(self.interception_counts)
+        }
+        return item
@@ -1,21 +1,26 @@
 from ultralytics import YOLO
 import supervision as sv
-import pickle
-import os
 import sys
 sys.path.append('../')
-from utils import get_center_of_bbox, get_bbox_width
+from utils import get_center_of_bbox, get_bbox_width, InferenceStats, read_stub, save_stub, interpolate_tracks
 
 class PlayerTracker:
-    def __init__(self, model_path):
+    def __init__(self, model_path, batch_size=1, detection_stride=1):
         """
         Initialize the PlayerTracker with a YOLO model.
         
         Args:
             model_path (str): Path to the YOLO model file.
+            batch_size (int): Number of frames sent to the model per call.
+            detection_stride (int): Run the detector on every Nth frame and
+                interpolate the boxes of the frames in between.
         """
         self.model = YOLO(model_path)
+        self.model_path = model_path
         self.tracker = sv.ByteTracker()
+        self.batch_size = batch_size
+        self.detection_stride = detection_stride
+        self.inference_stats = InferenceStats()
 
     def choose_and_filter_players(self, court_keypoints, player_detections):
         """
@@ -42,35 +47,99 @@ class PlayerTracker:
         player_detections_filtered = player_detections[chosen_players]
         return player_detections_filtered
 
-    def detect_frames(self, frames, read_from_stub=False, stub_path=None):
+    def detect_frames(self, frames, read_from_stub=False, stub_path=None, cache=None):
         """
         Detect and track players across multiple video frames.
         
+        Frames are sent to the model in batches of `batch_size`; tracker
+        updates are still applied one frame at a time, in frame order.
+        
+        With a `detection_stride` of N, only every Nth frame is detected and
+        the tracker sees just those frames. Boxes of the frames in between are
+        interpolated per track id and marked as InterpolatedBBox.
+        
         Args:
-            frames (list): List of video frames.
+            frames (iterable): Video frames, as a list or a VideoSource.
             read_from_stub (bool): Whether to read from cached results.
             stub_path (str): Path to cached detection results.
+            cache (StubCache, optional): Content-addressed cache of stage results.
+                Only used when `frames` is a VideoSource, whose file is hashed.
         
         Returns:
             list: List of player detections for each frame.
         """
-        player_detections = []
+        cache_key = None
+        if cache is not None and getattr(frames, 'video_path', None) is not None:
+            cache_key = cache.make_key('player_tracks', video_path=frames.video_path,
+                                       model_path=self.model_path, imgsz=1280,
+                                       detection_stride=self.detection_stride)
+            player_detections = cache.get_tracks(cache_key)
+            if player_detections is not None:
+                return player_detections
         
-        if read_from_stub and stub_path is not None and os.path.exists(stub_path):
-            with open(stub_path, 'rb') as f:
-                player_detections = pickle.load(f)
+        player_detections = read_stub(read_from_stub, stub_path)
+        if player_detections is not None:
             return player_detections
 
-        for frame in frames:
-            player_dict = self.detect_frame(frame)
-            player_detections.append(player_dict)
+        keyframe_detections = []
+        keyframe_indices = []
+        frame_count = 0
+        batch = []
+
+        for frame_num, frame in enumerate(frames):
+            frame_count += 1
+            if frame_num % self.detection_stride != 0:
+                continue
+            
+            keyframe_indices.append(frame_num)
+            batch.append(frame.copy())
+            if len(batch) == self.batch_size:
+                keyframe_detections.extend(self.detect_batch(batch))
+                batch = []
         
-        if stub_path is not None:
-            with open(stub_path, 'wb') as f:
-                pickle.dump(player_detections, f)
+        if batch:
+            keyframe_detections.extend(self.detect_batch(batch))
+        
+        player_detections = interpolate_tracks(keyframe_detections, keyframe_indices, frame_count)
+        
+        save_stub(stub_path, player_detections)
+        if cache_key is not None:
+            cache.put_tracks(cache_key, player_detections)
                 
         return player_detections
 
+    def detect_batch(self, batch):
+        """
+        Detect players in a batch of frames with a single model call and
+        update the tracker with the results in frame order.
+        
+        Args:
+            batch (list): Video frames.
+        
+        Returns:
+            list: Player detections for each frame of the batch.
+        """
+        start_time = self.inference_stats.start()
+        results = self.model(batch, imgsz=1280)
+        self.inference_stats.record(start_time, len(batch))
+        
+        return [self.process_result(result) for result in results]
+
+    def track_frame(self, frame):
+        """
+        Detect and track players in the next frame of a stream.
+        
+        Unlike detect_frame(), the model call is counted in `inference_stats`.
+        Frames must be passed in order, as the tracker is updated with them.
+        
+        Args:
+            frame (numpy.ndarray): Input video frame.
+        
+        Returns:
+            dict: Dictionary containing player detections and tracking information.
+        """
+        return self.detect_batch([frame])[0]
+
     def detect_frame(self, frame):
         """
         Detect and track players in a single frame.
@@ -82,7 +151,19 @@ class PlayerTracker:
             dict: Dictionary containing player detections and tracking information.
         """
         results = self.model(frame, imgsz=1280)
-        detections = sv.Detections.from_ultralytics(results[0])
+        return self.process_result(results[0])
+
+    def process_result(self, result):
+        """
+        Filter the model output for one frame and update the tracker with it.
+        
+        Args:
+            result (ultralytics.engine.results.Results): Model output for a single frame.
+        
+        Returns:
+            dict: Dictionary containing player detections and tracking information.
+        """
+        detections = sv.Detections.from_ultralytics(result)
         
         # Filter for person class (class_id = 0 in COCO dataset)
         detections = detections[detections.class_id == 0]
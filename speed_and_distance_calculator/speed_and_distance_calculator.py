@@ -1,18 +1,27 @@
 import sys
 sys.path.append('../')
-from utils import get_center_of_bbox, get_foot_position
+from utils import get_center_of_bbox, get_foot_position, TrackTable
 import math
+import numpy as np
+from collections import deque
 
 class SpeedAndDistanceCalculator:
-    def __init__(self):
+    def __init__(self, frame_rate=24):
         """
         Initialize the SpeedAndDistanceCalculator.
         
         This calculator computes player speeds and distances covered
         based on their positions across video frames.
+        
+        Args:
+            frame_rate (float): Frame rate of the video, used to turn
+                distances per frame into speeds.
         """
         self.frame_window = 5
-        self.frame_rate = 24
+        self.frame_rate = frame_rate
+        self.meters_per_pixel = 0.05
+        self.meters_per_foot = 0.3048
+        self.reset_frame_stats()
     
     def add_speed_and_distance_to_tracks(self, tracks):
         """
@@ -73,7 +82,7 @@ class SpeedAndDistanceCalculator:
         """
         pixel_distance = math.sqrt((position1[0] - position2[0])**2 + (position1[1] - position2[1])**2)
         # Convert pixels to meters (approximate conversion)
-        meters = pixel_distance * 0.05  # Assuming 1 pixel = 0.05 meters
+        meters = pixel_distance * self.meters_per_pixel  # Assuming 1 pixel = 0.05 meters
         return meters
     
     def calculate_speed(self, tracks, object_id, frame_num):
@@ -110,4 +119,188 @@ class SpeedAndDistanceCalculator:
         # Convert to km/h
         speed_kmh = speed_ms * 3.6
         
-        return speed_kmh
\ No newline at end of file
+        return speed_kmh
+    
+    def get_foot_positions(self, player_bboxes):
+        """
+        Get the foot positions of dense player boxes, as get_foot_position() does.
+        
+        Args:
+            player_bboxes (numpy.ndarray): Player boxes of shape (frames, tracks, 4),
+                NaN for absent tracks.
+        
+        Returns:
+            numpy.ndarray: Foot positions of shape (frames, tracks, 2), NaN for absent tracks.
+        """
+        player_bboxes = np.asarray(player_bboxes, dtype=np.float64)
+        foot_x = np.trunc((player_bboxes[..., 0] + player_bboxes[..., 2]) / 2)
+        foot_y = np.trunc(player_bboxes[..., 3])
+        return np.stack([foot_x, foot_y], axis=-1)
+    
+    def calculate_stats(self, positions, meters_per_unit):
+        """
+        Compute the speed and distance covered of every track in every frame.
+        
+        Distances are accumulated with a cumulative sum of the per-frame
+        displacements, and the speed is the mean displacement over the last
+        `frame_window` frames, from differences of that cumulative sum.
+        
+        Args:
+            positions (numpy.ndarray): Positions of shape (frames, tracks, 2),
+                NaN for absent tracks.
+            meters_per_unit (float): Meters per unit of the positions.
+        
+        Returns:
+            numpy.ndarray: Structured array of shape (frames, tracks) with
+                'speed' (km/h) and 'total_distance' (meters) fields, NaN where
+                the track is absent.
+        """
+        positions = np.asarray(positions, dtype=np.float64)
+        frame_count, track_count = positions.shape[:2]
+        stats = np.full((frame_count, track_count), np.nan,
+                        dtype=[('speed', np.float64), ('total_distance', np.float64)])
+        if frame_count == 0:
+            return stats
+        
+        # Displacement from the previous frame, NaN unless present in both
+        displacements = np.full((frame_count, track_count), np.nan)
+        displacements[1:] = np.linalg.norm(np.diff(positions, axis=0), axis=-1) * meters_per_unit
+        moved = ~np.isnan(displacements)
+        present = ~np.isnan(positions[..., 0])
+        
+        cumulative_distance = np.cumsum(np.where(moved, displacements, 0), axis=0)
+        
+        # Windowed sums as differences of cumulative sums with a leading zero row
+        padded_distance = np.vstack([np.zeros((1, track_count)), cumulative_distance])
+        padded_moves = np.vstack([np.zeros((1, track_count)), np.cumsum(moved, axis=0)])
+        window_starts = np.maximum(0, np.arange(frame_count) - self.frame_window + 1)
+        window_distance = padded_distance[1:] - padded_distance[window_starts]
+        window_moves = padded_moves[1:] - padded_moves[window_starts]
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            speed_ms = np.where(window_moves > 0, window_distance / (window_moves / self.frame_rate), 0)
+        
+        stats['speed'] = np.where(present, speed_ms * 3.6, np.nan)
+        stats['total_distance'] = np.where(moved, cumulative_distance, np.nan)
+        return stats
+    
+    def calculate_speed_and_distance(self, player_tracks):
+        """
+        Compute speed and distance for all player tracks without modifying them.
+        
+        Args:
+            player_tracks (list or TrackTable): Player detections for each frame.
+        
+        Returns:
+            tuple: Sorted track ids of shape (tracks,) and the stats array of
+                calculate_stats(), of shape (frames, tracks).
+        """
+        track_table = player_tracks if isinstance(player_tracks, TrackTable) else TrackTable.from_tracks(player_tracks)
+        track_ids, player_bboxes = track_table.to_dense()
+        
+        positions = self.get_foot_positions(player_bboxes)
+        return track_ids, self.calculate_stats(positions, self.meters_per_pixel)
+    
+    def calculate_court_speed_and_distance(self, player_tracks, court_keypoints, tactical_view_converter):
+        """
+        Compute speed and distance in court units for all player tracks.
+        
+        Foot positions are projected into the court coordinates (feet) of the
+        TacticalViewConverter with one homography and one perspective
+        transform per frame, so stats are not affected by camera zoom or
+        perspective. Frames without a valid homography count as absent. A
+        TrackTable that already has the 'tactical_position' column of
+        TacticalViewConverter.add_tactical_positions() is used as is.
+        
+        Args:
+            player_tracks (list or TrackTable): Player detections for each frame.
+            court_keypoints (list): Detected court keypoints for each frame.
+            tactical_view_converter (TacticalViewConverter): Converter to court coordinates.
+        
+        Returns:
+            tuple: Sorted track ids of shape (tracks,) and the stats array of
+                calculate_stats(), of shape (frames, tracks).
+        """
+        track_table = player_tracks if isinstance(player_tracks, TrackTable) else TrackTable.from_tracks(player_tracks)
+        if 'tactical_position' in track_table.columns:
+            track_ids, court_positions = track_table.to_dense('tactical_position')
+            return track_ids, self.calculate_stats(court_positions, self.meters_per_foot)
+        
+        track_ids, player_bboxes = track_table.to_dense()
+        positions = self.get_foot_positions(player_bboxes)
+        court_positions = tactical_view_converter.convert_tracks_to_tactical_view(positions, court_keypoints)
+        return track_ids, self.calculate_stats(court_positions, self.meters_per_foot)
+    
+    def get_frame_stats(self, track_ids, stats, frame_num):
+        """
+        Get the stats of the tracks present in one frame.
+        
+        Args:
+            track_ids (numpy.ndarray): Track ids of the stats columns.
+            stats (numpy.ndarray): Stats array of calculate_stats().
+            frame_num (int): Index of the frame.
+        
+        Returns:
+            dict: {track_id: {'speed': ..., 'total_distance': ...}} for the
+                tracks present in the frame. Distance is 0 before a track
+                has moved.
+        """
+        frame_stats = {}
+        for column in np.flatnonzero(~np.isnan(stats['speed'][frame_num])).tolist():
+            total_distance = stats['total_distance'][frame_num, column]
+            frame_stats[track_ids[column].item()] = {
+                'speed': float(stats['speed'][frame_num, column]),
+                'total_distance': 0.0 if np.isnan(total_distance) else float(total_distance)
+            }
+        return frame_stats
+    
+    def reset_frame_stats(self):
+        """
+        Forget the track history of update_frame_stats().
+        """
+        self.frame_stats_frame_num = -1
+        self.last_positions = {}
+        self.total_distances = {}
+        self.recent_moves = {}
+    
+    def update_frame_stats(self, positions, meters_per_unit):
+        """
+        Compute the stats of the next frame of a stream.
+        
+        Gives the same values as get_frame_stats() on calculate_stats() over
+        the whole video, keeping only the last position, the distance covered
+        and the moves of the last `frame_window` frames of each track.
+        
+        Args:
+            positions (dict): {track_id: (x, y)} positions of the tracks
+                present in the frame.
+            meters_per_unit (float): Meters per unit of the positions.
+        
+        Returns:
+            dict: {track_id: {'speed': ..., 'total_distance': ...}} for the
+                tracks present in the frame.
+        """
+        self.frame_stats_frame_num += 1
+        frame_num = self.frame_stats_frame_num
+        
+        frame_stats = {}
+        for track_id, position in positions.items():
+            recent_moves = self.recent_moves.setdefault(track_id, deque())
+            while recent_moves and recent_moves[0][0] <= frame_num - self.frame_window:
+                recent_moves.popleft()
+            
+            # Only a track present in the previous frame has moved
+            total_distance = 0.0
+            previous_position = self.last_positions.get(track_id)
+            if previous_position is not None and previous_position[0] == frame_num - 1:
+                displacement = math.dist(previous_position[1], position) * meters_per_unit
+                self.total_distances[track_id] = self.total_distances.get(track_id, 0.0) + displacement
+                recent_moves.append((frame_num, displacement))
+                total_distance = self.total_distances[track_id]
+            self.last_positions[track_id] = (frame_num, position)
+            
+            speed_ms = 0.0
+            if recent_moves:
+                speed_ms = sum(move[1] for move in recent_moves) / (len(recent_moves) / self.frame_rate)
+            frame_stats[track_id] = {'speed': speed_ms * 3.6, 'total_distance': total_distance}
+        return frame_stats
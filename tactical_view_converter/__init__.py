@@ -1,2 +1,2 @@
 from .tactical_view_converter import TacticalViewConverter
-from .homography import Homography
\ No newline at end of file
+from .homography import Homography, HomographyTracker
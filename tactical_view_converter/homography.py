@@ -69,4 +69,116 @@ class Homography:
             
         except Exception as e:
             print(f"Error applying homography: {e}")
-            return None
\ No newline at end of file
+            return None
+
+class HomographyTracker:
+    def __init__(self, drift_threshold=2.0, refine_threshold=15.0, smoothing=0.6):
+        """
+        Initialize the HomographyTracker for frame-to-frame homography estimation.
+        
+        Court keypoints barely move between most frames, so a full RANSAC fit
+        is only run when they have drifted far from the keypoints of the last
+        fit. Small drifts reuse the previous matrix, medium drifts refit it
+        with a plain least-squares solve, and the matrices are smoothed over
+        time with an exponential moving average to reduce jitter.
+        
+        With the 4 court corners as keypoints, the least-squares refit finds
+        the same exact matrix RANSAC would and costs about as much, so only
+        reused matrices count as avoided RANSAC calls. What a refit changes
+        is that the moving average is kept, while a RANSAC fit restarts it.
+        
+        Args:
+            drift_threshold (float): Mean keypoint drift in pixels, from the
+                keypoints of the last fit, below which the matrix is reused.
+            refine_threshold (float): Mean keypoint drift in pixels below which
+                the matrix is refit without RANSAC and stays smoothed.
+            smoothing (float): Weight of the previous smoothed matrix, from 0
+                (no smoothing, no lag) to below 1. Reset after each RANSAC fit,
+                so cuts and fast pans are not smeared.
+        """
+        self.drift_threshold = drift_threshold
+        self.refine_threshold = refine_threshold
+        self.smoothing = smoothing
+        self.homography = Homography()
+        
+        self.ransac_calls = 0
+        self.reused_count = 0
+        self.refined_count = 0
+        self.reset()
+    
+    def reset(self):
+        """
+        Forget the previous fit so the next update runs a full RANSAC fit.
+        """
+        self.fit_source_points = None
+        self.fit_matrix = None
+        self.smoothed_matrix = None
+    
+    @property
+    def ransac_calls_avoided(self):
+        # A refit solves the same system as RANSAC on 4 points, so it saves nothing
+        return self.reused_count
+    
+    def update(self, source_points, target_points):
+        """
+        Estimate the homography of the next frame.
+        
+        Args:
+            source_points (numpy.ndarray): Keypoints in the video frame.
+            target_points (numpy.ndarray): Corresponding target points.
+        
+        Returns:
+            numpy.ndarray or None: Smoothed homography matrix, or None if
+                calculation fails.
+        """
+        if len(source_points) < 4 or len(target_points) < 4:
+            return None
+        
+        source_points = np.asarray(source_points, dtype=np.float32)
+        target_points = np.asarray(target_points, dtype=np.float32)
+        
+        drift = None
+        if self.fit_source_points is not None and self.fit_source_points.shape == source_points.shape:
+            drift = float(np.linalg.norm(source_points - self.fit_source_points, axis=1).mean())
+        
+        if drift is not None and drift < self.drift_threshold:
+            self.reused_count += 1
+            homography_matrix = self.fit_matrix
+        elif drift is not None and drift < self.refine_threshold:
+            homography_matrix, _ = cv2.findHomography(source_points, target_points, 0)
+            if homography_matrix is None:
+                homography_matrix = self.fit_matrix
+            else:
+                self.fit_source_points = source_points
+                self.fit_matrix = homography_matrix
+            self.refined_count += 1
+        else:
+            self.ransac_calls += 1
+            homography_matrix = self.homography.calculate_homography(source_points, target_points)
+            if homography_matrix is None:
+                return None
+            self.fit_source_points = source_points
+            self.fit_matrix = homography_matrix
+            self.smoothed_matrix = None
+        
+        homography_matrix = homography_matrix / homography_matrix[2, 2]
+        if self.smoothed_matrix is None:
+            self.smoothed_matrix = homography_matrix
+        else:
+            self.smoothed_matrix = self.smoothing * self.smoothed_matrix + (1 - self.smoothing) * homography_matrix
+        return self.smoothed_matrix
+    
+    def get_stats(self):
+        """
+        Get counters of how each homography was obtained.
+        
+        Returns:
+            dict: RANSAC fits, reused and refined matrices, and RANSAC calls
+                avoided by reusing a matrix.
+        """
+        return {
+            'ransac_calls': self.ransac_calls,
+            'reused': self.reused_count,
+            'refined': self.refined_count,
+            'ransac_calls_avoided': self.ransac_calls_avoided
+        }
@@ -2,7 +2,7 @@ import numpy as np
 import cv2
 import sys
 sys.path.append('../')
-from utils import get_foot_position
+from utils import get_foot_position, TrackTable, get_object_digest, get_tracks_digest
 from .homography import Homography
 
 class TacticalViewConverter:
@@ -112,22 +112,242 @@ class TacticalViewConverter:
         foot_position = get_foot_position(bbox)
         return self.convert_position_to_tactical_view(foot_position, detected_keypoints)
     
-    def convert_detections_to_tactical_view(self, detections, detected_keypoints):
+    def get_homography(self, detected_keypoints):
+        """
+        Calculate the homography from the video frame to the tactical court view.
+        
+        Args:
+            detected_keypoints (numpy.ndarray): Array of detected court keypoints.
+        
+        Returns:
+            numpy.ndarray or None: Homography matrix, or None if the keypoints are invalid.
+        """
+        if not self.validate_keypoints(detected_keypoints):
+            return None
+        
+        homography = Homography()
+        return homography.calculate_homography(
+            np.asarray(detected_keypoints[:4], dtype=np.float32),
+            self.tactical_court_keypoints
+        )
+    
+    def convert_positions_to_tactical_view(self, positions, detected_keypoints=None, homography_matrix=None):
+        """
+        Convert many positions of one frame to tactical court view with a
+        single homography and a single perspective transform.
+        
+        Args:
+            positions (numpy.ndarray): Positions of shape (points, 2), NaN for missing points.
+            detected_keypoints (numpy.ndarray, optional): Array of detected court
+                keypoints, used when no homography matrix is given.
+            homography_matrix (numpy.ndarray, optional): Precomputed homography matrix.
+        
+        Returns:
+            numpy.ndarray: Court positions in feet of shape (points, 2), NaN for
+                missing points or if the conversion fails.
+        """
+        positions = np.asarray(positions, dtype=np.float64).reshape(-1, 2)
+        tactical_positions = np.full(positions.shape, np.nan)
+        
+        if homography_matrix is None and detected_keypoints is not None:
+            homography_matrix = self.get_homography(detected_keypoints)
+        if homography_matrix is None:
+            return tactical_positions
+        
+        valid = ~np.isnan(positions).any(axis=1)
+        if not valid.any():
+            return tactical_positions
+        
+        homography = Homography()
+        transformed_positions = homography.apply_homography(positions[valid], homography_matrix)
+        if transformed_positions is not None:
+            tactical_positions[valid] = transformed_positions.reshape(-1, 2)
+        return tactical_positions
+    
+    def get_frame_homography(self, detected_keypoints, homography_tracker=None):
+        """
+        Calculate the homography of the next frame, optionally through a tracker.
+        
+        Args:
+            detected_keypoints (numpy.ndarray): Array of detected court keypoints.
+            homography_tracker (HomographyTracker, optional): Tracker fed with
+                the keypoints of consecutive frames.
+        
+        Returns:
+            numpy.ndarray or None: Homography matrix, or None if the keypoints are invalid.
+        """
+        if homography_tracker is None:
+            return self.get_homography(detected_keypoints)
+        if not self.validate_keypoints(detected_keypoints):
+            return None
+        return homography_tracker.update(detected_keypoints[:4], self.tactical_court_keypoints)
+    
+    def get_homographies(self, court_keypoints, homography_tracker=None):
+        """
+        Calculate one homography per frame.
+        
+        Args:
+            court_keypoints (list): Detected court keypoints for each frame.
+            homography_tracker (HomographyTracker, optional): Tracker that reuses,
+                refines and smooths the matrices of consecutive frames instead
+                of running RANSAC on every frame.
+        
+        Returns:
+            numpy.ndarray: Homography matrices of shape (frames, 3, 3), NaN for
+                frames without a valid homography.
+        """
+        homographies = np.full((len(court_keypoints), 3, 3), np.nan)
+        for frame_num, detected_keypoints in enumerate(court_keypoints):
+            homography_matrix = self.get_frame_homography(detected_keypoints, homography_tracker)
+            if homography_matrix is not None:
+                homographies[frame_num] = homography_matrix
+        return homographies
+    
+    def project_positions(self, positions, homographies):
+        """
+        Apply a homography per frame to all positions of that frame at once.
+        
+        Args:
+            positions (numpy.ndarray): Positions of shape (frames, points, 2).
+            homographies (numpy.ndarray): Homography matrices of shape (frames, 3, 3).
+        
+        Returns:
+            numpy.ndarray: Projected positions of shape (frames, points, 2), NaN
+                where the position or the homography is missing.
+        """
+        positions = np.asarray(positions, dtype=np.float64)
+        homogeneous_positions = np.concatenate([positions, np.ones(positions.shape[:-1] + (1,))], axis=-1)
+        
+        projected = np.einsum('fij,fpj->fpi', homographies, homogeneous_positions)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return projected[..., :2] / projected[..., 2:]
+    
+    def convert_tracks_to_tactical_view(self, positions, court_keypoints, homographies=None):
+        """
+        Convert the positions of all tracks across frames to tactical court view.
+        
+        Args:
+            positions (numpy.ndarray): Positions of shape (frames, tracks, 2), NaN for absent tracks.
+            court_keypoints (list): Detected court keypoints for each frame.
+            homographies (numpy.ndarray, optional): Precomputed output of get_homographies().
+        
+        Returns:
+            numpy.ndarray: Court positions in feet of shape (frames, tracks, 2), NaN
+                for absent tracks and frames without a valid homography.
+        """
+        positions = np.asarray(positions, dtype=np.float64)
+        if homographies is None:
+            homographies = self.get_homographies(court_keypoints[:len(positions)])
+        
+        tactical_positions = np.full(positions.shape, np.nan)
+        frame_count = min(len(positions), len(homographies))
+        tactical_positions[:frame_count] = self.project_positions(positions[:frame_count], homographies[:frame_count])
+        return tactical_positions
+    
+    def add_tactical_positions(self, player_tracks, court_keypoints, homographies=None, cache=None,
+                               homography_tracker=None):
+        """
+        Project the foot position of every row of a track table into court
+        coordinates and keep them in a 'tactical_position' column next to the
+        boxes.
+        
+        Args:
+            player_tracks (list or TrackTable): Player detections for each frame.
+            court_keypoints (list): Detected court keypoints for each frame.
+            homographies (numpy.ndarray, optional): Precomputed output of get_homographies().
+            cache (StubCache, optional): Content-addressed cache of stage results,
+                keyed by the tracks, the court keypoints and the homographies
+                when given.
+            homography_tracker (HomographyTracker, optional): Tracker used to
+                compute the homographies, see get_homographies().
+        
+        Returns:
+            TrackTable: The tracks with a (rows, 2) 'tactical_position' column in
+                feet, NaN where no valid homography exists. A TrackTable passed
+                in is not modified; the returned one shares its arrays.
+        """
+        cache_key = None
+        if cache is not None:
+            cache_key = cache.make_key('tactical_positions',
+                                       player_tracks=get_tracks_digest(player_tracks),
+                                       court_keypoints=get_object_digest(court_keypoints),
+                                       homographies=None if homographies is None else get_object_digest(homographies),
+                                       homography_tracking=None if homography_tracker is None else (
+                                           homography_tracker.drift_threshold,
+                                           homography_tracker.refine_threshold,
+                                           homography_tracker.smoothing))
+            track_table = cache.get_track_table(cache_key)
+            if track_table is not None:
+                return track_table
+        
+        if isinstance(player_tracks, TrackTable):
+            # New columns go into a copy of the columns dictionary, so the caller's table is left as is
+            track_table = TrackTable(player_tracks.frame_offsets, player_tracks.frame_indices,
+                                     player_tracks.track_ids, player_tracks.bboxes, dict(player_tracks.columns))
+        else:
+            track_table = TrackTable.from_tracks(player_tracks)
+        if homographies is None:
+            homographies = self.get_homographies(court_keypoints[:track_table.frame_count], homography_tracker)
+        
+        # Foot positions of every row, as get_foot_position() computes them
+        bboxes = np.asarray(track_table.bboxes, dtype=np.float64)
+        foot_positions = np.stack([np.trunc((bboxes[:, 0] + bboxes[:, 2]) / 2), np.trunc(bboxes[:, 3])], axis=-1)
+        
+        # Rows of frames without keypoints get a NaN homography
+        frame_indices = np.asarray(track_table.frame_indices)
+        padded_homographies = np.full((track_table.frame_count, 3, 3), np.nan)
+        frame_count = min(track_table.frame_count, len(homographies))
+        padded_homographies[:frame_count] = homographies[:frame_count]
+        
+        tactical_positions = self.project_positions(foot_positions[:, None, :], padded_homographies[frame_indices])
+        track_table.columns['tactical_position'] = tactical_positions[:, 0].astype(np.float32)
+        
+        if cache_key is not None:
+            cache.put_tracks(cache_key, track_table)
+        return track_table
+    
+    def get_frame_tactical_detections(self, track_table, frame_num):
+        """
+        Get the court positions of the players of one frame from add_tactical_positions().
+        
+        Args:
+            track_table (TrackTable): Tracks with a 'tactical_position' column.
+            frame_num (int): Index of the frame.
+        
+        Returns:
+            dict: Dictionary of converted positions in tactical view.
+        """
+        row_start = int(track_table.frame_offsets[frame_num])
+        row_stop = int(track_table.frame_offsets[frame_num + 1])
+        
+        track_ids = np.asarray(track_table.track_ids[row_start:row_stop]).tolist()
+        tactical_positions = np.asarray(track_table.columns['tactical_position'][row_start:row_stop]).tolist()
+        return {track_id: tuple(position) for track_id, position in zip(track_ids, tactical_positions)
+                if not np.isnan(position[0])}
+    
+    def convert_detections_to_tactical_view(self, detections, detected_keypoints, homography_matrix=None):
         """
         Convert all detections from video frame to tactical court view.
         
         Args:
             detections (dict): Dictionary of detections with player IDs as keys.
             detected_keypoints (numpy.ndarray): Array of detected court keypoints.
+            homography_matrix (numpy.ndarray, optional): Precomputed homography
+                matrix, used instead of the keypoints.
         
         Returns:
             dict: Dictionary of converted positions in tactical view.
         """
         tactical_detections = {}
+        if not detections:
+            return tactical_detections
+        
+        player_ids = list(detections.keys())
+        foot_positions = [get_foot_position(detections[player_id]) for player_id in player_ids]
+        tactical_positions = self.convert_positions_to_tactical_view(foot_positions, detected_keypoints, homography_matrix)
         
-        for player_id, bbox in detections.items():
-            tactical_position = self.convert_bbox_to_tactical_view(bbox, detected_keypoints)
-            if tactical_position is not None:
-                tactical_detections[player_id] = tactical_position
+        for player_id, tactical_position in zip(player_ids, tactical_positions.tolist()):
+            if not np.isnan(tactical_position[0]):
+                tactical_detections[player_id] = tuple(tactical_position)
                 
-        return tactical_detections
\ No newline at end of file
+        return tactical_detections
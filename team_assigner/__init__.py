@@ -1 +1,3 @@
-from .team_assigner import TeamAssigner
\ No newline at end of file
+from .team_assigner import TeamAssigner
+from .jersey_color_extractor import JerseyColorExtractor
+from .parallel_color_extractor import ParallelColorExtractor
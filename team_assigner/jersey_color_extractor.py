@@ -0,0 +1,98 @@
+import cv2
+import numpy as np
+
+class JerseyColorExtractor:
+    def __init__(self, crop_size=16, background_threshold=40.0, min_jersey_fraction=0.1):
+        """
+        Initialize the JerseyColorExtractor.
+        
+        Jersey colors of many players are computed at once with NumPy instead
+        of fitting a K-means model per player. The top half of each player box
+        is resized to a small fixed-size crop; the crop's border pixels give
+        the background color, and the mean of the pixels that differ enough
+        from it is the jersey color.
+        
+        Args:
+            crop_size (int): Side length of the resized crops.
+            background_threshold (float): Minimum color distance from the
+                background for a pixel to count as jersey.
+            min_jersey_fraction (float): If fewer pixels than this fraction of
+                a crop count as jersey, the whole crop is averaged instead.
+        """
+        self.crop_size = crop_size
+        self.background_threshold = background_threshold
+        self.min_jersey_fraction = min_jersey_fraction
+        
+        # Mask of the pixels on the border of a crop
+        border_mask = np.zeros((crop_size, crop_size), dtype=bool)
+        border_mask[0, :] = border_mask[-1, :] = True
+        border_mask[:, 0] = border_mask[:, -1] = True
+        self.border_mask = border_mask
+    
+    def extract_crops(self, frame, bboxes):
+        """
+        Cut the top half of each player box out of a frame and resize it.
+        
+        Args:
+            frame (numpy.ndarray): Input video frame.
+            bboxes (list): Player bounding boxes [x1, y1, x2, y2].
+        
+        Returns:
+            numpy.ndarray: Crops of shape (players, crop_size, crop_size, 3).
+        """
+        crops = np.zeros((len(bboxes), self.crop_size, self.crop_size, 3), dtype=np.uint8)
+        frame_height, frame_width = frame.shape[:2]
+        
+        for i, bbox in enumerate(bboxes):
+            x1 = max(0, int(bbox[0]))
+            y1 = max(0, int(bbox[1]))
+            x2 = min(frame_width, int(bbox[2]))
+            y2 = min(frame_height, int(bbox[1] + (bbox[3] - bbox[1]) / 2))
+            if x2 <= x1 or y2 <= y1:
+                continue
+            
+            crops[i] = cv2.resize(frame[y1:y2, x1:x2], (self.crop_size, self.crop_size),
+                                  interpolation=cv2.INTER_AREA)
+        return crops
+    
+    def get_colors(self, crops):
+        """
+        Compute the jersey color of every crop in one vectorized pass.
+        
+        Crops from any number of frames can be stacked together.
+        
+        Args:
+            crops (numpy.ndarray): Crops of shape (players, crop_size, crop_size, 3).
+        
+        Returns:
+            numpy.ndarray: Jersey colors of shape (players, 3), in BGR.
+        """
+        pixels = crops.astype(np.float32).reshape(len(crops), self.crop_size * self.crop_size, 3)
+        
+        # Background color is the median of the border pixels of each crop
+        border_pixels = crops[:, self.border_mask].astype(np.float32)
+        background_colors = np.median(border_pixels, axis=1)
+        
+        distances = np.linalg.norm(pixels - background_colors[:, None, :], axis=2)
+        jersey_mask = distances > self.background_threshold
+        
+        # Fall back to the whole crop when too few pixels stand out
+        jersey_counts = jersey_mask.sum(axis=1)
+        too_few = jersey_counts < self.min_jersey_fraction * pixels.shape[1]
+        jersey_mask[too_few] = True
+        jersey_counts[too_few] = pixels.shape[1]
+        
+        return (pixels * jersey_mask[:, :, None]).sum(axis=1) / jersey_counts[:, None]
+    
+    def get_player_colors(self, frame, bboxes):
+        """
+        Get the jersey colors of all players of a frame.
+        
+        Args:
+            frame (numpy.ndarray): Input video frame.
+            bboxes (list): Player bounding boxes [x1, y1, x2, y2].
+        
+        Returns:
+            numpy.ndarray: Jersey colors of shape (players, 3), in BGR.
+        """
+        return self.get_colors(self.extract_crops(frame, bboxes))
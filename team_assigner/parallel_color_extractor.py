@@ -0,0 +1,112 @@
+from concurrent.futures import ProcessPoolExecutor
+from collections import deque
+from multiprocessing import shared_memory
+import numpy as np
+from .jersey_color_extractor import JerseyColorExtractor
+
+# Per-worker state, set up once by init_color_worker
+worker_state = {}
+
+def init_color_worker(shared_memory_name, slot_shape, extractor_params):
+    """
+    Attach a pool worker to the shared frame slots.
+    
+    Args:
+        shared_memory_name (str): Name of the shared memory block.
+        slot_shape (tuple): Shape (slots, height, width, 3) of the frame slots.
+        extractor_params (dict): Keyword arguments of the JerseyColorExtractor.
+    """
+    frame_memory = shared_memory.SharedMemory(name=shared_memory_name)
+    worker_state['frame_memory'] = frame_memory
+    worker_state['frame_slots'] = np.ndarray(slot_shape, dtype=np.uint8, buffer=frame_memory.buf)
+    worker_state['color_extractor'] = JerseyColorExtractor(**extractor_params)
+
+def extract_slot_colors(slot, bboxes):
+    """
+    Compute the jersey colors of the players of the frame held in a slot.
+    
+    Args:
+        slot (int): Index of the frame slot.
+        bboxes (list): Player bounding boxes [x1, y1, x2, y2].
+    
+    Returns:
+        numpy.ndarray: Jersey colors of shape (players, 3).
+    """
+    frame = worker_state['frame_slots'][slot]
+    return worker_state['color_extractor'].get_player_colors(frame, bboxes)
+
+class ParallelColorExtractor:
+    def __init__(self, n_workers, frame_shape, color_extractor):
+        """
+        Initialize a process pool that extracts jersey colors in parallel.
+        
+        Frames are copied into slots of a shared memory block instead of being
+        pickled to the workers; only the boxes and the resulting colors travel
+        through the pool. Results come back in submission order, so the output
+        does not depend on the number of workers.
+        
+        Args:
+            n_workers (int): Number of worker processes.
+            frame_shape (tuple): Shape (height, width, 3) of the video frames.
+            color_extractor (JerseyColorExtractor): Extractor whose settings the
+                workers use.
+        """
+        self.slot_count = 2 * n_workers
+        slot_shape = (self.slot_count,) + tuple(frame_shape)
+        
+        self.frame_memory = shared_memory.SharedMemory(create=True, size=int(np.prod(slot_shape)))
+        self.frame_slots = np.ndarray(slot_shape, dtype=np.uint8, buffer=self.frame_memory.buf)
+        
+        extractor_params = {
+            'crop_size': color_extractor.crop_size,
+            'background_threshold': color_extractor.background_threshold,
+            'min_jersey_fraction': color_extractor.min_jersey_fraction
+        }
+        self.executor = ProcessPoolExecutor(
+            max_workers=n_workers,
+            initializer=init_color_worker,
+            initargs=(self.frame_memory.name, slot_shape, extractor_params)
+        )
+    
+    def extract(self, frame_requests):
+        """
+        Compute jersey colors for a stream of frames.
+        
+        Args:
+            frame_requests (iterable): (frame_num, frame, bboxes) tuples.
+        
+        Yields:
+            tuple: Frame index and jersey colors of shape (players, 3), in
+                the order of the requests.
+        """
+        pending = deque()
+        free_slots = deque(range(self.slot_count))
+        
+        for frame_num, frame, bboxes in frame_requests:
+            if not free_slots:
+                done_frame_num, done_slot, future = pending.popleft()
+                free_slots.append(done_slot)
+                yield done_frame_num, future.result()
+            
+            slot = free_slots.popleft()
+            self.frame_slots[slot] = frame
+            pending.append((frame_num, slot, self.executor.submit(extract_slot_colors, slot, list(bboxes))))
+        
+        while pending:
+            done_frame_num, _, future = pending.popleft()
+            yield done_frame_num, future.result()
+    
+    def close(self):
+        """
+        Stop the workers and release the shared memory block.
+        """
+        self.executor.shutdown()
+        del self.frame_slots
+        self.frame_memory.close()
+        self.frame_memory.unlink()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
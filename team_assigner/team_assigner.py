@@ -1,18 +1,53 @@
 from sklearn.cluster import KMeans
 import cv2
-import pickle
-import os
+import heapq
+import itertools
+import numpy as np
+import sys
+sys.path.append('../')
+from utils import read_stub, save_stub, get_tracks_digest
+from .jersey_color_extractor import JerseyColorExtractor
+from .parallel_color_extractor import ParallelColorExtractor
 
 class TeamAssigner:
-    def __init__(self):
+    def __init__(self, batched_colors=True, sampling=False, samples_per_track=3,
+                 max_sample_frames=300, min_vote_confidence=0.7, n_workers=0):
         """
         Initialize the TeamAssigner.
         
         The team assignment is based on clustering player jersey colors
         using K-means clustering algorithm.
+        
+        Args:
+            batched_colors (bool): Whether to compute jersey colors for all
+                players of a frame at once with a JerseyColorExtractor, rather
+                than fitting a K-means model on every player crop.
+            sampling (bool): Whether to decide each track's team by majority
+                vote over a few sampled frames instead of visiting every frame.
+            samples_per_track (int): Number of spread-out samples per track.
+            max_sample_frames (int): Cap on the frames decoded to spread the
+                samples, and again on the frames decoded to re-check tracks.
+                Giving every track its first sample is not capped.
+            min_vote_confidence (float): Tracks whose winning team got a
+                smaller share of the votes are sampled again.
+            n_workers (int): Number of worker processes extracting jersey
+                colors. With more than one, frames are handed to the workers
+                through shared memory; assignments are the same for any
+                worker count. Requires batched_colors.
         """
         self.team_colors = {}
         self.player_team_dict = {}
+        self.batched_colors = batched_colors
+        self.color_extractor = JerseyColorExtractor()
+        
+        self.sampling = sampling
+        self.samples_per_track = samples_per_track
+        self.max_sample_frames = max_sample_frames
+        self.min_vote_confidence = min_vote_confidence
+        self.player_team_confidence = {}
+        self.sampled_frame_count = 0
+        
+        self.n_workers = n_workers
         
     def get_clustering_model(self, image):
         """
@@ -66,20 +101,55 @@ class TeamAssigner:
         
         return player_color
 
-    def assign_team_color(self, frame, player_detections):
+    def get_player_colors(self, frame, bboxes):
         """
-        Assign team colors based on player jersey colors.
+        Extract the jersey colors of several players of a frame.
         
         Args:
             frame (numpy.ndarray): Input video frame.
-            player_detections (dict): Dictionary of player detections.
+            bboxes (list): Player bounding boxes [x1, y1, x2, y2].
+        
+        Returns:
+            numpy.ndarray: Jersey colors of shape (players, 3).
+        """
+        if self.batched_colors:
+            return self.color_extractor.get_player_colors(frame, bboxes)
+        return np.array([self.get_player_color(frame, bbox) for bbox in bboxes])
+
+    def iter_player_colors(self, frame_requests):
+        """
+        Extract jersey colors for a stream of frames, in a worker pool when
+        `n_workers` is above one and in this process otherwise.
+        
+        Args:
+            frame_requests (iterable): (frame_num, frame, bboxes) tuples.
+        
+        Yields:
+            tuple: Frame index and jersey colors of shape (players, 3), in
+                the order of the requests.
+        """
+        if self.n_workers <= 1 or not self.batched_colors:
+            for frame_num, frame, bboxes in frame_requests:
+                yield frame_num, self.get_player_colors(frame, bboxes)
+            return
+        
+        frame_requests = iter(frame_requests)
+        first_request = next(frame_requests, None)
+        if first_request is None:
+            return
+        
+        frame_shape = first_request[1].shape
+        with ParallelColorExtractor(self.n_workers, frame_shape, self.color_extractor) as extractor:
+            yield from extractor.extract(itertools.chain([first_request], frame_requests))
+
+    def fit_team_colors(self, player_colors):
         """
-        player_colors = []
-        for track_id, bbox in player_detections.items():
-            player_color = self.get_player_color(frame, bbox)
-            player_colors.append(player_color)
+        Fit the two team colors on a set of jersey colors.
         
-        kmeans = KMeans(n_clusters=2, init="k-means++", n_init=10)
+        Args:
+            player_colors (numpy.ndarray): Jersey colors of shape (players, 3).
+        """
+        kmeans = KMeans(n_clusters=2, init="k-means++", n_init=10, random_state=0)
         kmeans.fit(player_colors)
         
         self.kmeans = kmeans
@@ -87,6 +157,17 @@ class TeamAssigner:
         self.team_colors[1] = kmeans.cluster_centers_[0]
         self.team_colors[2] = kmeans.cluster_centers_[1]
 
+    def assign_team_color(self, frame, player_detections):
+        """
+        Assign team colors based on player jersey colors.
+        
+        Args:
+            frame (numpy.ndarray): Input video frame.
+            player_detections (dict): Dictionary of player detections.
+        """
+        player_colors = self.get_player_colors(frame, list(player_detections.values()))
+        self.fit_team_colors(player_colors)
+
     def get_player_team(self, frame, player_bbox, player_id):
         """
         Determine which team a player belongs to.
@@ -102,7 +183,7 @@ class TeamAssigner:
         if player_id in self.player_team_dict:
             return self.player_team_dict[player_id]
 
-        player_color = self.get_player_color(frame, player_bbox)
+        player_color = self.get_player_colors(frame, [player_bbox])[0]
         
         team_id = self.kmeans.predict(player_color.reshape(1, -1))[0]
         team_id += 1
@@ -112,39 +193,365 @@ class TeamAssigner:
         
         return team_id
 
-    def assign_teams(self, frames, player_detections, read_from_stub=False, stub_path=None):
+    def assign_new_players(self, frame, player_detection):
+        """
+        Assign teams to all players of a frame that do not have one yet,
+        with a single color extraction and a single K-means prediction.
+        
+        Args:
+            frame (numpy.ndarray): Input video frame.
+            player_detection (dict): Player detections of the frame.
+        """
+        new_player_ids = [player_id for player_id in player_detection
+                          if player_id is not None and player_id not in self.player_team_dict]
+        if not new_player_ids:
+            return
+        
+        player_colors = self.get_player_colors(frame, [player_detection[player_id] for player_id in new_player_ids])
+        team_ids = self.kmeans.predict(player_colors) + 1
+        
+        for player_id, team_id in zip(new_player_ids, team_ids):
+            self.player_team_dict[player_id] = team_id
+
+    def assign_frame(self, frame, player_detection):
+        """
+        Assign teams to the players of the next frame of a stream.
+        
+        The team colors are fitted on the first frame with at least two
+        players; earlier frames get no assignments.
+        
+        Args:
+            frame (numpy.ndarray): Input video frame.
+            player_detection (dict): Player detections of the frame.
+        
+        Returns:
+            dict: Team assignments of the frame.
+        """
+        if not self.team_colors:
+            if len(player_detection) < 2:
+                return {}
+            self.assign_team_color(frame, player_detection)
+        
+        self.assign_new_players(frame, player_detection)
+        
+        team_assignment = {}
+        for player_id, bbox in player_detection.items():
+            team = self.get_player_team(frame, bbox, player_id)
+            team_assignment[player_id] = team
+        
+        return team_assignment
+
+    def assign_teams(self, frames, player_detections, read_from_stub=False, stub_path=None, cache=None):
         """
         Assign teams to all players across all frames.
         
+        Frames are consumed in a single sequential pass, so a lazily decoded
+        VideoSource can be passed instead of a list. In sampling mode only the
+        sampled frames are read, see assign_teams_by_sampling().
+        
         Args:
-            frames (list): List of video frames.
+            frames (iterable): Video frames, as a list or a VideoSource.
             player_detections (list): List of player detections for each frame.
             read_from_stub (bool): Whether to read from cached results.
             stub_path (str): Path to cached team assignments.
+            cache (StubCache, optional): Content-addressed cache of stage results,
+                keyed by the video and the player detections. Only used when
+                `frames` is a VideoSource, whose file is hashed.
         
         Returns:
             list: List of team assignments for each frame.
         """
-        if read_from_stub and stub_path is not None and os.path.exists(stub_path):
-            with open(stub_path, 'rb') as f:
-                team_assignments = pickle.load(f)
+        cache_key = None
+        if cache is not None and getattr(frames, 'video_path', None) is not None:
+            cache_key = cache.make_key('team_assignments', video_path=frames.video_path,
+                                       player_detections=get_tracks_digest(player_detections),
+                                       batched_colors=self.batched_colors, sampling=self.sampling,
+                                       samples_per_track=self.samples_per_track,
+                                       max_sample_frames=self.max_sample_frames,
+                                       min_vote_confidence=self.min_vote_confidence)
+            team_assignments = cache.get(cache_key)
+            if team_assignments is not None:
+                return team_assignments
+        
+        team_assignments = read_stub(read_from_stub, stub_path)
+        if team_assignments is not None:
+            return team_assignments
+
+        if self.sampling or (self.n_workers > 0 and self.batched_colors):
+            if self.sampling:
+                team_assignments = self.assign_teams_by_sampling(frames, player_detections)
+            else:
+                team_assignments = self.assign_teams_in_parallel(frames, player_detections)
+            
+            save_stub(stub_path, team_assignments)
+            if cache_key is not None:
+                cache.put(cache_key, team_assignments)
             return team_assignments
+        
+        team_assignments = []
+        
+        for frame, player_detection in zip(frames, player_detections):
+            team_assignments.append(self.assign_frame(frame, player_detection))
+        
+        save_stub(stub_path, team_assignments)
+        if cache_key is not None:
+            cache.put(cache_key, team_assignments)
+        
+        return team_assignments
 
+    def assign_teams_in_parallel(self, frames, player_detections):
+        """
+        Assign teams with jersey colors extracted by iter_player_colors().
+        
+        Which players need a color is known from the detections alone: all
+        players of the first frame with at least two players, whose colors
+        fit the team colors, then each track on its first later frame. Only
+        those frames are handed out, and results are consumed in frame order,
+        so the assignments match the sequential pass of assign_teams(),
+        including the empty assignments of the frames before the fit.
+        
+        Args:
+            frames (iterable): Video frames, as a list or a VideoSource.
+            player_detections (list): List of player detections for each frame.
+        
+        Returns:
+            list: List of team assignments for each frame.
+        """
+        frame_player_ids = {}
+        
+        def frame_requests():
+            seen_ids = None
+            for frame_num, (frame, player_detection) in enumerate(zip(frames, player_detections)):
+                if seen_ids is None:
+                    # Team colors are fitted on the first frame with at least two players
+                    if len(player_detection) < 2:
+                        continue
+                    player_ids = list(player_detection)
+                    seen_ids = set()
+                else:
+                    player_ids = [player_id for player_id in player_detection
+                                  if player_id is None or player_id not in seen_ids]
+                    if not player_ids:
+                        continue
+                seen_ids.update(player_ids)
+                
+                frame_player_ids[frame_num] = player_ids
+                yield frame_num, frame, [player_detection[player_id] for player_id in player_ids]
+        
+        # Players without a track id get a team per frame, as in get_player_team()
+        untracked_teams = {}
+        fit_frame_num = None
+        for frame_num, player_colors in self.iter_player_colors(frame_requests()):
+            player_ids = frame_player_ids.pop(frame_num)
+            if fit_frame_num is None:
+                fit_frame_num = frame_num
+                self.fit_team_colors(player_colors)
+            
+            team_ids = self.kmeans.predict(player_colors) + 1
+            for player_id, team_id in zip(player_ids, team_ids):
+                if player_id is None:
+                    untracked_teams[frame_num] = team_id
+                elif player_id not in self.player_team_dict:
+                    self.player_team_dict[player_id] = team_id
+        
         team_assignments = []
+        for frame_num, player_detection in enumerate(player_detections):
+            if fit_frame_num is None or frame_num < fit_frame_num:
+                team_assignments.append({})
+                continue
+            team_assignments.append({
+                player_id: untracked_teams[frame_num] if player_id is None else self.player_team_dict[player_id]
+                for player_id in player_detection
+            })
+        return team_assignments
+
+    def get_track_segments(self, player_detections, segments_per_track, player_ids=None):
+        """
+        Split the lifetime of every track into segments of equal frame count.
+        
+        Args:
+            player_detections (list): List of player detections for each frame.
+            segments_per_track (int): Number of segments per track.
+            player_ids (set, optional): Only segment these tracks.
         
+        Returns:
+            dict: For each frame, the (player_id, segment) pairs it can sample.
+        """
+        track_frames = {}
         for frame_num, player_detection in enumerate(player_detections):
-            if frame_num == 0:
-                self.assign_team_color(frames[frame_num], player_detection)
+            for player_id in player_detection:
+                if player_id is None or (player_ids is not None and player_id not in player_ids):
+                    continue
+                track_frames.setdefault(player_id, []).append(frame_num)
+        
+        frame_segments = {}
+        for player_id, frame_nums in track_frames.items():
+            for i, frame_num in enumerate(frame_nums):
+                segment = i * segments_per_track // len(frame_nums)
+                frame_segments.setdefault(frame_num, []).append((player_id, segment))
+        return frame_segments
+
+    def plan_sample_frames(self, frame_units, served_units, max_frames=None):
+        """
+        Greedily pick the frames that serve the most not-yet-served units.
+        
+        A frame is only picked while it serves at least one new unit, so frames
+        that add nothing are never decoded. Ties go to the earliest frame.
+        
+        Args:
+            frame_units (dict): Units (e.g. track ids) each frame can serve.
+            served_units (set): Units already served; updated in place.
+            max_frames (int, optional): Maximum number of frames to pick.
+        
+        Returns:
+            list: Picked frame indices.
+        """
+        heap = [(-len(units), frame_num) for frame_num, units in frame_units.items()]
+        heapq.heapify(heap)
+        
+        selected_frames = []
+        while heap and (max_frames is None or len(selected_frames) < max_frames):
+            negative_gain, frame_num = heapq.heappop(heap)
+            gain = sum(1 for unit in frame_units[frame_num] if unit not in served_units)
+            if gain == 0:
+                continue
             
-            team_assignment = {}
-            for player_id, bbox in player_detection.items():
-                team = self.get_player_team(frames[frame_num], bbox, player_id)
-                team_assignment[player_id] = team
+            # Gains only shrink, so re-queue stale entries until the top is current
+            if gain < -negative_gain:
+                heapq.heappush(heap, (-gain, frame_num))
+                continue
             
-            team_assignments.append(team_assignment)
+            selected_frames.append(frame_num)
+            served_units.update(frame_units[frame_num])
+        return selected_frames
+
+    def read_sample_frames(self, frames, frame_nums):
+        """
+        Read only the selected frames.
+        
+        Args:
+            frames (list or VideoSource): Video frames.
+            frame_nums (list): Indices of the frames to read.
         
-        if stub_path is not None:
-            with open(stub_path, 'wb') as f:
-                pickle.dump(team_assignments, f)
+        Yields:
+            tuple: Frame index and video frame.
+        """
+        self.sampled_frame_count += len(set(frame_nums))
+        if hasattr(frames, 'iter_frames'):
+            yield from frames.iter_frames(frame_nums)
+            return
+        for frame_num in sorted(set(frame_nums)):
+            yield frame_num, frames[frame_num]
+
+    def collect_samples(self, frames, player_detections, frame_segments, frame_nums, sampled_units, track_colors):
+        """
+        Extract jersey colors of the tracks sampled in the selected frames,
+        at most one sample per (player_id, segment).
+        
+        Args:
+            frames (list or VideoSource): Video frames.
+            player_detections (list): List of player detections for each frame.
+            frame_segments (dict): Output of get_track_segments().
+            frame_nums (list): Indices of the frames to sample.
+            sampled_units (set): (player_id, segment) pairs already sampled; updated in place.
+            track_colors (dict): Jersey colors per player id; updated in place.
+        """
+        frame_player_ids = {}
+        
+        def frame_requests():
+            for frame_num, frame in self.read_sample_frames(frames, frame_nums):
+                player_ids = []
+                for unit in frame_segments.get(frame_num, []):
+                    if unit not in sampled_units:
+                        sampled_units.add(unit)
+                        player_ids.append(unit[0])
+                if not player_ids:
+                    continue
+                
+                frame_player_ids[frame_num] = player_ids
+                yield frame_num, frame, [player_detections[frame_num][player_id] for player_id in player_ids]
+        
+        for frame_num, player_colors in self.iter_player_colors(frame_requests()):
+            for player_id, color in zip(frame_player_ids.pop(frame_num), player_colors):
+                track_colors.setdefault(player_id, []).append(color)
+
+    def vote_teams(self, track_colors):
+        """
+        Decide each track's team by majority vote over its samples.
+        
+        Args:
+            track_colors (dict): Jersey colors per player id.
+        """
+        for player_id, colors in track_colors.items():
+            votes = np.bincount(self.kmeans.predict(np.array(colors)), minlength=2)
+            self.player_team_dict[player_id] = int(votes.argmax()) + 1
+            self.player_team_confidence[player_id] = votes.max() / votes.sum()
+
+    def assign_teams_by_sampling(self, frames, player_detections):
+        """
+        Assign teams from a sparse set of frames with per-track voting.
         
+        Frames are picked so that every track gets a first sample, then up to
+        `samples_per_track` samples spread over its lifetime, within
+        `max_sample_frames`. Team colors are fitted on all samples and each
+        track's team is the majority vote of its samples. Tracks whose vote is
+        less confident than `min_vote_confidence` are sampled again with a
+        finer spread. Frames that would add no new sample are never read.
+        
+        Args:
+            frames (list or VideoSource): Video frames.
+            player_detections (list): List of player detections for each frame.
+        
+        Returns:
+            list: List of team assignments for each frame.
+        """
+        self.sampled_frame_count = 0
+        frame_segments = self.get_track_segments(player_detections, self.samples_per_track)
+        
+        # Give every track one sample, then spread the remaining samples
+        frame_tracks = {frame_num: [player_id for player_id, _ in units]
+                        for frame_num, units in frame_segments.items()}
+        sample_frames = self.plan_sample_frames(frame_tracks, set())
+        
+        served_units = set()
+        for frame_num in sample_frames:
+            served_units.update(frame_segments[frame_num])
+        covered_frames = set(sample_frames)
+        spread_frames = {frame_num: units for frame_num, units in frame_segments.items()
+                         if frame_num not in covered_frames}
+        sample_frames += self.plan_sample_frames(spread_frames, served_units, self.max_sample_frames)
+        
+        track_colors = {}
+        self.collect_samples(frames, player_detections, frame_segments, sample_frames, set(), track_colors)
+        if not track_colors:
+            return [{} for _ in player_detections]
+        
+        all_colors = np.array([color for colors in track_colors.values() for color in colors])
+        self.fit_team_colors(all_colors)
+        
+        self.vote_teams(track_colors)
+        
+        # Re-check tracks with an unclear vote using twice as many segments
+        uncertain_ids = {player_id for player_id, confidence in self.player_team_confidence.items()
+                         if confidence < self.min_vote_confidence}
+        if uncertain_ids:
+            recheck_segments = self.get_track_segments(player_detections, 2 * self.samples_per_track, uncertain_ids)
+            sampled_frames = set(sample_frames)
+            sampled_units = set()
+            for frame_num in sampled_frames:
+                sampled_units.update(recheck_segments.get(frame_num, []))
+            
+            recheck_frames = self.plan_sample_frames(
+                {frame_num: units for frame_num, units in recheck_segments.items() if frame_num not in sampled_frames},
+                set(sampled_units),
+                self.max_sample_frames
+            )
+            recheck_colors = {player_id: list(track_colors[player_id]) for player_id in uncertain_ids}
+            self.collect_samples(frames, player_detections, recheck_segments, recheck_frames, sampled_units, recheck_colors)
+            self.vote_teams(recheck_colors)
+        
+        team_assignments = []
+        for player_detection in player_detections:
+            team_assignments.append({player_id: self.player_team_dict[player_id]
+                                     for player_id in player_detection if player_id in self.player_team_dict})
         return team_assignments
\ No newline at end of file
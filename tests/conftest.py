@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The packages of the repository are imported from its root, as main.py does
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -0,0 +1,57 @@
+import numpy as np
+from ball_aquisition import BallAquisitionDetector
+
+def make_detections(frame_count=200, seed=0):
+    rng = np.random.default_rng(seed)
+    player_detections = []
+    ball_detections = []
+    team_assignments = []
+    for _ in range(frame_count):
+        player_detection = {}
+        for player_id in rng.choice(np.arange(1, 12), size=rng.integers(0, 8), replace=False).tolist():
+            x, y = rng.uniform(0, 500, size=2).round(1).tolist()
+            player_detection[player_id] = [x, y, x + 40.0, y + 90.0]
+        player_detections.append(player_detection)
+        team_assignments.append({player_id: 1 + player_id % 2 for player_id in player_detection})
+        
+        if rng.random() < 0.8:
+            x, y = rng.uniform(0, 540, size=2).round(1).tolist()
+            ball_detections.append({1: [x, y, x + 10.0, y + 10.0]})
+        else:
+            ball_detections.append({})
+    return player_detections, ball_detections, team_assignments
+
+def test_vectorized_matches_loop():
+    detector = BallAquisitionDetector()
+    player_detections, ball_detections, team_assignments = make_detections()
+    
+    expected = detector.detect_frames(player_detections, ball_detections, True, team_assignments)
+    actual = detector.detect_frames_vectorized(player_detections, ball_detections, True, team_assignments)
+    
+    assert any(expected)
+    assert actual == expected
+
+def test_vectorized_without_ball():
+    detector = BallAquisitionDetector()
+    player_detections = [{1: [0.0, 0.0, 10.0, 10.0]}, {}]
+    
+    assert detector.detect_frames_vectorized(player_detections, [{}, {}]) == [{}, {}]
+
+def test_hysteresis_drops_short_runs():
+    detector = BallAquisitionDetector()
+    possession = np.array([-1, 0, 0, 0, 1, 0, 0, 0, -1, -1, 2, 2, 2, 2])
+    
+    smoothed = detector.apply_possession_hysteresis(possession, 3)
+    
+    assert smoothed.tolist() == [-1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 2, 2, 2, 2]
+
+def test_hysteresis_carries_the_last_ball_box():
+    detector = BallAquisitionDetector()
+    player_bbox = [100.0, 100.0, 140.0, 190.0]
+    ball_bbox = [115.0, 140.0, 125.0, 150.0]
+    player_detections = [{5: player_bbox} for _ in range(6)]
+    ball_detections = [{1: ball_bbox}, {1: ball_bbox}, {1: ball_bbox}, {}, {}, {1: ball_bbox}]
+    
+    ball_acquisition_frames = detector.detect_frames_vectorized(player_detections, ball_detections, min_frames=3)
+    
+    assert ball_acquisition_frames == [{5: ball_bbox} for _ in range(6)]
@@ -0,0 +1,144 @@
+import numpy as np
+import pytest
+
+pytest.importorskip('ultralytics')
+pytest.importorskip('supervision')
+
+from ball_tracker import BallTracker
+from utils import InferenceStats, is_interpolated
+
+BALL_SIZE = 10
+
+class FakeBallModel:
+    """
+    Stands in for the YOLO model: the ball is the white square of the
+    image, found with the given confidence.
+    """
+    def __init__(self, confidence=0.9):
+        self.confidence = confidence
+        self.image_shapes = []
+    
+    def __call__(self, images, imgsz=640):
+        images = images if isinstance(images, list) else [images]
+        results = []
+        for image in images:
+            self.image_shapes.append(image.shape[:2])
+            ys, xs = np.nonzero(image[..., 0] == 255)
+            if len(xs) == 0:
+                results.append((None, 0))
+            else:
+                results.append(([float(xs.min()), float(ys.min()), float(xs.max() + 1), float(ys.max() + 1)],
+                                self.confidence))
+        return results
+
+class FakeBallTracker(BallTracker):
+    """
+    BallTracker with a FakeBallModel instead of a YOLO model.
+    """
+    def __init__(self, model, batch_size=1, roi_tracking=False, roi_size=320, max_roi_misses=5,
+                 min_roi_confidence=0.3, detection_stride=1):
+        self.model = model
+        self.model_path = 'fake_ball_detector.pt'
+        self.batch_size = batch_size
+        self.detection_stride = detection_stride
+        self.inference_stats = InferenceStats()
+        
+        self.roi_tracking = roi_tracking
+        self.roi_size = roi_size
+        self.max_roi_misses = max_roi_misses
+        self.min_roi_confidence = min_roi_confidence
+        self.reset_roi_tracking()
+    
+    def get_best_detection(self, result):
+        return result
+
+def make_frame(ball_position, frame_shape=(720, 1280)):
+    frame = np.zeros(frame_shape + (3,), dtype=np.uint8)
+    if ball_position is not None:
+        x, y = ball_position
+        frame[y:y + BALL_SIZE, x:x + BALL_SIZE] = 255
+    return frame
+
+def get_ball_bbox(ball_position):
+    x, y = ball_position
+    return [float(x), float(y), float(x + BALL_SIZE), float(y + BALL_SIZE)]
+
+def test_stride_interpolates_the_ball():
+    ball_positions = [(100 + 20 * frame_num, 300) for frame_num in range(7)]
+    ball_tracker = FakeBallTracker(FakeBallModel(), batch_size=2, detection_stride=2)
+    
+    ball_detections = ball_tracker.detect_frames([make_frame(position) for position in ball_positions])
+    
+    assert len(ball_tracker.model.image_shapes) == 4
+    assert [ball_detection[1] for ball_detection in ball_detections] == \
+        [get_ball_bbox(position) for position in ball_positions]
+    assert [is_interpolated(ball_detection[1]) for ball_detection in ball_detections] == \
+        [False, True, False, True, False, True, False]
+
+def test_stride_one_detects_every_frame():
+    ball_positions = [(100 + 20 * frame_num, 300) if frame_num != 2 else None for frame_num in range(5)]
+    ball_tracker = FakeBallTracker(FakeBallModel(), batch_size=4)
+    
+    ball_detections = ball_tracker.detect_frames([make_frame(position) for position in ball_positions])
+    
+    assert ball_detections == [{1: get_ball_bbox(position)} if position is not None else {}
+                               for position in ball_positions]
+
+def test_roi_window_is_clamped_to_the_frame():
+    ball_tracker = FakeBallTracker(FakeBallModel(), roi_size=320)
+    frame = make_frame(None)
+    
+    assert ball_tracker.get_roi_window(frame, (640, 360)) == (480, 200, 800, 520)
+    assert ball_tracker.get_roi_window(frame, (10, 20)) == (0, 0, 320, 320)
+    assert ball_tracker.get_roi_window(frame, (1275, 715)) == (960, 400, 1280, 720)
+    # A frame smaller than the window is searched whole
+    assert ball_tracker.get_roi_window(make_frame(None, (200, 1280)), (640, 100)) == (480, 0, 800, 200)
+
+def test_ball_position_is_predicted_at_constant_velocity():
+    ball_tracker = FakeBallTracker(FakeBallModel())
+    assert ball_tracker.predict_ball_position(0) is None
+    
+    ball_tracker.ball_history.append((0, (100, 200)))
+    assert ball_tracker.predict_ball_position(1) == (100, 200)
+    
+    ball_tracker.ball_history.append((2, (120, 190)))
+    assert ball_tracker.predict_ball_position(5) == (150, 175)
+
+def test_roi_detections_are_in_frame_coordinates():
+    ball_positions = [(1000 + 30 * frame_num, 600 + 10 * frame_num) for frame_num in range(8)]
+    model = FakeBallModel()
+    ball_tracker = FakeBallTracker(model, roi_tracking=True, roi_size=320)
+    
+    ball_detections = [ball_tracker.track_frame(make_frame(position), frame_num)
+                       for frame_num, position in enumerate(ball_positions)]
+    
+    assert ball_detections == [{1: get_ball_bbox(position)} for position in ball_positions]
+    assert ball_tracker.full_frame_searches == 1
+    assert ball_tracker.roi_searches == 7
+    assert model.image_shapes == [(720, 1280)] + [(320, 320)] * 7
+
+def test_roi_falls_back_to_full_frame_after_misses():
+    # The ball leaves for a few frames and comes back far from where it was heading
+    ball_positions = [(100, 100), (110, 100), None, None, None, (1100, 600), (1110, 600)]
+    ball_tracker = FakeBallTracker(FakeBallModel(), roi_tracking=True, roi_size=160, max_roi_misses=2)
+    
+    ball_detections = [ball_tracker.track_frame(make_frame(position), frame_num)
+                       for frame_num, position in enumerate(ball_positions)]
+    
+    assert ball_detections == [{1: get_ball_bbox(position)} if frame_num in (0, 1, 5, 6) else {}
+                               for frame_num, position in enumerate(ball_positions)]
+    # Two crop misses, then full-frame searches until the ball is found again
+    assert ball_tracker.full_frame_searches == 3
+    assert ball_tracker.roi_searches == 4
+
+def test_low_confidence_roi_hit_is_a_miss():
+    ball_tracker = FakeBallTracker(FakeBallModel(confidence=0.9), roi_tracking=True, max_roi_misses=1)
+    ball_tracker.track_frame(make_frame((100, 100)), 0)
+    
+    ball_tracker.model.confidence = 0.1
+    assert ball_tracker.track_frame(make_frame((105, 100)), 1) == {}
+    assert ball_tracker.roi_misses == 1
+    
+    # The full-frame search takes any confidence
+    assert ball_tracker.track_frame(make_frame((110, 100)), 2) == {1: get_ball_bbox((110, 100))}
+    assert ball_tracker.full_frame_searches == 2
@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+from tactical_view_converter import HomographyTracker
+
+TARGET_POINTS = np.array([[0, 0], [94, 0], [0, 50], [94, 50]], dtype=np.float32)
+SOURCE_POINTS = np.array([[100, 100], [1040, 100], [100, 600], [1040, 600]], dtype=np.float32)
+
+def test_counts_only_reused_matrices_as_avoided():
+    homography_tracker = HomographyTracker(drift_threshold=2.0, refine_threshold=15.0)
+    
+    homography_tracker.update(SOURCE_POINTS, TARGET_POINTS)
+    homography_tracker.update(SOURCE_POINTS + 1, TARGET_POINTS)
+    homography_tracker.update(SOURCE_POINTS + 5, TARGET_POINTS)
+    homography_tracker.update(SOURCE_POINTS + 50, TARGET_POINTS)
+    
+    assert homography_tracker.get_stats() == {
+        'ransac_calls': 2,
+        'reused': 1,
+        'refined': 1,
+        'ransac_calls_avoided': 1
+    }
+
+def test_no_smoothing_follows_the_keypoints():
+    homography_tracker = HomographyTracker(smoothing=0.0)
+    homography_tracker.update(SOURCE_POINTS, TARGET_POINTS)
+    
+    homography_matrix = homography_tracker.update(SOURCE_POINTS + 5, TARGET_POINTS)
+    
+    projected = homography_matrix @ np.array([105.0, 105.0, 1.0])
+    assert projected[:2] / projected[2] == pytest.approx([0.0, 0.0], abs=1e-4)
+
+def test_smoothing_lags_behind_a_refit():
+    homography_tracker = HomographyTracker(smoothing=0.6)
+    homography_tracker.update(SOURCE_POINTS, TARGET_POINTS)
+    
+    homography_matrix = homography_tracker.update(SOURCE_POINTS + 5, TARGET_POINTS)
+    
+    projected = homography_matrix @ np.array([105.0, 105.0, 1.0])
+    assert projected[0] / projected[2] > 0.1
@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+from drawers import HudCompositor
+from drawers.utils import draw_text_with_background
+
+@pytest.mark.parametrize('position', [(50, 130), (3, 10), (600, 470), (-20, 5)])
+@pytest.mark.parametrize('style', [
+    {},
+    {'text_color': (255, 255, 255), 'bg_color': (0, 128, 0)},
+    {'font_scale': 1.2, 'thickness': 3, 'text_color': (0, 0, 0), 'bg_color': (0, 0, 0), 'padding': 0}
+])
+def test_panel_matches_direct_draw(position, style):
+    rng = np.random.default_rng(0)
+    frame = rng.integers(0, 256, size=(480, 640, 3), dtype=np.uint8)
+    text = "Team 1 Ball Control: 57.25% gjpq"
+    
+    expected = draw_text_with_background(frame.copy(), text, position, **style)
+    actual = HudCompositor().draw_panel(frame.copy(), 'panel', text, position, **style)
+    
+    assert np.array_equal(actual, expected)
+
+def test_panel_rendered_once_per_text():
+    hud = HudCompositor()
+    frame = np.zeros((240, 320, 3), dtype=np.uint8)
+    
+    for text in ['A', 'A', 'A', 'B', 'B']:
+        hud.draw_panel(frame, 'panel', text, (20, 40))
+    
+    assert hud.render_count == 2
+    assert hud.blit_count == 5
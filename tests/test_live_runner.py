@@ -0,0 +1,149 @@
+import time
+from pipeline import LiveRunner
+
+class FakeStreamAnalyzer:
+    """
+    Stands in for StreamAnalyzer, with a detection time that can be changed
+    between frames and a possession change every tenth frame.
+    """
+    def __init__(self, detect_time=0.0):
+        self.detect_time = detect_time
+        self.detected_frames = []
+    
+    def detect(self, item):
+        time.sleep(self.detect_time)
+        self.detected_frames.append(item['frame_num'])
+        item['detection_skipped'] = False
+        return item
+    
+    def skip_detection(self, item):
+        item['detection_skipped'] = True
+        return item
+    
+    def analyze(self, item):
+        item['events'] = [('possession', {'frame': item['frame_num']})] if item['frame_num'] % 10 == 0 else []
+        item['frame_data'] = {}
+        return item
+
+class FakeFrameDrawer:
+    def __init__(self, draw_time=0.0):
+        self.draw_time = draw_time
+    
+    def draw_frame(self, frame, frame_num, frame_data):
+        time.sleep(self.draw_time)
+        return frame + 1
+
+class FakeLiveSource:
+    fps = 25
+    frames_dropped = 0
+    
+    def __init__(self, frame_count, capture_slots=None):
+        self.frame_count = frame_count
+        self.capture_slots = capture_slots
+    
+    def __iter__(self):
+        start_time = time.perf_counter()
+        for frame_num in range(self.frame_count):
+            if self.capture_slots is None:
+                yield frame_num, frame_num * 10, time.perf_counter()
+            else:
+                # Frames captured at the slots of the source frame rate, with gaps
+                yield frame_num, frame_num * 10, start_time + self.capture_slots[frame_num] / self.fps
+
+def make_item(frame_num, capture_time=None):
+    return {'frame_num': frame_num, 'frame': 0,
+            'capture_time': time.perf_counter() if capture_time is None else capture_time}
+
+def test_run_yields_every_frame_in_order():
+    events = []
+    live_runner = LiveRunner(FakeStreamAnalyzer(), FakeFrameDrawer(), latency_budget=1.0,
+                             on_event=lambda event_type, event_info, latency: events.append(event_info['frame']))
+    
+    items = list(live_runner.run(FakeLiveSource(30)))
+    
+    assert [item['frame_num'] for item in items] == list(range(30))
+    assert [item['frame'] for item in items] == [frame_num * 10 + 1 for frame_num in range(30)]
+    assert events == [0, 10, 20]
+    stats = live_runner.get_stats()
+    assert stats['frames_processed'] == 30
+    assert stats['detections_skipped'] == 0 and stats['frames_undrawn'] == 0
+    assert all(item['frame_drawn'] and item['missing_frames'] == 0 for item in items)
+
+def test_frames_dropped_at_capture_leave_missing_frames():
+    capture_slots = [0, 1, 2, 5, 6, 7, 10, 11]
+    live_runner = LiveRunner(FakeStreamAnalyzer(), FakeFrameDrawer(), latency_budget=1.0)
+    
+    items = list(live_runner.run(FakeLiveSource(len(capture_slots), capture_slots)))
+    
+    assert [item['missing_frames'] for item in items] == [0, 0, 0, 2, 0, 0, 2, 0]
+    # Every slot of the source frame rate is filled once the gaps are repeated
+    assert len(items) + live_runner.get_stats()['missing_frames'] == capture_slots[-1] + 1
+
+def test_detection_is_forced_after_skipped_frames():
+    stream_analyzer = FakeStreamAnalyzer()
+    live_runner = LiveRunner(stream_analyzer, FakeFrameDrawer(), latency_budget=0.1,
+                             max_skipped_detections=3, max_stale_time=10.0)
+    live_runner.detect(make_item(0))
+    
+    # A single slow detection leaves an estimate far above the budget
+    live_runner.stage_times['detect'] = 10.0
+    items = [live_runner.detect(make_item(frame_num)) for frame_num in range(1, 9)]
+    
+    assert [item['detection_skipped'] for item in items] == [True, True, True, False] * 2
+    assert stream_analyzer.detected_frames == [0, 4, 8]
+
+def test_detection_is_forced_when_detections_are_stale():
+    stream_analyzer = FakeStreamAnalyzer()
+    live_runner = LiveRunner(stream_analyzer, FakeFrameDrawer(), latency_budget=0.1,
+                             max_skipped_detections=100, max_stale_time=0.5)
+    capture_time = time.perf_counter()
+    live_runner.detect(make_item(0, capture_time))
+    live_runner.stage_times['detect'] = 10.0
+    
+    assert live_runner.detect(make_item(1, capture_time + 0.4))['detection_skipped']
+    assert not live_runner.detect(make_item(2, capture_time + 0.6))['detection_skipped']
+
+def test_skipped_detection_estimate_decays():
+    stream_analyzer = FakeStreamAnalyzer()
+    live_runner = LiveRunner(stream_analyzer, FakeFrameDrawer(), latency_budget=0.1,
+                             max_skipped_detections=100, max_stale_time=100.0)
+    live_runner.detect(make_item(0))
+    live_runner.stage_times['detect'] = 1.0
+    
+    for frame_num in range(1, 100):
+        if not live_runner.detect(make_item(frame_num))['detection_skipped']:
+            break
+    
+    # Detection resumes by itself once the stale estimate fits the budget
+    assert 1 < frame_num < 100
+    assert live_runner.consecutive_skipped_detections == 0
+
+def test_drawing_is_forced_after_undrawn_frames():
+    live_runner = LiveRunner(FakeStreamAnalyzer(), FakeFrameDrawer(), latency_budget=0.1, max_undrawn_frames=2)
+    live_runner.stage_times['draw'] = 10.0
+    
+    items = []
+    for frame_num in range(6):
+        item = make_item(frame_num)
+        item['frame_data'] = {}
+        items.append(live_runner.draw(item))
+    
+    # Late frames keep the captured frame instead of leaving a gap in the output
+    assert [item['frame_drawn'] for item in items] == [False, False, True, False, False, True]
+    assert [item['frame'] for item in items] == [0, 0, 1, 0, 0, 1]
+    assert live_runner.stage_times['draw'] < 10.0 * (1 - live_runner.smoothing) ** 4
+
+def test_slow_start_does_not_starve_detection():
+    stream_analyzer = FakeStreamAnalyzer(detect_time=0.05)
+    live_runner = LiveRunner(stream_analyzer, FakeFrameDrawer(), latency_budget=0.06,
+                             max_skipped_detections=5, max_stale_time=10.0)
+    
+    items = []
+    for item in live_runner.run(FakeLiveSource(60)):
+        items.append(item)
+        if len(items) == 5:
+            stream_analyzer.detect_time = 0.0
+    
+    assert len(items) == 60
+    # The runner measures the fast detector again and detects most late frames
+    assert len([frame_num for frame_num in stream_analyzer.detected_frames if frame_num >= 30]) > 20
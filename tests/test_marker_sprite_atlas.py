@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+from drawers.utils import MarkerSpriteAtlas, draw_ellipse, draw_triangle
+
+@pytest.mark.parametrize('track_id', [None, 7, 42, 123, 1000, 123456])
+@pytest.mark.parametrize('bbox', [[300, 100, 340, 220], [250.5, 80.2, 390.7, 300.9]])
+def test_ellipse_matches_direct_draw(track_id, bbox):
+    frame = np.random.default_rng(0).integers(0, 256, size=(480, 640, 3), dtype=np.uint8)
+    
+    expected = draw_ellipse(frame.copy(), bbox, (0, 0, 255), track_id)
+    actual = MarkerSpriteAtlas(width_bucket=1).draw_ellipse(frame.copy(), bbox, (0, 0, 255), track_id)
+    
+    assert np.array_equal(actual, expected)
+
+def test_triangle_matches_direct_draw():
+    frame = np.full((480, 640, 3), 90, dtype=np.uint8)
+    bbox = [300, 100, 340, 220]
+    
+    expected = draw_triangle(frame.copy(), bbox, (0, 255, 0))
+    actual = MarkerSpriteAtlas().draw_triangle(frame.copy(), bbox, (0, 255, 0))
+    
+    assert np.array_equal(actual, expected)
+
+def test_sprites_are_reused():
+    atlas = MarkerSpriteAtlas()
+    frame = np.zeros((480, 640, 3), dtype=np.uint8)
+    
+    for x in range(100, 200, 10):
+        atlas.draw_ellipse(frame, [x, 100, x + 40, 220], (255, 0, 0), 5)
+    
+    assert atlas.misses == 1
+    assert atlas.hits == 9
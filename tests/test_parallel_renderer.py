@@ -0,0 +1,42 @@
+import pickle
+import numpy as np
+from drawers import ParallelRenderer, SharedArrays
+
+class OffsetRenderer:
+    def __init__(self, offsets):
+        self.offsets = offsets
+    
+    def __call__(self, frame, frame_num):
+        frame += np.uint8(self.offsets.arrays['offsets'][frame_num])
+        return frame
+
+def test_shared_arrays_pickle_by_reference():
+    arrays = {
+        'ids': np.arange(100000),
+        'empty': np.empty((0, 4)),
+        'stats': np.zeros(3, dtype=[('speed', np.float32), ('total_distance', np.float32)])
+    }
+    with SharedArrays(arrays) as shared_arrays:
+        data = pickle.dumps(shared_arrays)
+        attached_arrays = pickle.loads(data)
+        
+        assert len(data) < 1000
+        for name, array in arrays.items():
+            assert np.array_equal(attached_arrays.arrays[name], array)
+            assert attached_arrays.arrays[name].dtype == array.dtype
+        
+        shared_arrays.arrays['ids'][0] = -1
+        assert attached_arrays.arrays['ids'][0] == -1
+        attached_arrays.close()
+
+def test_renders_in_order():
+    frames = [np.full((8, 8, 3), frame_num, dtype=np.uint8) for frame_num in range(21)]
+    offsets = np.arange(21) * 2
+    
+    with SharedArrays({'offsets': offsets}) as shared_arrays, \
+            ParallelRenderer(OffsetRenderer(shared_arrays), 2, (8, 8, 3), chunk_size=4) as parallel_renderer:
+        rendered_frames = list(parallel_renderer.render(frames))
+    
+    assert len(rendered_frames) == 21
+    for frame_num, frame in enumerate(rendered_frames):
+        assert (frame == frame_num * 3).all()
@@ -0,0 +1,112 @@
+import numpy as np
+from pass_and_interception_detector import PassAndInterceptionDetector, PassAndInterceptionEngine
+
+def get_owner(ball_acquisition, team_assignment):
+    for player_id in ball_acquisition:
+        if player_id != 'team' and player_id != 'team_ball_control':
+            return player_id, team_assignment.get(player_id)
+    return None, None
+
+def detect_passes_reference(ball_acquisition_frames, team_assignments):
+    """
+    The separate pass scan the engine replaces.
+    """
+    passes = []
+    previous_ball_owner = None
+    previous_team = None
+    for frame_num, ball_acquisition in enumerate(ball_acquisition_frames):
+        current_ball_owner, current_team = get_owner(ball_acquisition, team_assignments[frame_num])
+        if (previous_ball_owner is not None and current_ball_owner is not None and
+                previous_ball_owner != current_ball_owner and
+                previous_team == current_team and previous_team is not None):
+            passes.append({'frame': frame_num, 'from_player': previous_ball_owner,
+                           'to_player': current_ball_owner, 'team': current_team})
+        if current_ball_owner is not None:
+            previous_ball_owner = current_ball_owner
+            previous_team = current_team
+    return passes
+
+def detect_interceptions_reference(ball_acquisition_frames, team_assignments):
+    """
+    The separate interception scan the engine replaces.
+    """
+    interceptions = []
+    previous_team = None
+    for frame_num, ball_acquisition in enumerate(ball_acquisition_frames):
+        current_ball_owner, current_team = get_owner(ball_acquisition, team_assignments[frame_num])
+        if previous_team is not None and current_team is not None and previous_team != current_team:
+            interceptions.append({'frame': frame_num, 'intercepting_player': current_ball_owner,
+                                  'intercepting_team': current_team, 'previous_team': previous_team})
+        if current_team is not None:
+            previous_team = current_team
+    return interceptions
+
+def make_possession(frame_count=500, seed=0):
+    """
+    Random possession with runs of the same owner, frames without an owner
+    and owners whose team is not known yet.
+    """
+    rng = np.random.default_rng(seed)
+    ball_acquisition_frames = []
+    team_assignments = []
+    owner = None
+    for _ in range(frame_count):
+        if rng.random() < 0.15:
+            owner = None if rng.random() < 0.3 else int(rng.integers(1, 9))
+        team_assignment = {player_id: 1 + player_id % 2 for player_id in range(1, 9) if rng.random() > 0.05}
+        ball_acquisition = {}
+        if owner is not None:
+            ball_acquisition = {owner: True}
+            if owner in team_assignment:
+                ball_acquisition['team_ball_control'] = team_assignment[owner]
+        ball_acquisition_frames.append(ball_acquisition)
+        team_assignments.append(team_assignment)
+    return ball_acquisition_frames, team_assignments
+
+def test_detector_matches_separate_scans():
+    for seed in range(5):
+        ball_acquisition_frames, team_assignments = make_possession(seed=seed)
+        
+        passes, interceptions = PassAndInterceptionDetector().detect_passes_and_interceptions(
+            ball_acquisition_frames,
+            team_assignments
+        )
+        
+        assert passes == detect_passes_reference(ball_acquisition_frames, team_assignments)
+        assert interceptions == detect_interceptions_reference(ball_acquisition_frames, team_assignments)
+        assert passes and interceptions
+
+def test_engine_streams_the_same_events():
+    ball_acquisition_frames, team_assignments = make_possession()
+    passes = []
+    interceptions = []
+    engine = PassAndInterceptionEngine(on_pass=passes.append, on_interception=interceptions.append)
+    
+    events = []
+    for frame_num, (ball_acquisition, team_assignment) in enumerate(zip(ball_acquisition_frames, team_assignments)):
+        events.extend(engine.update(frame_num, ball_acquisition, team_assignment))
+    
+    assert passes == [event_info for event_type, event_info in events if event_type == 'pass']
+    assert interceptions == [event_info for event_type, event_info in events if event_type == 'interception']
+    assert events == list(PassAndInterceptionEngine().process_frames(ball_acquisition_frames, team_assignments))
+
+def test_pass_and_interception():
+    ball_acquisition_frames = [{1: True}, {}, {3: True}, {3: True}, {2: True}]
+    team_assignments = [{1: 1, 2: 2, 3: 1}] * 5
+    
+    events = list(PassAndInterceptionEngine().process_frames(ball_acquisition_frames, team_assignments))
+    
+    assert events == [
+        ('pass', {'frame': 2, 'from_player': 1, 'to_player': 3, 'team': 1}),
+        ('interception', {'frame': 4, 'intercepting_player': 2, 'intercepting_team': 2, 'previous_team': 1})
+    ]
+
+def test_reset_starts_a_new_sequence():
+    engine = PassAndInterceptionEngine()
+    team_assignment = {1: 1, 2: 2, 3: 1}
+    engine.update(0, {1: True}, team_assignment)
+    
+    engine.reset()
+    
+    assert engine.update(1, {3: True}, team_assignment) == []
+    assert engine.update(2, {2: True}, team_assignment)[0][0] == 'interception'
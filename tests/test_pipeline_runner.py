@@ -0,0 +1,63 @@
+import threading
+import time
+import pytest
+from pipeline import PipelineRunner, PipelineStage
+
+def delayed(delay, offset=0):
+    def process(item):
+        time.sleep(delay)
+        return item + offset
+    return process
+
+def test_items_leave_in_order():
+    pipeline_runner = PipelineRunner([
+        PipelineStage('first', delayed(0.002, 1)),
+        PipelineStage('second', delayed(0.001, 10)),
+        PipelineStage('third', delayed(0.003, 100))
+    ], queue_size=2)
+    
+    assert list(pipeline_runner.run(range(40))) == [item + 111 for item in range(40)]
+    stats = pipeline_runner.get_stats()
+    assert [stage_stats['name'] for stage_stats in stats] == ['source', 'first', 'second', 'third']
+    assert all(stage_stats['items_processed'] == 40 for stage_stats in stats)
+
+def test_stages_run_concurrently():
+    stage_count = 3
+    pipeline_runner = PipelineRunner([PipelineStage(str(stage_index), delayed(0.01))
+                                      for stage_index in range(stage_count)])
+    
+    start_time = time.perf_counter()
+    list(pipeline_runner.run(range(30)))
+    elapsed_time = time.perf_counter() - start_time
+    
+    # Serially the stages would take 30 * 3 * 10 ms
+    assert elapsed_time < 30 * stage_count * 0.01 * 0.75
+
+def test_stage_error_is_raised():
+    def fail_on_five(item):
+        if item == 5:
+            raise ValueError('bad item')
+        return item
+    
+    pipeline_runner = PipelineRunner([PipelineStage('check', fail_on_five), PipelineStage('pass', delayed(0))])
+    with pytest.raises(ValueError, match='bad item'):
+        list(pipeline_runner.run(range(100)))
+
+def test_source_error_is_raised():
+    def items():
+        yield 0
+        raise RuntimeError('source broken')
+    
+    pipeline_runner = PipelineRunner([PipelineStage('pass', delayed(0))])
+    with pytest.raises(RuntimeError, match='source broken'):
+        list(pipeline_runner.run(items()))
+
+def test_closing_early_stops_the_threads():
+    thread_count = threading.active_count()
+    pipeline_runner = PipelineRunner([PipelineStage('pass', delayed(0.001))])
+    
+    results = pipeline_runner.run(iter(range(10 ** 9)))
+    assert [next(results) for _ in range(5)] == list(range(5))
+    results.close()
+    
+    assert threading.active_count() == thread_count
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+pytest.importorskip('ultralytics')
+pytest.importorskip('supervision')
+
+from player_tracker import PlayerTracker
+from utils import InferenceStats, is_interpolated
+
+FRAME_COUNT = 11
+
+def get_player_detection(frame_num):
+    return {1: [10.0 * frame_num, 0.0, 10.0 * frame_num + 40.0, 80.0], 2: [500.0, 2.0 * frame_num, 540.0, 80.0]}
+
+class FakePlayerTracker(PlayerTracker):
+    """
+    PlayerTracker whose model call reads the frame number written into
+    each frame, so no model has to be loaded.
+    """
+    def __init__(self, batch_size=1, detection_stride=1):
+        self.model_path = 'fake_player_detector.pt'
+        self.batch_size = batch_size
+        self.detection_stride = detection_stride
+        self.inference_stats = InferenceStats()
+        self.detected_frames = []
+    
+    def detect_batch(self, batch):
+        frame_nums = [int(frame[0, 0, 0]) for frame in batch]
+        self.detected_frames.extend(frame_nums)
+        return [get_player_detection(frame_num) for frame_num in frame_nums]
+
+def make_frames():
+    return [np.full((8, 8, 3), frame_num, dtype=np.uint8) for frame_num in range(FRAME_COUNT)]
+
+def test_stride_one_detects_every_frame():
+    player_tracker = FakePlayerTracker(batch_size=4)
+    
+    player_detections = player_tracker.detect_frames(make_frames())
+    
+    assert player_detections == [get_player_detection(frame_num) for frame_num in range(FRAME_COUNT)]
+    assert player_tracker.detected_frames == list(range(FRAME_COUNT))
+    assert not any(is_interpolated(bbox) for frame_tracks in player_detections for bbox in frame_tracks.values())
+
+def test_stride_interpolates_between_keyframes():
+    player_tracker = FakePlayerTracker(batch_size=2, detection_stride=3)
+    
+    player_detections = player_tracker.detect_frames(make_frames())
+    
+    assert player_tracker.detected_frames == [0, 3, 6, 9]
+    assert len(player_detections) == FRAME_COUNT
+    # The fake players move linearly, so interpolation recovers their boxes
+    for frame_num in range(10):
+        assert player_detections[frame_num] == pytest.approx(get_player_detection(frame_num))
+        assert is_interpolated(player_detections[frame_num][1]) == (frame_num % 3 != 0)
+    # After the last keyframe the boxes are held
+    assert player_detections[10] == get_player_detection(9)
+    assert is_interpolated(player_detections[10][1])
@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+from speed_and_distance_calculator import SpeedAndDistanceCalculator
+from utils import get_foot_position
+
+def make_player_tracks(frame_count=120, track_count=6, seed=0):
+    """
+    Random player boxes with tracks missing from some frames.
+    """
+    rng = np.random.default_rng(seed)
+    player_tracks = []
+    for _ in range(frame_count):
+        player_detection = {}
+        for track_id in range(1, track_count + 1):
+            if rng.random() < 0.2:
+                continue
+            x, y = rng.uniform(0, 1000, 2)
+            player_detection[track_id * 3] = [float(x), float(y), float(x + 40), float(y + 90)]
+        player_tracks.append(player_detection)
+    return player_tracks
+
+def test_batch_stats_match_frame_loop():
+    player_tracks = make_player_tracks()
+    calculator = SpeedAndDistanceCalculator(frame_rate=24)
+    
+    track_ids, stats = calculator.calculate_speed_and_distance(player_tracks)
+    
+    total_distances = {}
+    for frame_num, player_detection in enumerate(player_tracks):
+        frame_stats = calculator.get_frame_stats(track_ids, stats, frame_num)
+        assert set(frame_stats) == set(player_detection)
+        for track_id, bbox in player_detection.items():
+            if frame_num > 0 and track_id in player_tracks[frame_num - 1]:
+                total_distances[track_id] = total_distances.get(track_id, 0) + calculator.calculate_distance(
+                    get_foot_position(player_tracks[frame_num - 1][track_id]),
+                    get_foot_position(bbox)
+                )
+                assert frame_stats[track_id]['total_distance'] == pytest.approx(total_distances[track_id])
+            else:
+                assert frame_stats[track_id]['total_distance'] == 0.0
+            assert frame_stats[track_id]['speed'] == pytest.approx(
+                calculator.calculate_speed(player_tracks, track_id, frame_num)
+            )
+
+def test_stream_stats_match_batch_stats():
+    rng = np.random.default_rng(1)
+    positions = rng.uniform(0, 1000, (200, 7, 2))
+    positions[rng.random((200, 7)) < 0.2] = np.nan
+    track_ids = np.arange(7) * 2 + 1
+    batch_calculator = SpeedAndDistanceCalculator(frame_rate=25)
+    stream_calculator = SpeedAndDistanceCalculator(frame_rate=25)
+    
+    stats = batch_calculator.calculate_stats(positions, 0.05)
+    
+    for frame_num in range(len(positions)):
+        frame_positions = {int(track_ids[column]): tuple(positions[frame_num, column])
+                           for column in range(len(track_ids)) if not np.isnan(positions[frame_num, column, 0])}
+        frame_stats = stream_calculator.update_frame_stats(frame_positions, 0.05)
+        expected_stats = batch_calculator.get_frame_stats(track_ids, stats, frame_num)
+        assert frame_stats.keys() == expected_stats.keys()
+        for track_id in frame_stats:
+            assert frame_stats[track_id] == pytest.approx(expected_stats[track_id])
+
+def test_empty_video():
+    calculator = SpeedAndDistanceCalculator()
+    
+    stats = calculator.calculate_stats(np.empty((0, 3, 2)), 0.05)
+    
+    assert stats.shape == (0, 3)
@@ -0,0 +1,136 @@
+import numpy as np
+from pipeline import PipelineRunner, PipelineStage, StreamAnalyzer
+from team_assigner import TeamAssigner
+from tactical_view_converter import TacticalViewConverter
+from speed_and_distance_calculator import SpeedAndDistanceCalculator
+from ball_aquisition import BallAquisitionDetector
+from pass_and_interception_detector import PassAndInterceptionDetector
+
+FRAME_COUNT = 40
+COURT_KEYPOINTS = np.array([[0, 0], [1000, 0], [0, 600], [1000, 600]] + [[0, 0]] * 14, dtype=float)
+
+def get_player_detection(frame_num):
+    return {
+        1: [100.0 + frame_num, 100.0, 140.0 + frame_num, 200.0],
+        2: [300.0, 100.0 + frame_num, 340.0, 200.0 + frame_num],
+        3: [500.0, 300.0, 540.0, 400.0],
+        4: [700.0, 300.0 + frame_num, 740.0, 400.0 + frame_num]
+    }
+
+def get_ball_detection(frame_num):
+    """
+    The ball goes from player 1 to teammate 3, then player 4 of the
+    other team takes it, with frames without a ball in between.
+    """
+    if frame_num < 10:
+        return {1: [110.0 + frame_num, 120.0, 120.0 + frame_num, 130.0]}
+    if frame_num < 12:
+        return {}
+    if frame_num < 25:
+        return {1: [505.0, 320.0, 515.0, 330.0]}
+    if frame_num < 30:
+        return {}
+    return {1: [705.0, 320.0 + frame_num, 715.0, 330.0 + frame_num]}
+
+def get_frame(frame_num):
+    frame = np.zeros((720, 1280, 3), dtype=np.uint8)
+    for player_id, (x1, y1, x2, y2) in get_player_detection(frame_num).items():
+        color = (0, 0, 255) if player_id % 2 == 1 else (255, 0, 0)
+        frame[int(y1):int(y2), int(x1):int(x2)] = color
+    return frame
+
+class FakePlayerTracker:
+    def __init__(self):
+        self.frame_num = 0
+    
+    def track_frame(self, frame):
+        player_detection = get_player_detection(self.frame_num)
+        self.frame_num += 1
+        return player_detection
+
+class FakeBallTracker:
+    def track_frame(self, frame, frame_num):
+        return get_ball_detection(frame_num)
+
+class FakeCourtKeypointDetector:
+    last_keypoints = COURT_KEYPOINTS
+    
+    def track_frame(self, frame):
+        return COURT_KEYPOINTS
+
+def analyze_stream():
+    stream_analyzer = StreamAnalyzer(
+        FakePlayerTracker(),
+        FakeBallTracker(),
+        FakeCourtKeypointDetector(),
+        TeamAssigner(),
+        TacticalViewConverter('court.png'),
+        SpeedAndDistanceCalculator(25)
+    )
+    pipeline_runner = PipelineRunner([
+        PipelineStage('detect', stream_analyzer.detect),
+        PipelineStage('analyze', stream_analyzer.analyze)
+    ])
+    items = ({'frame_num': frame_num, 'frame': get_frame(frame_num)} for frame_num in range(FRAME_COUNT))
+    return stream_analyzer, list(pipeline_runner.run(items))
+
+def test_stream_matches_batch_analysis():
+    stream_analyzer, items = analyze_stream()
+    
+    player_tracks = [get_player_detection(frame_num) for frame_num in range(FRAME_COUNT)]
+    ball_tracks = [get_ball_detection(frame_num) for frame_num in range(FRAME_COUNT)]
+    team_assignments = TeamAssigner().assign_teams([get_frame(frame_num) for frame_num in range(FRAME_COUNT)],
+                                                   player_tracks)
+    ball_acquisition = BallAquisitionDetector().detect_frames_vectorized(
+        player_tracks,
+        ball_tracks,
+        assign_to_team=True,
+        team_assignments=team_assignments
+    )
+    passes, interceptions = PassAndInterceptionDetector().detect_passes_and_interceptions(
+        ball_acquisition,
+        team_assignments
+    )
+    
+    assert [item['frame_num'] for item in items] == list(range(FRAME_COUNT))
+    assert [item['frame_data']['team_assignment'] for item in items] == team_assignments
+    assert [item['frame_data']['ball_acquisition'] for item in items] == ball_acquisition
+    assert stream_analyzer.passes == passes
+    assert stream_analyzer.interceptions == interceptions
+    assert len(passes) == 1 and len(interceptions) == 1
+
+def test_running_counts_per_frame():
+    stream_analyzer, items = analyze_stream()
+    
+    team_ball_control_frames = {1: 0, 2: 0}
+    pass_counts = {1: 0, 2: 0}
+    interception_counts = {1: 0, 2: 0}
+    for item in items:
+        frame_data = item['frame_data']
+        team = frame_data['ball_acquisition'].get('team_ball_control')
+        if team in team_ball_control_frames:
+            team_ball_control_frames[team] += 1
+        for event_type, event_info in item['events']:
+            if event_type == 'pass':
+                pass_counts[event_info['team']] += 1
+            elif event_type == 'interception':
+                interception_counts[event_info['intercepting_team']] += 1
+        
+        # Every frame keeps its own copy of the counts up to that frame
+        assert frame_data['team_ball_control_frames'] == team_ball_control_frames
+        assert frame_data['pass_counts'] == pass_counts
+        assert frame_data['interception_counts'] == interception_counts
+    
+    assert sum(items[-1]['frame_data']['pass_counts'].values()) == len(stream_analyzer.passes)
+    assert items[0]['frame_data']['pass_counts'] == {1: 0, 2: 0}
+
+def test_skipped_detection_reuses_last_players():
+    stream_analyzer, _ = analyze_stream()
+    
+    item = stream_analyzer.skip_detection({'frame_num': FRAME_COUNT, 'frame': get_frame(FRAME_COUNT)})
+    item = stream_analyzer.analyze(item)
+    
+    assert item['detection_skipped']
+    assert item['player_detection'] == get_player_detection(FRAME_COUNT - 1)
+    assert item['ball_detection'] == {}
+    assert item['events'] == []
@@ -0,0 +1,54 @@
+import os
+from utils import StubCache, TrackTable, get_tracks_digest
+
+def test_miss_then_hit(tmp_path):
+    cache = StubCache(str(tmp_path))
+    key = cache.make_key('team_assignments', batched_colors=True)
+    
+    assert cache.get(key) is None
+    cache.put(key, [{1: 1, 2: 2}])
+    assert cache.get(key) == [{1: 1, 2: 2}]
+
+def test_key_depends_on_the_inputs(tmp_path):
+    cache = StubCache(str(tmp_path))
+    video_path = tmp_path / 'video.bin'
+    video_path.write_bytes(b'first video')
+    
+    key = cache.make_key('player_tracks', video_path=str(video_path), batch_size=20)
+    
+    assert cache.make_key('player_tracks', video_path=str(video_path), batch_size=20) == key
+    assert cache.make_key('player_tracks', video_path=str(video_path), batch_size=10) != key
+    assert cache.make_key('ball_tracks', video_path=str(video_path), batch_size=20) != key
+    
+    video_path.write_bytes(b'other video')
+    os.utime(video_path, ns=(0, 0))
+    assert cache.make_key('player_tracks', video_path=str(video_path), batch_size=20) != key
+
+def test_tracks_hit_gives_the_same_downstream_key(tmp_path):
+    cache = StubCache(str(tmp_path))
+    tracks = [{1: [1.5, 2.5, 3.5, 4.5]}, {1: [2.5, 3.5, 4.5, 5.5], 7: [0.1, 0.2, 0.3, 0.4]}]
+    key = cache.make_key('player_tracks')
+    
+    assert cache.get_tracks(key) is None
+    cache.put_tracks(key, tracks)
+    cached_tracks = cache.get_tracks(key)
+    
+    assert cached_tracks == tracks
+    assert get_tracks_digest(cached_tracks) == get_tracks_digest(tracks)
+    assert isinstance(cache.get_track_table(key, start=1), TrackTable)
+    assert cache.get_tracks(key, start=1) == tracks[1:]
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = StubCache(str(tmp_path))
+    for name in ['old', 'used', 'new']:
+        cache.put(name, b'x' * 1000)
+    os.utime(cache.get_entry_path('old'), (1, 1))
+    os.utime(cache.get_entry_path('used'), (2, 2))
+    cache.get('used')
+    
+    cache.max_size_bytes = 2500
+    cache.evict()
+    
+    assert cache.get('old') is None
+    assert cache.get('used') is not None
+    assert cache.get('new') is not None
@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+from tactical_view_converter import TacticalViewConverter
+from utils import StubCache, TrackTable
+
+COURT_KEYPOINTS = np.array([[0, 0], [940, 0], [0, 500], [940, 500]] + [[0, 0]] * 14, dtype=float)
+
+def make_tracks(frame_count=5):
+    return [{1: [100.0 + frame_num, 100.0, 140.0 + frame_num, 200.0], 2: [400.0, 300.0, 440.0, 400.0]}
+            for frame_num in range(frame_count)]
+
+def test_tactical_positions_from_keypoints():
+    tactical_view_converter = TacticalViewConverter()
+    
+    track_table = tactical_view_converter.add_tactical_positions(make_tracks(), [COURT_KEYPOINTS] * 5)
+    
+    # The keypoints map pixels to feet with a scale of 0.1
+    assert tactical_view_converter.get_frame_tactical_detections(track_table, 0) == {
+        1: (12.0, 20.0),
+        2: (42.0, 40.0)
+    }
+
+def test_input_table_is_not_modified():
+    track_table = TrackTable.from_tracks(make_tracks())
+    columns = dict(track_table.columns)
+    
+    tactical_tracks = TacticalViewConverter().add_tactical_positions(track_table, [COURT_KEYPOINTS] * 5)
+    
+    assert 'tactical_position' in tactical_tracks.columns
+    assert track_table.columns == columns
+    assert tactical_tracks.bboxes is track_table.bboxes
+
+def test_cache_key_depends_on_the_homographies(tmp_path):
+    cache = StubCache(str(tmp_path))
+    tactical_view_converter = TacticalViewConverter()
+    tracks = make_tracks()
+    court_keypoints = [COURT_KEYPOINTS] * 5
+    homographies = tactical_view_converter.get_homographies(court_keypoints)
+    
+    tactical_view_converter.add_tactical_positions(tracks, court_keypoints, homographies=homographies, cache=cache)
+    track_table = tactical_view_converter.add_tactical_positions(tracks, court_keypoints,
+                                                                 homographies=homographies * 2, cache=cache)
+    
+    # Scaling a homography changes nothing after the perspective divide
+    assert tactical_view_converter.get_frame_tactical_detections(track_table, 0)[1] == pytest.approx((12.0, 20.0))
+    
+    shifted_homographies = homographies.copy()
+    shifted_homographies[:, 0, 2] += 10 * shifted_homographies[:, 2, 2]
+    track_table = tactical_view_converter.add_tactical_positions(tracks, court_keypoints,
+                                                                 homographies=shifted_homographies, cache=cache)
+    assert tactical_view_converter.get_frame_tactical_detections(track_table, 0)[1] == pytest.approx((22.0, 20.0))
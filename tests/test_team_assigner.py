@@ -0,0 +1,174 @@
+import numpy as np
+import pytest
+from team_assigner import TeamAssigner
+
+TEAM_COLORS = {1: (200, 30, 30), 2: (30, 30, 200)}
+
+def make_video(frame_count=12, seed=0):
+    """
+    Frames of players in jerseys of two colors on a green floor. The first
+    frame has a single player, so the team colors can only be fitted later.
+    """
+    rng = np.random.default_rng(seed)
+    frames = []
+    player_detections = []
+    for frame_num in range(frame_count):
+        frame = np.full((240, 320, 3), (40, 140, 40), dtype=np.uint8)
+        player_ids = [1] if frame_num == 0 else list(range(1, 3 + frame_num // 3))
+        player_detection = {}
+        for player_id in player_ids:
+            x = int(rng.integers(0, 280))
+            y = int(rng.integers(0, 160))
+            frame[y:y + 80, x:x + 40] = TEAM_COLORS[1 + player_id % 2]
+            player_detection[player_id] = [float(x), float(y), float(x + 40), float(y + 80)]
+        frames.append(frame)
+        player_detections.append(player_detection)
+    return frames, player_detections
+
+def test_stream_waits_for_two_players():
+    frames, player_detections = make_video()
+    team_assigner = TeamAssigner()
+    
+    team_assignments = [team_assigner.assign_frame(frame, player_detection)
+                        for frame, player_detection in zip(frames, player_detections)]
+    
+    assert team_assignments[0] == {}
+    assert set(team_assignments[-1]) == set(player_detections[-1])
+    # Players of the same jersey color share a team
+    teams = team_assignments[-1]
+    assert teams[1] == teams[3] != teams[2] == teams[4]
+
+@pytest.mark.parametrize('n_workers', [1, 2])
+def test_parallel_matches_sequential(n_workers):
+    frames, player_detections = make_video()
+    
+    expected = TeamAssigner().assign_teams(frames, player_detections)
+    actual = TeamAssigner(n_workers=n_workers).assign_teams(frames, player_detections)
+    
+    assert actual == expected
+    assert actual[0] == {}
+
+def test_parallel_without_two_players():
+    frames, player_detections = make_video(frame_count=1)
+    
+    assert TeamAssigner(n_workers=1).assign_teams(frames, player_detections) == [{}]
+
+class CountingFrames(list):
+    """
+    Frames that record which ones were read.
+    """
+    def __init__(self, frames):
+        super().__init__(frames)
+        self.read_frame_nums = []
+    
+    def __getitem__(self, frame_num):
+        self.read_frame_nums.append(frame_num)
+        return super().__getitem__(frame_num)
+
+def make_sampling_video(frame_count=60, mixed_player_id=None):
+    """
+    Frames of ten tracks with overlapping lifetimes, each in a fixed spot.
+    The jersey of `mixed_player_id` shows the other team's color over the
+    last third of its lifetime.
+    """
+    lifetimes = {player_id: (player_id * 3, frame_count - (10 - player_id) * 2) for player_id in range(10)}
+    frames = []
+    player_detections = []
+    for frame_num in range(frame_count):
+        frame = np.full((240, 320, 3), (40, 140, 40), dtype=np.uint8)
+        player_detection = {}
+        for player_id, (start_frame, end_frame) in lifetimes.items():
+            if not start_frame <= frame_num < end_frame:
+                continue
+            team = 1 + player_id % 2
+            if player_id == mixed_player_id and frame_num >= start_frame + 2 * (end_frame - start_frame) // 3:
+                team = 3 - team
+            x = (player_id % 5) * 64
+            y = (player_id // 5) * 120
+            frame[y:y + 80, x:x + 40] = TEAM_COLORS[team]
+            player_detection[player_id] = [float(x), float(y), float(x + 40), float(y + 80)]
+        frames.append(frame)
+        player_detections.append(player_detection)
+    return CountingFrames(frames), player_detections
+
+def get_teammates(team_assignments):
+    """
+    Pairs of players on the same team, which does not depend on the team numbering.
+    """
+    teams = {}
+    for team_assignment in team_assignments:
+        teams.update(team_assignment)
+    return {(player_id, other_id): teams[player_id] == teams[other_id]
+            for player_id in teams for other_id in teams if player_id < other_id}
+
+def test_sampling_matches_full_assignment():
+    frames, player_detections = make_sampling_video()
+    
+    expected = TeamAssigner().assign_teams(frames, player_detections)
+    frames.read_frame_nums.clear()
+    team_assigner = TeamAssigner(sampling=True)
+    actual = team_assigner.assign_teams(frames, player_detections)
+    
+    assert [set(team_assignment) for team_assignment in actual] == \
+        [set(player_detection) for player_detection in player_detections]
+    assert get_teammates(actual) == get_teammates(expected)
+    # Three samples for each of the ten tracks need far fewer frames than the video has
+    assert len(frames.read_frame_nums) == len(set(frames.read_frame_nums)) == team_assigner.sampled_frame_count
+    assert team_assigner.sampled_frame_count <= 30 < len(frames)
+
+def test_sample_frame_cap_keeps_every_track():
+    frames, player_detections = make_sampling_video()
+    team_assigner = TeamAssigner(sampling=True, max_sample_frames=0)
+    
+    team_assignments = team_assigner.assign_teams(frames, player_detections)
+    
+    # Only the frames giving every track its first sample are read
+    first_sample_frames = team_assigner.plan_sample_frames(
+        {frame_num: list(player_detection) for frame_num, player_detection in enumerate(player_detections)},
+        set()
+    )
+    assert sorted(frames.read_frame_nums) == sorted(first_sample_frames)
+    assert set(team_assigner.player_team_dict) == set(range(10))
+    assert get_teammates(team_assignments) == {(player_id, other_id): (player_id - other_id) % 2 == 0
+                                               for player_id in range(10) for other_id in range(player_id + 1, 10)}
+
+def test_plan_sample_frames():
+    team_assigner = TeamAssigner()
+    frame_units = {0: [1], 1: [1, 2, 3], 2: [3, 4], 3: [4], 4: [5]}
+    served_units = set()
+    
+    assert team_assigner.plan_sample_frames(frame_units, served_units) == [1, 2, 4]
+    assert served_units == {1, 2, 3, 4, 5}
+    assert team_assigner.plan_sample_frames(frame_units, set(), max_frames=2) == [1, 2]
+    assert team_assigner.plan_sample_frames(frame_units, {1, 2, 3, 4, 5}) == []
+
+def test_majority_vote():
+    team_assigner = TeamAssigner()
+    team_assigner.fit_team_colors(np.array([TEAM_COLORS[1], TEAM_COLORS[2]] * 3, dtype=float))
+    team_1 = int(team_assigner.kmeans.predict(np.array([TEAM_COLORS[1]], dtype=float))[0]) + 1
+    
+    team_assigner.vote_teams({7: [TEAM_COLORS[1], TEAM_COLORS[2], TEAM_COLORS[1]], 8: [TEAM_COLORS[2]]})
+    
+    assert team_assigner.player_team_dict[7] == team_1
+    assert team_assigner.player_team_dict[8] == 3 - team_1
+    assert team_assigner.player_team_confidence[7] == pytest.approx(2 / 3)
+    assert team_assigner.player_team_confidence[8] == 1.0
+
+def test_unclear_votes_are_checked_again():
+    frames, player_detections = make_sampling_video(mixed_player_id=4)
+    
+    team_assigner = TeamAssigner(sampling=True, min_vote_confidence=0.0)
+    team_assigner.assign_teams(frames, player_detections)
+    unchecked_frame_count = team_assigner.sampled_frame_count
+    
+    frames.read_frame_nums.clear()
+    team_assigner = TeamAssigner(sampling=True, min_vote_confidence=0.7)
+    team_assignments = team_assigner.assign_teams(frames, player_detections)
+    
+    # Only the mixed track has an unclear vote, and its extra samples need more frames
+    assert [player_id for player_id, confidence in team_assigner.player_team_confidence.items()
+            if confidence < 0.7] == [4]
+    assert team_assigner.sampled_frame_count > unchecked_frame_count
+    assert len(frames.read_frame_nums) == team_assigner.sampled_frame_count
+    # The mixed track mostly wears its own team's color
+    assert get_teammates(team_assignments)[(2, 4)]
@@ -0,0 +1,102 @@
+import numpy as np
+from utils import TrackTable, InterpolatedBBox, is_interpolated, interpolate_tracks, get_tracks_digest
+
+def make_tracks():
+    return [
+        {1: [10.5, 20.25, 30.125, 40.0], 2: [100.1, 200.2, 300.3, 400.4]},
+        {},
+        {np.int64(1): InterpolatedBBox([11.0, 21.0, 31.0, 41.0]), 3: [1e-3, 2.0, 3.0, 4.0]}
+    ]
+
+def test_round_trip_is_lossless(tmp_path):
+    tracks = make_tracks()
+    table_path = str(tmp_path / 'tracks.npz')
+    TrackTable.from_tracks(tracks).save(table_path)
+    
+    loaded_tracks = TrackTable.load(table_path).to_tracks()
+    
+    assert loaded_tracks == [{int(track_id): list(bbox) for track_id, bbox in frame_tracks.items()}
+                             for frame_tracks in tracks]
+    assert all(type(track_id) is int for frame_tracks in loaded_tracks for track_id in frame_tracks)
+    assert is_interpolated(loaded_tracks[2][1])
+    assert not is_interpolated(loaded_tracks[2][3])
+
+def test_frame_range():
+    table = TrackTable.from_tracks(make_tracks())
+    
+    frame_range = table.get_frame_range(1, 3)
+    
+    assert frame_range.frame_count == 2
+    assert frame_range.to_tracks()[0] == {}
+    assert sorted(frame_range.to_tracks()[1]) == [1, 3]
+
+def test_digest_survives_a_cache_reload(tmp_path):
+    tracks = make_tracks()
+    table_path = str(tmp_path / 'tracks.npz')
+    TrackTable.from_tracks(tracks).save(table_path)
+    
+    assert get_tracks_digest(tracks) == get_tracks_digest(TrackTable.load(table_path).to_tracks())
+    assert get_tracks_digest(tracks) == get_tracks_digest(TrackTable.load(table_path))
+
+def test_digest_ignores_derived_columns():
+    table = TrackTable.from_tracks(make_tracks())
+    digest = table.get_digest()
+    
+    table.columns['tactical_position'] = np.zeros((len(table.track_ids), 2), dtype=np.float32)
+    
+    assert table.get_digest() == digest
+
+def test_digest_changes_with_the_tracks():
+    tracks = make_tracks()
+    moved_tracks = make_tracks()
+    moved_tracks[0][1] = [10.5, 20.25, 30.125, 40.5]
+    
+    assert get_tracks_digest(tracks) != get_tracks_digest(moved_tracks)
+
+def test_interpolation_between_keyframes():
+    keyframe_tracks = [{1: [0.0, 0.0, 10.0, 10.0]}, {1: [30.0, 60.0, 40.0, 70.0]}]
+    
+    tracks = interpolate_tracks(keyframe_tracks, [0, 3], 4)
+    
+    assert tracks[1] == {1: [10.0, 20.0, 20.0, 30.0]}
+    assert tracks[2] == {1: [20.0, 40.0, 30.0, 50.0]}
+    assert [is_interpolated(frame_tracks[1]) for frame_tracks in tracks] == [False, True, True, False]
+    # Keyframes are passed through as detected
+    assert tracks[0] is keyframe_tracks[0] and tracks[3] is keyframe_tracks[1]
+
+def test_tracks_in_one_keyframe_are_not_interpolated():
+    keyframe_tracks = [{1: [0.0, 0.0, 10.0, 10.0], 2: [5.0, 5.0, 6.0, 6.0]},
+                       {1: [20.0, 0.0, 30.0, 10.0], 3: [7.0, 7.0, 8.0, 8.0]}]
+    
+    tracks = interpolate_tracks(keyframe_tracks, [0, 2], 3)
+    
+    assert tracks[1] == {1: [10.0, 0.0, 20.0, 10.0]}
+    assert 2 in tracks[0] and 3 in tracks[2]
+
+def test_last_keyframe_is_held():
+    keyframe_tracks = [{1: [0.0, 0.0, 10.0, 10.0]}, {1: [2.0, 2.0, 12.0, 12.0], 4: [1.0, 1.0, 2.0, 2.0]}]
+    
+    tracks = interpolate_tracks(keyframe_tracks, [0, 2], 6)
+    
+    assert tracks[3:] == [keyframe_tracks[1]] * 3
+    assert all(is_interpolated(bbox) for frame_tracks in tracks[3:] for bbox in frame_tracks.values())
+    assert interpolate_tracks([], [], 2) == [{}, {}]
+
+def test_interpolated_flags_survive_a_round_trip(tmp_path):
+    tracks = interpolate_tracks([{1: [0.0, 0.0, 10.0, 10.0]}, {1: [4.0, 4.0, 14.0, 14.0]}], [0, 4], 6)
+    table_path = str(tmp_path / 'tracks.npz')
+    TrackTable.from_tracks(tracks).save(table_path)
+    
+    loaded_tracks = TrackTable.load(table_path).to_tracks()
+    
+    assert loaded_tracks == tracks
+    assert [is_interpolated(frame_tracks[1]) for frame_tracks in loaded_tracks] == \
+        [is_interpolated(frame_tracks[1]) for frame_tracks in tracks]
+
+def test_every_frame_a_keyframe():
+    keyframe_tracks = [{1: [float(frame_num), 0.0, 10.0, 10.0]} for frame_num in range(5)]
+    
+    tracks = interpolate_tracks(keyframe_tracks, list(range(5)), 5)
+    
+    assert tracks == keyframe_tracks
+    assert not any(is_interpolated(frame_tracks[1]) for frame_tracks in tracks)
@@ -0,0 +1,171 @@
+import os
+import threading
+import time
+import cv2
+import numpy as np
+import pytest
+from utils import VideoSource, VideoSink, FrameStore
+
+FRAME_COUNT = 12
+FRAME_SIZE = (64, 48)
+
+@pytest.fixture
+def video_path(tmp_path):
+    """
+    A short synthetic video whose frames differ in brightness.
+    """
+    video_path = str(tmp_path / 'video.avi')
+    writer = cv2.VideoWriter(video_path, cv2.VideoWriter_fourcc(*'MJPG'), 10, FRAME_SIZE)
+    for frame_num in range(FRAME_COUNT):
+        frame = np.full((FRAME_SIZE[1], FRAME_SIZE[0], 3), 20 * frame_num, dtype=np.uint8)
+        cv2.rectangle(frame, (frame_num * 4, 10), (frame_num * 4 + 8, 30), (255, 255, 255), -1)
+        writer.write(frame)
+    writer.release()
+    return video_path
+
+def decode(video_path):
+    cap = cv2.VideoCapture(video_path)
+    frames = []
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames
+
+def test_store_grows_past_its_capacity(tmp_path):
+    frame_store = FrameStore(str(tmp_path / 'frames.bin'), (4, 4, 3), capacity=2)
+    
+    for frame_num in range(7):
+        frame_store.append(np.full((4, 4, 3), frame_num, dtype=np.uint8))
+    
+    assert len(frame_store) == 7
+    assert frame_store.capacity >= 7
+    assert [int(frame[0, 0, 0]) for frame in frame_store] == list(range(7))
+    assert int(frame_store[-1][0, 0, 0]) == 6
+    with pytest.raises(IndexError):
+        frame_store[7]
+    frame_store.close(delete=True)
+    assert not os.path.exists(str(tmp_path / 'frames.bin'))
+
+def test_frame_count_too_small(video_path, tmp_path):
+    video_source = VideoSource(video_path)
+    # Sized for a container that under-reports its length
+    video_source.frame_store = FrameStore(str(tmp_path / 'frames.bin'), (FRAME_SIZE[1], FRAME_SIZE[0], 3), 3)
+    
+    frames = [frame.copy() for frame in video_source]
+    
+    assert len(video_source.frame_store) == FRAME_COUNT
+    assert all((frame == decoded_frame).all() for frame, decoded_frame in zip(frames, decode(video_path)))
+    assert all((video_source.frame_store[frame_num] == frame).all() for frame_num, frame in enumerate(frames))
+    video_source.frame_store.close(delete=True)
+
+@pytest.mark.parametrize('prefetch', [0, 4])
+def test_second_pass_reads_the_store(video_path, tmp_path, prefetch):
+    video_source = VideoSource(video_path, prefetch=prefetch, frame_store_path=str(tmp_path / 'frames.bin'))
+    decoded_frames = decode(video_path)
+    
+    first_pass = [frame.copy() for frame in video_source]
+    assert video_source.frame_store.complete
+    
+    # Without the video file, frames can only come from the store
+    os.remove(video_path)
+    second_pass = list(video_source)
+    
+    assert len(first_pass) == len(second_pass) == FRAME_COUNT
+    assert all((frame == decoded_frame).all() for frame, decoded_frame in zip(second_pass, decoded_frames))
+    assert all(isinstance(frame, np.memmap) for frame in second_pass)
+    assert (video_source[5] == decoded_frames[5]).all()
+    assert [frame_num for frame_num, _ in video_source.iter_frames([9, 2])] == [2, 9]
+    video_source.frame_store.close(delete=True)
+
+def test_interrupted_first_pass(video_path, tmp_path):
+    video_source = VideoSource(video_path, frame_store_path=str(tmp_path / 'frames.bin'))
+    decoded_frames = decode(video_path)
+    
+    for frame_num, _ in enumerate(video_source):
+        if frame_num == 4:
+            break
+    
+    assert len(video_source.frame_store) == 5
+    assert not video_source.frame_store.complete
+    
+    frames = [frame.copy() for frame in video_source]
+    
+    assert video_source.frame_store.complete
+    assert len(video_source.frame_store) == len(frames) == FRAME_COUNT
+    assert all((frame == decoded_frame).all() for frame, decoded_frame in zip(frames, decoded_frames))
+    video_source.frame_store.close(delete=True)
+
+class FakeWriter:
+    """
+    Stands in for cv2.VideoWriter, slow to encode and failing on request.
+    """
+    def __init__(self, write_time=0.0, fail_at=None):
+        self.write_time = write_time
+        self.fail_at = fail_at
+        self.frames = []
+        self.released = False
+    
+    def write(self, frame):
+        if len(self.frames) == self.fail_at:
+            raise RuntimeError('encoder failed')
+        time.sleep(self.write_time)
+        self.frames.append(frame)
+    
+    def release(self):
+        self.released = True
+
+class FakeVideoSink(VideoSink):
+    def __init__(self, writer, queue_size=16):
+        super().__init__('unused.avi', queue_size=queue_size)
+        self.writer = writer
+    
+    def _open(self, frame):
+        self.worker = threading.Thread(target=self._encode_loop, args=(self.writer,), daemon=True)
+        self.worker.start()
+
+def test_sink_writes_frames_in_order(tmp_path):
+    output_video_path = str(tmp_path / 'output' / 'video.avi')
+    
+    with VideoSink(output_video_path, fps=10, codec='MJPG') as video_sink:
+        for frame_num in range(FRAME_COUNT):
+            video_sink.write(np.full((FRAME_SIZE[1], FRAME_SIZE[0], 3), 20 * frame_num, dtype=np.uint8))
+    
+    frames = decode(output_video_path)
+    assert video_sink.frames_written == len(frames) == FRAME_COUNT
+    assert [round(frame.mean() / 20) for frame in frames] == list(range(FRAME_COUNT))
+
+def test_sink_counts_backpressure_stalls():
+    writer = FakeWriter(write_time=0.005)
+    video_sink = FakeVideoSink(writer, queue_size=2)
+    
+    for frame_num in range(20):
+        video_sink.write(frame_num)
+    video_sink.close()
+    
+    assert writer.frames == list(range(20))
+    assert writer.released
+    assert video_sink.backpressure_stalls > 0
+
+def test_sink_raises_the_writer_error_on_close():
+    writer = FakeWriter(fail_at=3)
+    video_sink = FakeVideoSink(writer)
+    
+    for frame_num in range(10):
+        video_sink.write(frame_num)
+    
+    with pytest.raises(RuntimeError, match='encoder failed'):
+        video_sink.close()
+    assert writer.frames == [0, 1, 2]
+    assert writer.released
+
+def test_sink_does_not_mask_the_error_of_the_with_block():
+    writer = FakeWriter(fail_at=0)
+    
+    with pytest.raises(ValueError, match='bad frame'):
+        with FakeVideoSink(writer) as video_sink:
+            video_sink.write(0)
+            raise ValueError('bad frame')
+    assert writer.released
@@ -1,3 +1,5 @@
 from .bbox_utils import get_center_of_bbox, get_bbox_width, get_foot_position
-from .video_utils import read_video, save_video
-from .stubs_utils import save_stub, read_stub
\ No newline at end of file
+from .video_utils import VideoSource, LiveVideoSource, VideoSink, FrameStore, read_video, save_video
+from .metrics_utils import InferenceStats
+from .track_utils import TrackTable, InterpolatedBBox, is_interpolated, interpolate_tracks
+from .stubs_utils import save_stub, read_stub, StubCache, get_file_digest, get_object_digest, get_tracks_digest
\ No newline at end of file
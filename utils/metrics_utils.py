@@ -0,0 +1,67 @@
+import time
+
+class InferenceStats:
+    def __init__(self):
+        """
+        Initialize the InferenceStats.
+        
+        Collects per-batch latency of model calls so throughput can be
+        reported at the end of a run.
+        """
+        self.batch_latencies = []
+        self.batch_sizes = []
+    
+    def start(self):
+        """
+        Get a start timestamp for a batch.
+        
+        Returns:
+            float: Current value of the performance counter.
+        """
+        return time.perf_counter()
+    
+    def record(self, start_time, batch_size):
+        """
+        Record a finished batch.
+        
+        Args:
+            start_time (float): Timestamp returned by start().
+            batch_size (int): Number of frames in the batch.
+        """
+        self.batch_latencies.append(time.perf_counter() - start_time)
+        self.batch_sizes.append(batch_size)
+    
+    def get_summary(self):
+        """
+        Summarize the recorded batches.
+        
+        Returns:
+            dict: Batch count, frame count, mean and max batch latency in
+                milliseconds and throughput in frames per second.
+        """
+        total_time = sum(self.batch_latencies)
+        total_frames = sum(self.batch_sizes)
+        batches = len(self.batch_latencies)
+        
+        return {
+            'batches': batches,
+            'frames': total_frames,
+            'mean_batch_latency_ms': (total_time / batches) * 1000 if batches else 0,
+            'max_batch_latency_ms': max(self.batch_latencies) * 1000 if batches else 0,
+            'throughput_fps': total_frames / total_time if total_time > 0 else 0
+        }
+    
+    def report(self, name):
+        """
+        Print the summary of the recorded batches.
+        
+        Args:
+            name (str): Name of the stage being reported.
+        """
+        summary = self.get_summary()
+        if summary['batches'] == 0:
+            return
+        print(f"{name}: {summary['frames']} frames in {summary['batches']} batches, "
+              f"{summary['mean_batch_latency_ms']:.1f} ms/batch "
+              f"(max {summary['max_batch_latency_ms']:.1f} ms), "
+              f"{summary['throughput_fps']:.1f} frames/s")
@@ -1,23 +1,41 @@
+import hashlib
+import json
 import pickle
 import os
+import tempfile
+from .track_utils import TrackTable
+
+# Bump when the format of cached stage results changes, so old entries are never reused
+STUB_CACHE_VERSION = 3
 
 def save_stub(stub_path,object):
     """
     Save a Python object to disk at the specified path.
     
     This function serializes a Python object using pickle and saves it to the
-    specified file path. If the directory doesn't exist, it creates it.
+    specified file path. If the directory doesn't exist, it creates it. The
+    object is written to a temporary file first and then moved into place, so
+    readers never see a partially written stub.
     
     Args:
         stub_path (str): File path where the object should be saved.
         object: The Python object to be saved.
     """
-    if not os.path.exists(os.path.dirname(stub_path)):
-        os.makedirs(os.path.dirname(stub_path))
+    if stub_path is None:
+        return
+    
+    stub_dir = os.path.dirname(stub_path)
+    if stub_dir and not os.path.exists(stub_dir):
+        os.makedirs(stub_dir, exist_ok=True)
     
-    if stub_path is not None:
-        with open(stub_path,'wb') as f:
-            pickle.dump(object,f)
+    fd, temp_path = tempfile.mkstemp(dir=stub_dir or '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(object, f)
+        os.replace(temp_path, stub_path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
 
 def read_stub(read_from_stub,stub_path):
     """
@@ -34,4 +52,227 @@ def read_stub(read_from_stub,stub_path):
     if read_from_stub and stub_path is not None and os.path.exists(stub_path):
         with open(stub_path,'rb') as f:
             object = pickle.load(f)
-    return object
\ No newline at end of file
+    return object
+
+_file_digests = {}
+
+def get_file_digest(file_path):
+    """
+    Compute the SHA-256 digest of a file's content.
+    
+    Digests are memoized per process for as long as the file's size and
+    modification time do not change, so large videos are hashed only once.
+    
+    Args:
+        file_path (str): Path of the file to hash.
+    
+    Returns:
+        str: Hex digest of the file content.
+    """
+    file_stat = os.stat(file_path)
+    memo_key = (os.path.abspath(file_path), file_stat.st_size, file_stat.st_mtime_ns)
+    if memo_key in _file_digests:
+        return _file_digests[memo_key]
+    
+    sha256 = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            sha256.update(chunk)
+    
+    _file_digests[memo_key] = sha256.hexdigest()
+    return _file_digests[memo_key]
+
+def get_object_digest(object):
+    """
+    Compute the SHA-256 digest of a picklable Python object, e.g. the
+    tracks a later stage depends on.
+    
+    Args:
+        object: The Python object to hash.
+    
+    Returns:
+        str: Hex digest of the pickled object.
+    """
+    return hashlib.sha256(pickle.dumps(object)).hexdigest()
+
+def get_tracks_digest(tracks):
+    """
+    Compute the SHA-256 digest of per-frame tracks.
+    
+    Unlike get_object_digest(), the digest does not depend on how the tracks
+    are held: the dictionaries returned by a detector and the same tracks
+    read back from the cache hash the same, so keys derived from them hit
+    on later runs.
+    
+    Args:
+        tracks (list or TrackTable): List of {track_id: [x1, y1, x2, y2]}
+            dictionaries, one per frame, or a TrackTable.
+    
+    Returns:
+        str: Hex digest of the tracks, see TrackTable.get_digest().
+    """
+    track_table = tracks if isinstance(tracks, TrackTable) else TrackTable.from_tracks(tracks)
+    return track_table.get_digest()
+
+class StubCache:
+    def __init__(self, cache_dir, max_size_bytes=None):
+        """
+        Initialize a content-addressed cache of stage results.
+        
+        Entries are keyed by a hash of the video content, the model weights
+        and the stage parameters, so a different video, model or setting never
+        picks up stale results. Writes are atomic, which lets several runs
+        share one cache directory. When the cache grows beyond
+        `max_size_bytes`, the least recently used entries are evicted.
+        
+        Args:
+            cache_dir (str): Directory holding the cached results.
+            max_size_bytes (int, optional): Maximum total size of the cache.
+        """
+        self.cache_dir = cache_dir
+        self.max_size_bytes = max_size_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+    
+    def make_key(self, stage, video_path=None, model_path=None, **params):
+        """
+        Build the cache key of a stage result.
+        
+        Args:
+            stage (str): Name of the stage, e.g. 'player_tracks'.
+            video_path (str, optional): Input video the result was computed from.
+            model_path (str, optional): Model weights used by the stage.
+            **params: Stage parameters that affect the result.
+        
+        Returns:
+            str: Cache key, prefixed with the stage name.
+        """
+        key_data = {
+            'version': STUB_CACHE_VERSION,
+            'stage': stage,
+            'video': get_file_digest(video_path) if video_path is not None else None,
+            'model': get_file_digest(model_path) if model_path is not None else None,
+            'params': params
+        }
+        key_json = json.dumps(key_data, sort_keys=True, default=str)
+        return f"{stage}-{hashlib.sha256(key_json.encode()).hexdigest()}"
+    
+    def get_entry_path(self, key, extension='.pkl'):
+        """
+        Get the file path of a cache entry.
+        
+        Args:
+            key (str): Cache key from make_key().
+            extension (str): File extension of the entry format.
+        
+        Returns:
+            str: Path of the entry file.
+        """
+        return os.path.join(self.cache_dir, f"{key}{extension}")
+    
+    def get(self, key):
+        """
+        Read a cached result and mark it as recently used.
+        
+        Args:
+            key (str): Cache key from make_key().
+        
+        Returns:
+            object or None: The cached result, or None on a miss.
+        """
+        entry_path = self.get_entry_path(key)
+        try:
+            with open(entry_path, 'rb') as f:
+                object = pickle.load(f)
+            os.utime(entry_path)
+        except FileNotFoundError:
+            return None
+        return object
+    
+    def put(self, key, object):
+        """
+        Store a result atomically and evict old entries if over the size limit.
+        
+        Args:
+            key (str): Cache key from make_key().
+            object: The Python object to cache.
+        """
+        save_stub(self.get_entry_path(key), object)
+        self.evict()
+    
+    def get_track_table(self, key, start=None, stop=None):
+        """
+        Read a cached TrackTable, with its extra columns, and mark it as recently used.
+        
+        Args:
+            key (str): Cache key from make_key().
+            start (int, optional): First frame to load.
+            stop (int, optional): Frame after the last frame to load.
+        
+        Returns:
+            TrackTable or None: The cached table, or None on a miss.
+        """
+        entry_path = self.get_entry_path(key, '.npz')
+        try:
+            track_table = TrackTable.load(entry_path, start=start, stop=stop)
+            os.utime(entry_path)
+        except FileNotFoundError:
+            return None
+        return track_table
+    
+    def get_tracks(self, key, start=None, stop=None):
+        """
+        Read cached tracks stored in the columnar format and mark them as recently used.
+        
+        Args:
+            key (str): Cache key from make_key().
+            start (int, optional): First frame to load.
+            stop (int, optional): Frame after the last frame to load.
+        
+        Returns:
+            list or None: Per-frame track dictionaries, or None on a miss.
+        """
+        track_table = self.get_track_table(key, start=start, stop=stop)
+        if track_table is None:
+            return None
+        return track_table.to_tracks()
+    
+    def put_tracks(self, key, tracks):
+        """
+        Store tracks in the columnar format.
+        
+        Args:
+            key (str): Cache key from make_key().
+            tracks (list or TrackTable): List of {track_id: [x1, y1, x2, y2]}
+                dictionaries, one per frame, or a TrackTable with its extra columns.
+        """
+        track_table = tracks if isinstance(tracks, TrackTable) else TrackTable.from_tracks(tracks)
+        track_table.save(self.get_entry_path(key, '.npz'))
+        self.evict()
+    
+    def evict(self):
+        """
+        Remove the least recently used entries until the cache fits its size limit.
+        """
+        if self.max_size_bytes is None:
+            return
+        
+        entries = []
+        for file_name in os.listdir(self.cache_dir):
+            if not file_name.endswith(('.pkl', '.npz')):
+                continue
+            entry_path = os.path.join(self.cache_dir, file_name)
+            try:
+                entry_stat = os.stat(entry_path)
+            except FileNotFoundError:
+                continue
+            entries.append((entry_stat.st_mtime, entry_stat.st_size, entry_path))
+        
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, entry_path in sorted(entries):
+            if total_size <= self.max_size_bytes:
+                break
+            try:
+                os.remove(entry_path)
+            except FileNotFoundError:
+                pass
+            total_size -= size
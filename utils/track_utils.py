@@ -0,0 +1,360 @@
+import hashlib
+import numpy as np
+import os
+import tempfile
+import zipfile
+
+class InterpolatedBBox(list):
+    """
+    Bounding box [x1, y1, x2, y2] that was interpolated rather than detected.
+    
+    It behaves exactly like the plain list used for detected boxes, so
+    existing consumers accept it unchanged; use is_interpolated() to tell
+    the two apart.
+    """
+    interpolated = True
+
+def is_interpolated(bbox):
+    """
+    Check whether a bounding box was interpolated between detections.
+    
+    Args:
+        bbox (list): Bounding box coordinates [x1, y1, x2, y2].
+    
+    Returns:
+        bool: True if the box was interpolated.
+    """
+    return getattr(bbox, 'interpolated', False)
+
+def interpolate_tracks(keyframe_tracks, keyframe_indices, frame_count):
+    """
+    Fill the frames between detected keyframes with interpolated boxes.
+    
+    Boxes are interpolated linearly, per track id, between consecutive
+    keyframes in which the track appears. Frames after the last keyframe
+    hold the last detected boxes. Filled-in boxes are InterpolatedBBox.
+    
+    Args:
+        keyframe_tracks (list): {track_id: [x1, y1, x2, y2]} dictionaries of the keyframes.
+        keyframe_indices (list): Frame index of each keyframe, in increasing order.
+        frame_count (int): Total number of frames.
+    
+    Returns:
+        list: List of {track_id: bbox} dictionaries, one per frame.
+    """
+    tracks = [{} for _ in range(frame_count)]
+    for keyframe_num, frame_num in enumerate(keyframe_indices):
+        tracks[frame_num] = keyframe_tracks[keyframe_num]
+    
+    for keyframe_num in range(len(keyframe_indices) - 1):
+        start_frame = keyframe_indices[keyframe_num]
+        end_frame = keyframe_indices[keyframe_num + 1]
+        if end_frame - start_frame < 2:
+            continue
+        
+        start_tracks = keyframe_tracks[keyframe_num]
+        end_tracks = keyframe_tracks[keyframe_num + 1]
+        track_ids = [track_id for track_id in start_tracks if track_id in end_tracks]
+        if not track_ids:
+            continue
+        
+        start_bboxes = np.array([start_tracks[track_id][:4] for track_id in track_ids], dtype=np.float64)
+        end_bboxes = np.array([end_tracks[track_id][:4] for track_id in track_ids], dtype=np.float64)
+        
+        # Interpolation weights of the in-between frames, shape (frames, 1, 1)
+        weights = (np.arange(1, end_frame - start_frame) / (end_frame - start_frame))[:, None, None]
+        bboxes = start_bboxes + weights * (end_bboxes - start_bboxes)
+        
+        for offset, frame_bboxes in enumerate(bboxes.tolist(), start=1):
+            tracks[start_frame + offset] = {
+                track_id: InterpolatedBBox(bbox) for track_id, bbox in zip(track_ids, frame_bboxes)
+            }
+    
+    if keyframe_indices:
+        last_frame = keyframe_indices[-1]
+        last_tracks = keyframe_tracks[-1]
+        for frame_num in range(last_frame + 1, frame_count):
+            tracks[frame_num] = {track_id: InterpolatedBBox(bbox[:4]) for track_id, bbox in last_tracks.items()}
+    
+    return tracks
+
+def load_npz_columns(npz_path, mmap=True):
+    """
+    Load the arrays of an .npz file, memory-mapping the uncompressed ones.
+    
+    np.load ignores mmap_mode for .npz archives, so members stored without
+    compression are mapped directly from their offset inside the zip file.
+    Compressed members are read into memory.
+    
+    Args:
+        npz_path (str): Path of the .npz file.
+        mmap (bool): Whether to memory-map uncompressed members.
+    
+    Returns:
+        dict: Arrays keyed by member name (without the .npy suffix).
+    """
+    columns = {}
+    with zipfile.ZipFile(npz_path) as archive, open(npz_path, 'rb') as f:
+        for info in archive.infolist():
+            name = info.filename[:-len('.npy')]
+            
+            if not mmap or info.compress_type != zipfile.ZIP_STORED:
+                with archive.open(info) as member:
+                    columns[name] = np.lib.format.read_array(member)
+                continue
+            
+            # Skip the zip local file header to reach the .npy data
+            f.seek(info.header_offset)
+            local_header = f.read(30)
+            name_length = int.from_bytes(local_header[26:28], 'little')
+            extra_length = int.from_bytes(local_header[28:30], 'little')
+            f.seek(info.header_offset + 30 + name_length + extra_length)
+            
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+            
+            if int(np.prod(shape)) == 0:
+                columns[name] = np.empty(shape, dtype=dtype)
+            else:
+                columns[name] = np.memmap(npz_path, dtype=dtype, mode='r', offset=f.tell(),
+                                          shape=shape, order='F' if fortran_order else 'C')
+    return columns
+
+class TrackTable:
+    def __init__(self, frame_offsets, frame_indices, track_ids, bboxes, columns=None):
+        """
+        Initialize a columnar table of per-frame tracks.
+        
+        Row i is one box: frame index, track id and [x1, y1, x2, y2]. Rows are
+        sorted by frame, and `frame_offsets[f]:frame_offsets[f+1]` are the
+        rows of frame f, so a frame range is a contiguous slice.
+        
+        Args:
+            frame_offsets (numpy.ndarray): Row offset of each frame, length frames + 1.
+            frame_indices (numpy.ndarray): Frame index of each row.
+            track_ids (numpy.ndarray): Track id of each row.
+            bboxes (numpy.ndarray): Bounding box of each row, shape (rows, 4).
+            columns (dict, optional): Extra per-row arrays keyed by name. An
+                'interpolated' boolean column marks interpolated boxes.
+        """
+        self.frame_offsets = frame_offsets
+        self.frame_indices = frame_indices
+        self.track_ids = track_ids
+        self.bboxes = bboxes
+        self.columns = columns if columns is not None else {}
+    
+    @classmethod
+    def from_tracks(cls, tracks):
+        """
+        Build a table from the per-frame track dictionaries used across the pipeline.
+        
+        Args:
+            tracks (list): List of {track_id: [x1, y1, x2, y2]} dictionaries, one per frame.
+        
+        Returns:
+            TrackTable: Columnar copy of the tracks.
+        """
+        frame_offsets = np.zeros(len(tracks) + 1, dtype=np.int64)
+        frame_offsets[1:] = np.cumsum([len(frame_tracks) for frame_tracks in tracks])
+        row_count = int(frame_offsets[-1])
+        
+        frame_indices = np.repeat(np.arange(len(tracks), dtype=np.int32), np.diff(frame_offsets))
+        track_ids = np.empty(row_count, dtype=np.int64)
+        bboxes = np.empty((row_count, 4), dtype=np.float64)
+        interpolated = np.zeros(row_count, dtype=bool)
+        
+        row = 0
+        for frame_tracks in tracks:
+            for track_id, bbox in frame_tracks.items():
+                track_ids[row] = track_id
+                bboxes[row] = bbox[:4]
+                interpolated[row] = is_interpolated(bbox)
+                row += 1
+        
+        columns = {}
+        if interpolated.any():
+            columns['interpolated'] = interpolated
+        return cls(frame_offsets, frame_indices, track_ids, bboxes, columns)
+    
+    def get_digest(self):
+        """
+        Compute the SHA-256 digest of the tracks in the table.
+        
+        The rows are hashed in a normalized form (int64 offsets and ids,
+        float64 boxes, interpolation flags), so tracks built with
+        from_tracks() and the same tracks loaded back from disk give the same
+        digest. Extra columns other than 'interpolated' are derived results
+        and are not part of the digest.
+        
+        Returns:
+            str: Hex digest of the tracks.
+        """
+        interpolated = self.columns.get('interpolated')
+        if interpolated is None:
+            interpolated = np.zeros(len(self.track_ids), dtype=bool)
+        
+        sha256 = hashlib.sha256()
+        for array in (np.asarray(self.frame_offsets, dtype=np.int64),
+                      np.asarray(self.track_ids, dtype=np.int64),
+                      np.asarray(self.bboxes, dtype=np.float64),
+                      np.asarray(interpolated, dtype=bool)):
+            sha256.update(np.ascontiguousarray(array).tobytes())
+        return sha256.hexdigest()
+    
+    @property
+    def frame_count(self):
+        return len(self.frame_offsets) - 1
+    
+    def __len__(self):
+        return self.frame_count
+    
+    def get_frame_range(self, start=None, stop=None):
+        """
+        Get the rows of a range of frames without copying.
+        
+        Args:
+            start (int, optional): First frame of the range.
+            stop (int, optional): Frame after the last frame of the range.
+        
+        Returns:
+            TrackTable: Table of the range, with frames renumbered from 0.
+        """
+        start, stop, _ = slice(start, stop).indices(self.frame_count)
+        stop = max(start, stop)
+        row_start = int(self.frame_offsets[start])
+        row_stop = int(self.frame_offsets[stop])
+        
+        return TrackTable(
+            self.frame_offsets[start:stop + 1] - row_start,
+            self.frame_indices[row_start:row_stop] - start,
+            self.track_ids[row_start:row_stop],
+            self.bboxes[row_start:row_stop],
+            {name: column[row_start:row_stop] for name, column in self.columns.items()}
+        )
+    
+    def to_tracks(self):
+        """
+        Convert the table back to per-frame track dictionaries.
+        
+        Returns:
+            list: List of {track_id: [x1, y1, x2, y2]} dictionaries, one per frame.
+        """
+        track_ids = np.asarray(self.track_ids).tolist()
+        bboxes = np.asarray(self.bboxes).tolist()
+        
+        if 'interpolated' in self.columns:
+            bboxes = [InterpolatedBBox(bbox) if interpolated else bbox
+                      for bbox, interpolated in zip(bboxes, np.asarray(self.columns['interpolated']))]
+        
+        tracks = []
+        for frame_num in range(self.frame_count):
+            row_start = int(self.frame_offsets[frame_num])
+            row_stop = int(self.frame_offsets[frame_num + 1])
+            tracks.append(dict(zip(track_ids[row_start:row_stop], bboxes[row_start:row_stop])))
+        return tracks
+    
+    def to_dense(self, column=None):
+        """
+        Convert the table to a dense frames x tracks array of boxes.
+        
+        Args:
+            column (str, optional): Name of an extra column of shape (rows, k)
+                to densify instead of the boxes.
+        
+        Returns:
+            tuple: Sorted track ids of shape (tracks,) and boxes of shape
+                (frames, tracks, 4), or (frames, tracks, k) for a column, NaN
+                where a track is absent from a frame.
+        """
+        track_ids, track_columns = np.unique(np.asarray(self.track_ids), return_inverse=True)
+        
+        values = np.asarray(self.bboxes if column is None else self.columns[column])
+        dense_values = np.full((self.frame_count, len(track_ids)) + values.shape[1:], np.nan,
+                               dtype=np.result_type(values.dtype, np.float32))
+        dense_values[np.asarray(self.frame_indices), track_columns] = values
+        return track_ids, dense_values
+    
+    def to_arrays(self):
+        """
+        Get the arrays of the table keyed by name, as stored by save().
+        
+        Returns:
+            dict: 'frame_offsets', 'frame_indices', 'track_ids', 'bboxes' and
+                a 'column_<name>' array for each extra column.
+        """
+        arrays = {
+            'frame_offsets': np.asarray(self.frame_offsets),
+            'frame_indices': np.asarray(self.frame_indices),
+            'track_ids': np.asarray(self.track_ids),
+            'bboxes': np.asarray(self.bboxes)
+        }
+        for name, column in self.columns.items():
+            arrays[f"column_{name}"] = np.asarray(column)
+        return arrays
+    
+    @classmethod
+    def from_arrays(cls, arrays):
+        """
+        Build a table on the arrays of to_arrays(), without copying them.
+        
+        Args:
+            arrays (dict): Arrays keyed by name, as returned by to_arrays().
+        
+        Returns:
+            TrackTable: Table viewing the arrays.
+        """
+        columns = {name[len('column_'):]: column for name, column in arrays.items()
+                   if name.startswith('column_')}
+        return cls(arrays['frame_offsets'], arrays['frame_indices'],
+                   arrays['track_ids'], arrays['bboxes'], columns)
+    
+    def save(self, table_path, compress=False):
+        """
+        Write the table to an .npz file atomically.
+        
+        Uncompressed files can be memory-mapped by load(); compressed files are
+        smaller but are read into memory.
+        
+        Args:
+            table_path (str): Path of the .npz file.
+            compress (bool): Whether to compress the columns.
+        """
+        table_dir = os.path.dirname(table_path)
+        if table_dir and not os.path.exists(table_dir):
+            os.makedirs(table_dir, exist_ok=True)
+        
+        arrays = self.to_arrays()
+        
+        fd, temp_path = tempfile.mkstemp(dir=table_dir or '.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                if compress:
+                    np.savez_compressed(f, **arrays)
+                else:
+                    np.savez(f, **arrays)
+            os.replace(temp_path, table_path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+    
+    @classmethod
+    def load(cls, table_path, mmap=True, start=None, stop=None):
+        """
+        Read a table written by save().
+        
+        Args:
+            table_path (str): Path of the .npz file.
+            mmap (bool): Whether to memory-map the columns of uncompressed files.
+            start (int, optional): First frame to load.
+            stop (int, optional): Frame after the last frame to load.
+        
+        Returns:
+            TrackTable: The loaded table, limited to the requested frame range.
+        """
+        table = cls.from_arrays(load_npz_columns(table_path, mmap=mmap))
+        if start is not None or stop is not None:
+            table = table.get_frame_range(start, stop)
+        return table
@@ -1,42 +1,664 @@
 import cv2
+import numpy as np
 import os
+import queue
+import threading
+import time
+
+class FramePrefetcher:
+    def __init__(self, video_path, buffer_size=8, frame_shape=None):
+        """
+        Initialize a prefetching frame reader.
+        
+        A worker thread decodes frames ahead of the consumer into a bounded
+        ring of preallocated frame buffers, so decoding overlaps with whatever
+        the consumer does with each frame (model inference, drawing, ...).
+        
+        A yielded frame is a view into the ring and stays valid only until the
+        next frame is requested; copy it if it has to be kept.
+        
+        Args:
+            video_path (str): Path to the input video file.
+            buffer_size (int): Number of frame buffers in the ring (at least 2).
+            frame_shape (tuple, optional): Shape (height, width, 3) used to
+                preallocate the buffers.
+        """
+        self.video_path = video_path
+        self.buffer_size = max(2, buffer_size)
+        self.buffers = [None] * self.buffer_size
+        if frame_shape is not None:
+            self.buffers = [np.empty(frame_shape, dtype=np.uint8) for _ in range(self.buffer_size)]
+        
+        self.free_slots = queue.Queue()
+        self.filled_slots = queue.Queue()
+        self.stop_event = threading.Event()
+        
+        # Counters exposed for monitoring
+        self.frames_decoded = 0
+        self.producer_stalls = 0  # decode waited for the consumer to release a buffer
+        self.consumer_stalls = 0  # consumer waited for a frame to be decoded
+    
+    @property
+    def queue_depth(self):
+        """
+        Number of decoded frames waiting to be consumed.
+        
+        Returns:
+            int: Current queue depth.
+        """
+        return self.filled_slots.qsize()
+    
+    def get_stats(self):
+        """
+        Get the prefetch counters.
+        
+        Returns:
+            dict: Frames decoded, current queue depth and stall counters.
+        """
+        return {
+            'frames_decoded': self.frames_decoded,
+            'queue_depth': self.queue_depth,
+            'producer_stalls': self.producer_stalls,
+            'consumer_stalls': self.consumer_stalls
+        }
+    
+    def _decode_loop(self):
+        """
+        Decode frames into free ring buffers until the video ends or the
+        reader is stopped.
+        """
+        cap = cv2.VideoCapture(self.video_path)
+        try:
+            while not self.stop_event.is_set():
+                if self.free_slots.empty():
+                    self.producer_stalls += 1
+                
+                slot = None
+                while slot is None and not self.stop_event.is_set():
+                    try:
+                        slot = self.free_slots.get(timeout=0.1)
+                    except queue.Empty:
+                        pass
+                if slot is None:
+                    break
+                
+                ret, frame = cap.read(self.buffers[slot])
+                if not ret:
+                    break
+                
+                # Reading into a buffer of the wrong shape allocates a new array
+                self.buffers[slot] = frame
+                self.frames_decoded += 1
+                self.filled_slots.put(slot)
+        finally:
+            cap.release()
+            self.filled_slots.put(None)
+    
+    def __iter__(self):
+        """
+        Start the decode thread and yield frames as they become available.
+        
+        Yields:
+            numpy.ndarray: The next decoded video frame.
+        """
+        for slot in range(self.buffer_size):
+            self.free_slots.put(slot)
+        
+        worker = threading.Thread(target=self._decode_loop, daemon=True)
+        worker.start()
+        
+        current_slot = None
+        try:
+            while True:
+                if self.filled_slots.empty():
+                    self.consumer_stalls += 1
+                slot = self.filled_slots.get()
+                
+                # The previous frame is released only once the next one is requested
+                if current_slot is not None:
+                    self.free_slots.put(current_slot)
+                current_slot = slot
+                
+                if slot is None:
+                    break
+                yield self.buffers[slot]
+        finally:
+            self.stop_event.set()
+            worker.join()
+
+class FrameStore:
+    def __init__(self, store_path, frame_shape, capacity):
+        """
+        Initialize an on-disk store of decoded frames backed by np.memmap.
+        
+        The store is filled once while the video is decoded; afterwards every
+        frame can be read back as a zero-copy view into the mapped file, so
+        several passes over the video neither decode it again nor keep it in RAM.
+        
+        Args:
+            store_path (str): Path of the backing file. It is overwritten.
+            frame_shape (tuple): Shape (height, width, 3) of a single frame.
+            capacity (int): Number of frames to reserve space for. The file
+                grows if more frames are appended.
+        """
+        self.store_path = store_path
+        self.frame_shape = tuple(frame_shape)
+        self.capacity = max(1, capacity)
+        self.frame_count = 0
+        self.complete = False
+        
+        store_dir = os.path.dirname(store_path)
+        if store_dir and not os.path.exists(store_dir):
+            os.makedirs(store_dir)
+        
+        self.frames = np.memmap(store_path, dtype=np.uint8, mode='w+',
+                                shape=(self.capacity,) + self.frame_shape)
+    
+    def _grow(self, capacity):
+        """
+        Extend the backing file and remap it with a larger capacity.
+        
+        Args:
+            capacity (int): New number of frames the store can hold.
+        """
+        self.frames.flush()
+        del self.frames
+        
+        with open(self.store_path, 'r+b') as f:
+            f.truncate(capacity * int(np.prod(self.frame_shape)))
+        
+        self.capacity = capacity
+        self.frames = np.memmap(self.store_path, dtype=np.uint8, mode='r+',
+                                shape=(self.capacity,) + self.frame_shape)
+    
+    def append(self, frame):
+        """
+        Copy a decoded frame into the store.
+        
+        Args:
+            frame (numpy.ndarray): Decoded video frame.
+        
+        Returns:
+            numpy.ndarray: View of the stored frame.
+        """
+        if self.frame_count == self.capacity:
+            self._grow(self.capacity + max(1, self.capacity // 2))
+        
+        stored_frame = self.frames[self.frame_count]
+        stored_frame[...] = frame
+        self.frame_count += 1
+        return stored_frame
+    
+    def __len__(self):
+        return self.frame_count
+    
+    def __getitem__(self, frame_num):
+        """
+        Get a zero-copy view of a stored frame.
+        
+        Args:
+            frame_num (int): Index of the frame.
+        
+        Returns:
+            numpy.ndarray: View into the mapped file.
+        """
+        if frame_num < 0:
+            frame_num += self.frame_count
+        if not 0 <= frame_num < self.frame_count:
+            raise IndexError(f"Frame {frame_num} is not in the frame store")
+        return self.frames[frame_num]
+    
+    def __iter__(self):
+        for frame_num in range(self.frame_count):
+            yield self.frames[frame_num]
+    
+    def close(self, delete=False):
+        """
+        Flush the store to disk and release the mapping.
+        
+        Args:
+            delete (bool): Whether to remove the backing file.
+        """
+        self.frames.flush()
+        del self.frames
+        self.frames = None
+        if delete and os.path.exists(self.store_path):
+            os.remove(self.store_path)
+
+class VideoSource:
+    def __init__(self, video_path, prefetch=0, frame_store_path=None):
+        """
+        Initialize a lazily decoded video source.
+        
+        Frames are decoded one at a time while iterating, so only the frame
+        currently being processed is held in memory. Each iteration opens a
+        fresh capture, which lets several stages make their own pass over the
+        same video.
+        
+        Args:
+            video_path (str): Path to the input video file.
+            prefetch (int): Number of frames to decode ahead on a background
+                thread. 0 decodes in the calling thread.
+            frame_store_path (str, optional): Path of an on-disk FrameStore.
+                When given, the first pass fills the store and later passes
+                read zero-copy views from it instead of decoding again.
+        """
+        self.video_path = video_path
+        self.prefetch = prefetch
+        self.prefetcher = None
+        
+        cap = cv2.VideoCapture(video_path)
+        if not cap.isOpened():
+            raise IOError(f"Could not open video: {video_path}")
+        
+        self.fps = cap.get(cv2.CAP_PROP_FPS) or 24
+        self.frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        self.width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        self.height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        cap.release()
+        
+        self.frame_store = None
+        if frame_store_path is not None:
+            self.frame_store = FrameStore(
+                frame_store_path,
+                (self.height, self.width, 3),
+                self.frame_count
+            )
+    
+    @property
+    def resolution(self):
+        """
+        Frame size of the video.
+        
+        Returns:
+            tuple: Frame size as (width, height).
+        """
+        return (self.width, self.height)
+    
+    def __len__(self):
+        return self.frame_count
+    
+    def __iter__(self):
+        """
+        Decode and yield the frames of the video in order.
+        
+        With prefetching enabled, the yielded frame is only valid until the
+        next one is requested, unless a frame store is used: frames then stay
+        valid as views into the store.
+        
+        Yields:
+            numpy.ndarray: The next decoded video frame.
+        """
+        if self.frame_store is None:
+            yield from self._decode_frames()
+            return
+        
+        if self.frame_store.complete:
+            yield from self.frame_store
+            return
+        
+        # Fill the store on this pass; frames stored by an earlier, interrupted
+        # pass are served from the store instead of being copied again
+        for frame_num, frame in enumerate(self._decode_frames()):
+            if frame_num < len(self.frame_store):
+                yield self.frame_store[frame_num]
+            else:
+                yield self.frame_store.append(frame)
+        self.frame_store.complete = True
+    
+    def _decode_frames(self):
+        """
+        Decode the video from the start, prefetching if enabled.
+        
+        Yields:
+            numpy.ndarray: The next decoded video frame.
+        """
+        if self.prefetch > 0:
+            self.prefetcher = FramePrefetcher(
+                self.video_path,
+                buffer_size=self.prefetch,
+                frame_shape=(self.height, self.width, 3)
+            )
+            yield from self.prefetcher
+            return
+        
+        cap = cv2.VideoCapture(self.video_path)
+        try:
+            while True:
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                yield frame
+        finally:
+            cap.release()
+    
+    def __getitem__(self, frame_num):
+        """
+        Decode a single frame by seeking to its index.
+        
+        Frames already held in the frame store are returned as views without
+        decoding.
+        
+        Args:
+            frame_num (int): Index of the frame to read.
+        
+        Returns:
+            numpy.ndarray: The decoded video frame.
+        """
+        if frame_num < 0:
+            frame_num += self.frame_count
+        
+        if self.frame_store is not None and frame_num < len(self.frame_store):
+            return self.frame_store[frame_num]
+        
+        cap = cv2.VideoCapture(self.video_path)
+        try:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, frame_num)
+            ret, frame = cap.read()
+        finally:
+            cap.release()
+        
+        if not ret:
+            raise IndexError(f"Frame {frame_num} could not be read from {self.video_path}")
+        return frame
+    
+    def iter_frames(self, frame_nums, seek_gap=50):
+        """
+        Decode only the selected frames, in increasing order.
+        
+        Small gaps between selected frames are skipped with grab(), which
+        avoids the color conversion; gaps longer than `seek_gap` frames are
+        skipped by seeking, so frames in between are never decoded.
+        
+        Args:
+            frame_nums (iterable): Indices of the frames to read.
+            seek_gap (int): Gap length above which the capture seeks.
+        
+        Yields:
+            tuple: Frame index and decoded video frame.
+        """
+        frame_nums = sorted(set(frame_nums))
+        if self.frame_store is not None and self.frame_store.complete:
+            for frame_num in frame_nums:
+                yield frame_num, self.frame_store[frame_num]
+            return
+        
+        cap = cv2.VideoCapture(self.video_path)
+        try:
+            position = 0
+            for frame_num in frame_nums:
+                if frame_num - position > seek_gap:
+                    cap.set(cv2.CAP_PROP_POS_FRAMES, frame_num)
+                    position = frame_num
+                while position < frame_num and cap.grab():
+                    position += 1
+                
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                position += 1
+                yield frame_num, frame
+        finally:
+            cap.release()
+
+class LiveVideoSource:
+    def __init__(self, source, pace=False, buffer_size=2):
+        """
+        Initialize a live video source.
+        
+        A capture thread reads frames as the source delivers them and keeps
+        only the newest `buffer_size` ones: when the consumer falls behind,
+        the oldest waiting frame is dropped instead of letting latency grow.
+        Unlike VideoSource, the capture stays open and can be iterated once.
+        
+        Args:
+            source (int or str): Capture device index, stream URL or video file.
+            pace (bool): Whether to deliver frames at the native frame rate,
+                to replay a video file as if it were a live feed.
+            buffer_size (int): Maximum number of frames waiting to be consumed.
+        """
+        self.source = source
+        self.pace = pace
+        
+        self.cap = cv2.VideoCapture(source)
+        if not self.cap.isOpened():
+            raise IOError(f"Could not open video source: {source}")
+        
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 24
+        self.width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        self.height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        
+        self.frame_queue = queue.Queue(maxsize=max(1, buffer_size))
+        self.stop_event = threading.Event()
+        
+        # Counters exposed for monitoring
+        self.frames_captured = 0
+        self.frames_dropped = 0  # captured frames replaced by newer ones before being consumed
+    
+    @property
+    def resolution(self):
+        """
+        Frame size of the source.
+        
+        Returns:
+            tuple: Frame size as (width, height).
+        """
+        return (self.width, self.height)
+    
+    def get_stats(self):
+        """
+        Get the capture counters.
+        
+        Returns:
+            dict: Frames captured and frames dropped before being consumed.
+        """
+        return {
+            'frames_captured': self.frames_captured,
+            'frames_dropped': self.frames_dropped
+        }
+    
+    def _capture_loop(self):
+        """
+        Read frames into the queue until the source ends or the reader is stopped.
+        """
+        start_time = time.perf_counter()
+        try:
+            while not self.stop_event.is_set():
+                ret, frame = self.cap.read()
+                if not ret:
+                    break
+                
+                if self.pace:
+                    delay = start_time + self.frames_captured / self.fps - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                self.frames_captured += 1
+                
+                # Replace the oldest waiting frame rather than waiting for the consumer
+                if self.frame_queue.full():
+                    try:
+                        self.frame_queue.get_nowait()
+                        self.frames_dropped += 1
+                    except queue.Empty:
+                        pass
+                self.frame_queue.put((frame, time.perf_counter()))
+        finally:
+            self.cap.release()
+            while not self.stop_event.is_set():
+                try:
+                    self.frame_queue.put(None, timeout=0.1)
+                    break
+                except queue.Full:
+                    pass
+    
+    def __iter__(self):
+        """
+        Start the capture thread and yield frames as they become available.
+        
+        Frames are numbered in the order they are yielded, so frames dropped
+        by the capture thread leave no gaps.
+        
+        Yields:
+            tuple: Frame index, video frame and the time.perf_counter()
+                timestamp at which the frame was captured.
+        """
+        worker = threading.Thread(target=self._capture_loop, daemon=True)
+        worker.start()
+        
+        try:
+            frame_num = 0
+            while True:
+                captured = self.frame_queue.get()
+                if captured is None:
+                    break
+                frame, capture_time = captured
+                yield frame_num, frame, capture_time
+                frame_num += 1
+        finally:
+            self.stop_event.set()
+            worker.join()
 
 def read_video(video_path):
     """
     Read video frames from a video file.
     
+    All frames are kept in memory; prefer iterating over a VideoSource
+    for long videos.
+    
     Args:
         video_path (str): Path to the input video file.
     
     Returns:
         list: List of video frames as numpy arrays.
     """
-    cap = cv2.VideoCapture(video_path)
-    frames = []
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            break
-        frames.append(frame)
-    cap.release()
-    return frames
+    return list(VideoSource(video_path))
+
+class VideoSink:
+    def __init__(self, output_video_path, fps=24, frame_size=None, codec='XVID', queue_size=16):
+        """
+        Initialize an incremental video writer.
+        
+        Frames are handed over one at a time and encoded on a background
+        thread. The hand-over queue is bounded, so a producer that outpaces
+        the encoder blocks instead of buffering the whole video in memory.
+        
+        Args:
+            output_video_path (str): Path where the video should be saved.
+            fps (float): Frame rate of the output video, normally the source fps.
+            frame_size (tuple, optional): Output size as (width, height). Taken
+                from the first frame when not given.
+            codec (str): FourCC code of the output codec.
+            queue_size (int): Maximum number of frames waiting to be encoded.
+        """
+        self.output_video_path = output_video_path
+        self.fps = fps
+        self.frame_size = frame_size
+        self.codec = codec
+        
+        self.frame_queue = queue.Queue(maxsize=queue_size)
+        self.worker = None
+        self.writer_error = None
+        
+        self.frames_written = 0
+        self.backpressure_stalls = 0  # writes that waited for the encoder
+    
+    def _open(self, frame):
+        """
+        Open the underlying VideoWriter and start the encode thread.
+        
+        Args:
+            frame (numpy.ndarray): First frame, used for the size if none was given.
+        """
+        output_dir = os.path.dirname(self.output_video_path)
+        if output_dir and not os.path.exists(output_dir):
+            os.makedirs(output_dir)
+        
+        if self.frame_size is None:
+            self.frame_size = (frame.shape[1], frame.shape[0])
+        
+        fourcc = cv2.VideoWriter_fourcc(*self.codec)
+        writer = cv2.VideoWriter(self.output_video_path, fourcc, self.fps, self.frame_size)
+        if not writer.isOpened():
+            raise IOError(f"Could not open video writer: {self.output_video_path}")
+        
+        self.worker = threading.Thread(target=self._encode_loop, args=(writer,), daemon=True)
+        self.worker.start()
+    
+    def _encode_loop(self, writer):
+        """
+        Encode queued frames until the end-of-stream marker arrives.
+        
+        Args:
+            writer (cv2.VideoWriter): Opened video writer.
+        """
+        try:
+            while True:
+                frame = self.frame_queue.get()
+                if frame is None:
+                    break
+                if self.writer_error is None:
+                    try:
+                        writer.write(frame)
+                        self.frames_written += 1
+                    except Exception as e:
+                        # Keep draining the queue so the producer never blocks forever
+                        self.writer_error = e
+        finally:
+            writer.release()
+    
+    def write(self, frame):
+        """
+        Queue a frame for encoding.
+        
+        The sink keeps a reference to the frame until it is encoded, so the
+        caller must not modify it afterwards.
+        
+        Args:
+            frame (numpy.ndarray): Frame to append to the video.
+        """
+        if self.writer_error is not None:
+            raise self.writer_error
+        if self.worker is None:
+            self._open(frame)
+        
+        if self.frame_queue.full():
+            self.backpressure_stalls += 1
+        self.frame_queue.put(frame)
+    
+    def close(self, raise_error=True):
+        """
+        Flush the remaining frames and finalize the video file.
+        
+        Args:
+            raise_error (bool): Whether to raise the error of the encode
+                thread, if there was one.
+        """
+        if self.worker is not None:
+            self.frame_queue.put(None)
+            self.worker.join()
+            self.worker = None
+        if raise_error and self.writer_error is not None:
+            raise self.writer_error
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        # An error raised in the with block is not masked by an encoder error
+        self.close(raise_error=exc_type is None)
 
-def save_video(ouput_video_frames,output_video_path):
+def save_video(ouput_video_frames,output_video_path,fps=24):
     """
     Save video frames to a video file.
     
     This function takes a list of video frames and saves them as a video file
-    using OpenCV's VideoWriter.
+    using a VideoSink.
     
     Args:
         ouput_video_frames (list): List of video frames as numpy arrays.
         output_video_path (str): Path where the video should be saved.
+        fps (float): Frame rate of the output video.
     """
-    fourcc = cv2.VideoWriter_fourcc(*'XVID')
-    if not os.path.exists(os.path.dirname(output_video_path)):
-        os.makedirs(os.path.dirname(output_video_path))
-    
-    out = cv2.VideoWriter(output_video_path, fourcc, 24, (ouput_video_frames[0].shape[1], ouput_video_frames[0].shape[0]))
-    for frame in ouput_video_frames:
-        out.write(frame)
-    out.release()
\ No newline at end of file
+    with VideoSink(output_video_path, fps=fps) as sink:
+        for frame in ouput_video_frames:
+            sink.write(frame)